@@ -2,7 +2,15 @@
 import sys, os, ctypes
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QIcon
-from core.models import create_user_table, create_analysis_table
+from core.models import (
+    create_user_table,
+    create_analysis_table,
+    create_job_table,
+    create_roi_table,
+    create_fingerprint_table,
+    create_embedding_table,
+)
+from core.services.history_query import import_history_json
 from gui.main_window import MainWindow, load_stylesheet
 
 
@@ -21,6 +29,15 @@ os.makedirs(DB_DIR, exist_ok=True)
 # DB 테이블 생성
 create_user_table()
 create_analysis_table()
+create_job_table()
+create_roi_table()
+create_fingerprint_table()
+create_embedding_table()
+
+# 기존 history.json 기록 → 조회 색인 (파일이 바뀌었을 때만)
+imported = import_history_json()
+if imported:
+    print(f"[INFO] 분석 기록 {imported}건 색인")
 
 # 앱 실행
 if __name__ == "__main__":
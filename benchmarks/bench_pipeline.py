@@ -0,0 +1,423 @@
+# benchmarks/bench_pipeline.py
+"""
+Drovis 분석 파이프라인 벤치마크 (합성 영상 / 합성 포즈 사용)
+
+    python -m benchmarks.bench_pipeline                     # 전체 실행 → bench_results.jsonl
+    python -m benchmarks.bench_pipeline --only lstm norm    # 일부만
+    python -m benchmarks.bench_pipeline --compare base.jsonl new.jsonl
+
+결과는 한 줄에 하나씩 JSON으로 기록 (커밋 해시 포함) → 커밋 간 회귀 비교용
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from benchmarks.synthetic import make_video, make_pose_sequence
+
+BENCHES = {}
+
+
+def bench(name):
+    def deco(fn):
+        BENCHES[name] = fn
+        return fn
+
+    return deco
+
+
+def measure(fn, repeat: int = 3):
+    """fn을 repeat번 실행해 가장 빠른 시간(초) 반환"""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def record(name, value, unit, higher_is_better=True, **params):
+    return {
+        "bench": name,
+        "params": params,
+        "value": round(float(value), 4),
+        "unit": unit,
+        "higher_is_better": higher_is_better,
+    }
+
+
+@contextmanager
+def temp_outputs(tmp_dir):
+    """
+    분석 산출물(npy, 확률, 썸네일, 임베딩, 포즈 체크포인트)과 analysis.db 는 임시 폴더로,
+    측정값 파일 기록은 끔 (운영 DB/폴더에 벤치마크 기록이 남지 않도록)
+    """
+    from core.config import Config
+    from core.models import (
+        create_analysis_table,
+        create_embedding_table,
+        create_fingerprint_table,
+        create_job_table,
+        create_roi_table,
+    )
+    from core.services import predict
+
+    names = (
+        "UPLOAD_FOLDER", "THUMBNAIL_FOLDER", "METRICS_LOG_PATH", "METRICS_PROM_PATH",
+        "ANALYSIS_DB_PATH", "EMBED_FOLDER", "POSE_CHECKPOINT_FOLDER",
+    )
+    saved = {n: getattr(Config, n) for n in names}, predict.UPLOAD_FOLDER
+    Config.UPLOAD_FOLDER = predict.UPLOAD_FOLDER = tmp_dir
+    Config.THUMBNAIL_FOLDER = os.path.join(tmp_dir, "thumbnails")
+    Config.METRICS_LOG_PATH = Config.METRICS_PROM_PATH = None
+    Config.ANALYSIS_DB_PATH = os.path.join(tmp_dir, "analysis.db")
+    Config.EMBED_FOLDER = os.path.join(tmp_dir, "embeddings")
+    Config.POSE_CHECKPOINT_FOLDER = os.path.join(tmp_dir, "pose_cache")
+    try:
+        for create in (create_analysis_table, create_job_table, create_roi_table,
+                       create_fingerprint_table, create_embedding_table):
+            create()
+        yield
+    finally:
+        for n, v in saved[0].items():
+            setattr(Config, n, v)
+        predict.UPLOAD_FOLDER = saved[1]
+
+
+# ---------------------------------------------------------------- 개별 벤치마크
+
+
+@bench("norm")
+def bench_normalize(args, tmp_dir):
+    from core.services.predict import normalize_seq_2d
+
+    out = []
+    for frames in (1_000, 10_000) if not args.quick else (1_000,):
+        seq = make_pose_sequence(frames)
+        sec = measure(lambda: normalize_seq_2d(seq), args.repeat)
+        out.append(record("normalize_seq_2d", frames / sec, "frames/s", frames=frames))
+    return out
+
+
+@bench("lstm")
+def bench_lstm(args, tmp_dir):
+    import torch
+    from core.models.lstm_model import LSTMModel
+    from core.services import predict
+
+    net = predict.MODELS.current()[0] or LSTMModel().eval()
+    windows = predict.make_windows(make_pose_sequence(1_029 if not args.quick else 285))
+    prev_threads = torch.get_num_threads()
+    out = []
+    try:
+        for threads in (1, 2, 4):
+            torch.set_num_threads(threads)
+            for batch in (1, 16, 64, 256):
+                sec = measure(
+                    lambda: predict.infer_windows(windows, batch_size=batch, net=net),
+                    args.repeat,
+                )
+                out.append(
+                    record(
+                        "lstm_forward",
+                        len(windows) / sec,
+                        "windows/s",
+                        batch_size=batch,
+                        threads=threads,
+                    )
+                )
+    finally:
+        torch.set_num_threads(prev_threads)
+    return out
+
+
+@bench("history")
+def bench_history(args, tmp_dir):
+    from core.services import history_json
+
+    # 기록 쓰기는 analysis.db 색인에도 반영됨 → 임시 DB 사용
+    with temp_outputs(tmp_dir):
+        saved = history_json.HISTORY_PATH
+        out = []
+        try:
+            for n in (100, 1_000) if not args.quick else (100,):
+                history_json.HISTORY_PATH = os.path.join(tmp_dir, f"history_{n}.json")
+                chunk = ["Normal"] * 250 + ["Loitering"] * 50
+                history_json._write(
+                    [
+                        {"id": i, "username": f"user{i % 5}", "filename": f"v{i}.mp4",
+                         "result": "하", "result_per_chunk": chunk}
+                        for i in range(n)
+                    ]
+                )
+                read = measure(lambda: history_json.load_all("user1"), args.repeat)
+                out.append(record("history_read", read * 1000, "ms", False, records=n))
+                append = measure(
+                    lambda: history_json.append_record(
+                        {"username": "user1", "filename": "new.mp4", "result_per_chunk": chunk}
+                    ),
+                    args.repeat,
+                )
+                out.append(record("history_append", append * 1000, "ms", False, records=n))
+        finally:
+            history_json.HISTORY_PATH = saved
+    return out
+
+
+@bench("landmarks")
+def bench_landmark_buffer(args, tmp_dir):
+    """포즈 좌표 누적 방식 비교 (MediaPipe 결과 대신 합성 landmark 객체, 긴 영상 길이)"""
+    import tracemalloc
+    from types import SimpleNamespace
+    from core.services.pose_store import LandmarkBuffer
+
+    frames = 9_000 if args.quick else 108_000  # 30fps 기준 5분 / 1시간
+    landmarks = [
+        SimpleNamespace(x=0.5 + i * 0.001, y=0.5 - i * 0.001, z=0.0, visibility=0.9)
+        for i in range(33)
+    ]
+
+    def python_lists():
+        rows = []
+        for _ in range(frames):
+            coords = []
+            for lm in landmarks:
+                coords.extend([lm.x, lm.y])
+            rows.append(coords)
+        return np.asarray(rows, dtype=np.float32)
+
+    def preallocated(extras=False):
+        buf = LandmarkBuffer(frames, extras=extras)
+        for i in range(frames):
+            buf.push(i, landmarks)
+        return buf.arrays()
+
+    out = []
+    for name, fn in (
+        ("list", python_lists),
+        ("buffer", preallocated),
+        ("buffer_extras", lambda: preallocated(extras=True)),
+    ):
+        sec = measure(fn, args.repeat)
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        out.append(record("landmark_collect", frames / sec, "frames/s", mode=name, frames=frames))
+        out.append(record("landmark_peak_mem", peak / 2**20, "MB", False, mode=name, frames=frames))
+    return out
+
+
+@bench("decode")
+def bench_decode(args, tmp_dir):
+    """디코딩 백엔드별 처리량 (전체 read / 색 변환 방식 / grab으로 건너뛰기)"""
+    import cv2
+    from core.services.decode import available_backends, open_video, RGBConverter
+
+    frames = 150 if args.quick else 600
+    video = make_video(os.path.join(tmp_dir, "bench_decode.mp4"), frames=frames, size=(1280, 720))
+
+    def read_all(backend, convert=None, stride=1):
+        reader = open_video(video, backend)
+        n = 0
+        try:
+            while True:
+                if stride > 1 and n % stride:
+                    if not reader.grab():
+                        break
+                else:
+                    ok, frame = reader.read()
+                    if not ok:
+                        break
+                    if convert is not None:
+                        convert(frame)
+                n += 1
+        finally:
+            reader.release()
+
+    def cvt_new(frame):
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    out = []
+    for backend in available_backends():
+        cases = (
+            ("read", None, 1),
+            ("read+cvt_alloc", cvt_new, 1),
+            ("read+cvt_reuse", RGBConverter(), 1),
+            ("stride3_grab", None, 3),
+        )
+        for mode, convert, stride in cases:
+            sec = measure(lambda: read_all(backend, convert, stride), args.repeat)
+            out.append(
+                record("decode", frames / sec, "frames/s", backend=backend, mode=mode, frames=frames)
+            )
+    return out
+
+
+@bench("pose")
+def bench_process_pose(args, tmp_dir):
+    from core.services.preprocess import process_pose
+
+    frames = 150 if args.quick else 300
+    video = make_video(os.path.join(tmp_dir, "bench_pose.mp4"), frames=frames)
+    sec = measure(lambda: process_pose(video, return_stats=True), 1)
+    return [record("process_pose", frames / sec, "frames/s", frames=frames)]
+
+
+@bench("motion")
+def bench_motion_gate(args, tmp_dir):
+    """정지 구간이 긴 영상: 움직임 게이트 끔/켬 비교 (생략 비율, 시간, 결과 차이)"""
+    from core.services import predict
+
+    frames = 300 if args.quick else 900
+    video = make_video(os.path.join(tmp_dir, "bench_motion.mp4"), frames=frames, static_ratio=0.6)
+    results = {}
+    with temp_outputs(tmp_dir):
+        for gated in (False, True):
+            saved = predict.process_pose
+            predict.process_pose = lambda *a, **kw: saved(*a, motion_gate=gated, **kw)
+            try:
+                t0 = time.perf_counter()
+                res = predict.predict_from_video(video, "bench")
+                sec = time.perf_counter() - t0
+            finally:
+                predict.process_pose = saved
+            if not res.get("success"):
+                raise RuntimeError(res.get("message"))
+            results[gated] = (sec, res)
+
+    (full_sec, full), (gate_sec, gated) = results[False], results[True]
+    labels = set(full["behavior_probs_pct"]) | set(gated["behavior_probs_pct"])
+    pct_diff = max(
+        abs(full["behavior_probs_pct"].get(k, 0.0) - gated["behavior_probs_pct"].get(k, 0.0))
+        for k in labels
+    ) if labels else 0.0
+    return [
+        record("motion_gate_time", gate_sec / full_sec, "ratio", False, frames=frames),
+        record("motion_gate_skipped", gated["pose_stats"].get("motion_skipped_ratio", 0.0),
+               "ratio", frames=frames),
+        record("motion_gate_pct_diff", pct_diff, "%p", False, frames=frames,
+               same_level=full["result"] == gated["result"]),
+    ]
+
+
+@bench("e2e")
+def bench_end_to_end(args, tmp_dir):
+    from core.services import predict
+
+    frames = 150 if args.quick else 300
+    video = make_video(os.path.join(tmp_dir, "bench_e2e.mp4"), frames=frames)
+    with temp_outputs(tmp_dir):
+        t0 = time.perf_counter()
+        res = predict.predict_from_video(video, "bench")
+        sec = time.perf_counter() - t0
+    if not res.get("success"):
+        raise RuntimeError(res.get("message"))
+    return [record("predict_from_video", sec, "s", False, frames=frames)]
+
+
+# ---------------------------------------------------------------- 실행 / 비교
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    env = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+    }
+    for mod in ("torch", "cv2", "mediapipe"):
+        try:
+            env[mod] = __import__(mod).__version__
+        except Exception:
+            env[mod] = None
+    return env
+
+
+def run(args):
+    env = environment()
+    names = args.only or list(BENCHES)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="drovis_bench_") as tmp_dir:
+        for name in names:
+            try:
+                rows = BENCHES[name](args, tmp_dir)
+            except Exception as e:  # 의존성 없음 등 → 건너뛴 것으로 기록
+                rows = [{"bench": name, "skipped": True, "error": str(e)}]
+            for row in rows:
+                row.update(env)
+                results.append(row)
+                if row.get("skipped"):
+                    print(f"[SKIP] {name}: {row['error']}")
+                else:
+                    print(f"{row['bench']:<22} {json.dumps(row['params'], ensure_ascii=False):<40} "
+                          f"{row['value']:>12} {row['unit']}")
+
+    with open(args.out, "a", encoding="utf-8") as f:
+        for row in results:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    print(f"\n{len(results)}개 결과 저장: {args.out}")
+
+
+def _latest(path):
+    rows = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            row = json.loads(line)
+            if row.get("skipped"):
+                continue
+            key = (row["bench"], json.dumps(row["params"], sort_keys=True))
+            rows[key] = row
+    return rows
+
+
+def compare(base_path, new_path, threshold):
+    """두 결과 파일 비교, threshold 이상 나빠진 항목이 있으면 1 반환"""
+    base, new = _latest(base_path), _latest(new_path)
+    regressions = 0
+    for key in sorted(set(base) & set(new)):
+        b, n = base[key], new[key]
+        ratio = n["value"] / b["value"] if b["value"] else float("inf")
+        worse = ratio < 1 - threshold if b["higher_is_better"] else ratio > 1 + threshold
+        regressions += worse
+        flag = "REGRESSION" if worse else ""
+        print(f"{key[0]:<22} {key[1]:<40} {b['value']:>10} -> {n['value']:>10} "
+              f"{b['unit']:<10} x{ratio:.2f} {flag}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drovis 파이프라인 벤치마크")
+    parser.add_argument("--only", nargs="*", choices=sorted(BENCHES))
+    parser.add_argument("--out", default="bench_results.jsonl")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help="작은 입력으로 빠르게")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"))
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return compare(*args.compare, args.threshold)
+    run(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
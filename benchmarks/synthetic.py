@@ -0,0 +1,53 @@
+# benchmarks/synthetic.py
+import os
+
+import cv2
+import numpy as np
+
+
+def make_video(
+    path: str,
+    frames: int = 300,
+    size=(640, 480),
+    fps: float = 30.0,
+    fourcc: str = "mp4v",
+    static_ratio: float = 0.0,
+    seed: int = 0,
+) -> str:
+    """
+    벤치마크용 합성 영상 생성 (cv2.VideoWriter).
+    화면을 가로지르는 막대 인형 + 노이즈 배경.
+    static_ratio: 앞부분 중 움직임이 없는 프레임 비율 (고정 CCTV 구간 흉내)
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    w, h = size
+    rng = np.random.default_rng(seed)
+    background = rng.integers(40, 80, size=(h, w, 3), dtype=np.uint8)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, (w, h))
+    n_static = int(frames * static_ratio)
+    try:
+        for i in range(frames):
+            frame = background.copy()
+            t = 0 if i < n_static else i - n_static
+            cx = int(w * 0.2 + (w * 0.6) * ((t % 120) / 120.0))
+            cy = h // 2
+            # 머리, 몸통, 팔, 다리
+            cv2.circle(frame, (cx, cy - 90), 18, (220, 200, 180), -1)
+            cv2.line(frame, (cx, cy - 70), (cx, cy + 20), (200, 200, 200), 8)
+            swing = int(25 * np.sin(t / 5.0))
+            cv2.line(frame, (cx, cy - 50), (cx - 40, cy - 10 + swing), (200, 200, 200), 6)
+            cv2.line(frame, (cx, cy - 50), (cx + 40, cy - 10 - swing), (200, 200, 200), 6)
+            cv2.line(frame, (cx, cy + 20), (cx - 25 + swing, cy + 100), (200, 200, 200), 7)
+            cv2.line(frame, (cx, cy + 20), (cx + 25 - swing, cy + 100), (200, 200, 200), 7)
+            writer.write(frame)
+    finally:
+        writer.release()
+    return path
+
+
+def make_pose_sequence(frames: int = 3000, points: int = 33, seed: int = 0) -> np.ndarray:
+    """벤치마크용 합성 포즈 좌표 (frames, points*2) float32, 0~1 범위 랜덤 워크"""
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(0.3, 0.7, size=(points, 2))
+    drift = np.cumsum(rng.normal(0, 0.002, size=(frames, points, 2)), axis=0)
+    return np.clip(base + drift, 0.0, 1.0).reshape(frames, points * 2).astype(np.float32)
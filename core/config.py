@@ -7,4 +7,70 @@ class Config:
     USER_DB_PATH = os.path.join(BASE_DIR, '..', 'database', 'users.db')
     ANALYSIS_DB_PATH = os.path.join(BASE_DIR, '..', 'database', 'analysis.db')
     UPLOAD_FOLDER = os.path.join(BASE_DIR, '..', 'uploads')
-    MODEL_FOLDER = os.path.join(BASE_DIR, '..', 'ai_models')
\ No newline at end of file
+    MODEL_FOLDER = os.path.join(BASE_DIR, '..', 'ai_models')
+    THUMBNAIL_FOLDER = os.path.join(BASE_DIR, '..', 'uploads', 'thumbnails')
+    CLIP_FOLDER = os.path.join(BASE_DIR, '..', 'uploads', 'clips')
+    # 단계별 측정값 내보내기 (None이면 기록 안 함)
+    METRICS_LOG_PATH = os.path.join(BASE_DIR, '..', 'database', 'metrics.jsonl')
+    METRICS_PROM_PATH = os.path.join(BASE_DIR, '..', 'database', 'drovis.prom')
+    # 분석 프로파일링 (환경변수 DROVIS_PROFILE=1 로 켜기)
+    PROFILE_ANALYSIS = os.environ.get('DROVIS_PROFILE', '0') == '1'
+    PROFILE_FOLDER = os.path.join(BASE_DIR, '..', 'uploads', 'profiles')
+    # 분석 서버 (server.py)
+    SERVER_HOST = '127.0.0.1'
+    SERVER_PORT = 8765
+    SERVER_WORKERS = 2
+    SERVER_MAX_UPLOAD_MB = 2048
+    # POST /models/active 로 분석 모델을 교체할 수 있는 사용자 (쉼표로 구분)
+    MODEL_ADMINS = [u for u in os.environ.get('DROVIS_MODEL_ADMINS', 'admin').split(',') if u]
+    # 분석 작업 대기열 (analysis.db jobs 테이블)
+    JOB_LEASE_SEC = 120       # 워커 임대 시간 (이 시간 동안 응답 없으면 다른 워커가 이어받음)
+    JOB_MAX_ATTEMPTS = 3
+    # 긴 영상 포즈 추출 체크포인트 (중단 시 이어서 처리)
+    POSE_CHECKPOINT_FOLDER = os.path.join(BASE_DIR, '..', 'uploads', 'pose_cache')
+    POSE_CHECKPOINT_MIN_FRAMES = 9000  # 이 프레임 수 이상인 영상만 (30fps 기준 5분)
+    POSE_CHUNK_FRAMES = 1800           # 청크/체크포인트 간격 (디코딩 프레임 수)
+    # 포즈 추출을 별도 프로세스에서 실행 (환경변수 DROVIS_POSE_PROCESS=1 로 켜기)
+    #  좌표는 공유 메모리 링 버퍼로 전달 (큐 pickle 없음), 이 모드에서는 체크포인트 미사용
+    POSE_PROCESS = os.environ.get('DROVIS_POSE_PROCESS', '0') == '1'
+    SHM_RING_FRAMES = 2048   # 링 버퍼 행 수 (가득 차면 포즈 프로세스가 읽힐 때까지 대기)
+    SHM_TIMEOUT_SEC = 120    # 이 시간 동안 상대 프로세스가 진행하지 않으면 중단
+    # 영상 디코딩 백엔드: 'opencv'(기본) | 'ffmpeg' | 'pyav' (pip install av)
+    DECODE_BACKEND = os.environ.get('DROVIS_DECODE_BACKEND', 'opencv')
+    # 모델 입력 특징 세트: 'xy'(66차원, 기본) | 'xy_vis'(99차원, visibility 포함 모델 필요)
+    FEATURE_SET = os.environ.get('DROVIS_FEATURE_SET', 'xy')
+    # 윈도우 평균 visibility가 이 값 미만이면 추론에서 제외 (0 = 사용 안 함)
+    MIN_WINDOW_VISIBILITY = float(os.environ.get('DROVIS_MIN_VISIBILITY', '0'))
+    # 분석 모델 (ai_models/<이름>.pt, 메타데이터는 <이름>.json 선택)
+    ACTIVE_MODEL = os.environ.get('DROVIS_MODEL', 'lstm_model')
+    MODEL_CACHE_SIZE = 3  # 메모리에 보관할 모델 수 (LRU)
+    # 앙상블 분석 (쉼표로 구분한 모델 이름, 비우면 ACTIVE_MODEL 하나만 사용)
+    ENSEMBLE_MODELS = [m for m in os.environ.get('DROVIS_ENSEMBLE', '').split(',') if m]
+    ENSEMBLE_WEIGHTS = None       # 모델별 가중치 (None = 동일)
+    ENSEMBLE_COMBINE = 'mean'     # 'mean'(가중 평균) | 'geometric'(가중 기하평균)
+    # 움직임 없는 구간 포즈 추정 생략 (환경변수 DROVIS_MOTION_GATE=1 로 켜기)
+    MOTION_GATE = os.environ.get('DROVIS_MOTION_GATE', '0') == '1'
+    MOTION_THRESHOLD = 0.002  # 축소 흑백 프레임에서 바뀐 픽셀 비율, 미만이면 정지
+    MOTION_HOLD = 15          # 움직임이 멈춘 뒤에도 이 프레임 수만큼은 계속 추정
+    MOTION_IDLE_SAMPLE = 15   # 정지 구간에서는 이 간격마다 1장만 추정
+    # 중복 영상 감지 (환경변수 DROVIS_DEDUP=1 로 켜기): 분석 전 지문 비교 → 같은/겹치는 영상이면 기존 결과·포즈 재사용
+    DEDUP = os.environ.get('DROVIS_DEDUP', '0') == '1'
+    FINGERPRINT_INTERVAL_SEC = 0.5  # 지문 샘플 간격 (초)
+    FINGERPRINT_MAX_BITS = 24       # 256비트 해시 해밍 거리 이하면 같은 장면
+    DEDUP_MIN_MATCH = 0.9           # 겹친 구간에서 같은 장면인 샘플 비율
+    # 행동 임베딩 (윈도우별 LSTM 마지막 hidden state) 저장 → 유사 행동 검색
+    SAVE_EMBEDDINGS = os.environ.get('DROVIS_EMBEDDINGS', '1') == '1'
+    EMBED_STRIDE = 15     # 윈도우 이 간격마다 1개 저장 (30fps 기준 0.5초)
+    EMBED_FOLDER = os.path.join(BASE_DIR, '..', 'uploads', 'embeddings')
+    EMBED_NPROBE = 8      # 근사 검색(IVF) 시 살펴볼 클러스터 수
+    # 보관 기간 / 정리 (python -m core.services.maintenance, 서버·워커는 주기 실행)
+    RETENTION_GRACE_HOURS = 24      # 이보다 최근 파일은 참조가 없어도 유지 (분석 중인 산출물)
+    RETENTION_COMPACT_DAYS = 30     # 이보다 오래된 기록의 윈도우별 라벨 목록 → 라벨별 개수
+    RETENTION_RECORD_DAYS = int(os.environ.get('DROVIS_RETENTION_DAYS', '0'))  # 기록 보관 기간 (0 = 무기한)
+    MAINTENANCE_INTERVAL_HOURS = 24  # 주기 실행 간격 (0 = 끔)
+    # 로그인 (bcrypt는 작업 스레드 풀에서)
+    AUTH_WORKERS = 2
+    AUTH_MAX_FAILURES = 5         # 이 횟수만큼 연속 실패하면 (AUTH_FAILURE_WINDOW_SEC 안)
+    AUTH_FAILURE_WINDOW_SEC = 300
+    AUTH_LOCKOUT_SEC = 60         # 이 시간 동안 해당 아이디 로그인 거절 (bcrypt 검사 없이)
+    AUTH_CACHE_SEC = 300          # 성공한 인증 보관 시간 (HTTP Basic 인증 요청마다 bcrypt 반복 방지, 0 = 끔)
@@ -1,2 +1,6 @@
 from .user_DB import create_user_table
 from .analysis_DB import create_analysis_table
+from .job_DB import create_job_table
+from .roi_DB import create_roi_table
+from .fingerprint_DB import create_fingerprint_table
+from .embedding_DB import create_embedding_table
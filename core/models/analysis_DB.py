@@ -1,6 +1,21 @@
 # core/models/analysis_DB.py
 from core.db import get_analysis_connection
 
+# 기록 조회/필터용 요약 컬럼 (기존 DB에는 ALTER TABLE로 추가)
+SUMMARY_COLUMNS = {
+    "history_id": "INTEGER",                # history.json 기록 id (가져오기 중복 방지)
+    "video_path": "TEXT",
+    "analyzed_at": "TEXT NOT NULL DEFAULT ''",   # 분석 시각 (YYYY-MM-DD HH:MM, 로컬)
+    "risk_rank": "INTEGER NOT NULL DEFAULT 0",   # 상=3 / 중=2 / 하=1 (정렬용)
+    "pct_normal": "REAL NOT NULL DEFAULT 0",     # 윈도우 라벨 비율(%)
+    "pct_loitering": "REAL NOT NULL DEFAULT 0",
+    "pct_handover": "REAL NOT NULL DEFAULT 0",
+    "pct_reapproach": "REAL NOT NULL DEFAULT 0",
+    "event_count": "INTEGER NOT NULL DEFAULT 0",
+    "model_version": "TEXT",
+    "record": "TEXT",                       # 기록 JSON (윈도우별 라벨 목록 대신 라벨별 개수)
+}
+
 
 def create_analysis_table():
     conn = get_analysis_connection()
@@ -17,5 +32,32 @@ def create_analysis_table():
 				);
     """
     )
+    existing = {row[1] for row in cur.execute("PRAGMA table_info(analysis)")}
+    for name, decl in SUMMARY_COLUMNS.items():
+        if name not in existing:
+            cur.execute(f"ALTER TABLE analysis ADD COLUMN {name} {decl}")
+    # 필터/정렬 조합별 색인 (모두 user_id로 시작, 마지막 id는 키셋 페이지 경계용)
+    cur.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_analysis_history ON analysis (history_id)"
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_analysis_user_date ON analysis (user_id, analyzed_at, id)"
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_analysis_user_risk "
+        "ON analysis (user_id, risk_rank, analyzed_at, id)"
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_analysis_user_file ON analysis (user_id, filename, id)"
+    )
+    for label in ("normal", "loitering", "handover", "reapproach"):
+        cur.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_analysis_user_{label} "
+            f"ON analysis (user_id, pct_{label}, id)"
+        )
+    # 가져오기 상태 등 (키-값)
+    cur.execute(
+        "CREATE TABLE IF NOT EXISTS analysis_meta (key TEXT PRIMARY KEY, value TEXT)"
+    )
     conn.commit()
     conn.close()
@@ -0,0 +1,30 @@
+# core/models/embedding_DB.py
+from core.db import get_analysis_connection
+
+
+def create_embedding_table():
+    conn = get_analysis_connection()
+    cur = conn.cursor()
+    # 분석한 영상별 행동 임베딩 (유사 행동 검색용, 벡터는 npy 파일)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS embedding_clip (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            video_path TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            model_version TEXT NOT NULL,    -- 같은 모델 버전끼리만 비교 가능
+            emb_path TEXT NOT NULL,         -- (N, hidden) float16
+            frames BLOB NOT NULL,           -- 임베딩 행별 윈도우 시작 프레임 (int64)
+            fps REAL,
+            count INTEGER NOT NULL,
+            created_at TEXT NOT NULL
+        );
+    """
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_embedding_model ON embedding_clip (model_version, user_id)"
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_embedding_video ON embedding_clip (video_path)")
+    conn.commit()
+    conn.close()
@@ -0,0 +1,52 @@
+# core/models/fingerprint_DB.py
+from core.db import get_analysis_connection
+
+
+def create_fingerprint_table():
+    conn = get_analysis_connection()
+    cur = conn.cursor()
+    # 분석한 영상의 지문 (중복/겹치는 영상 감지용)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS video_fingerprint (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            video_path TEXT NOT NULL,
+            content_key TEXT NOT NULL,      -- 크기 + 앞/뒤 1MB 해시 (바이트가 같은 사본)
+            fps REAL,
+            frame_count INTEGER,
+            interval REAL NOT NULL,         -- 샘플 간격 (초)
+            hashes BLOB NOT NULL,           -- 샘플별 256비트 dHash (샘플 수 x 32바이트)
+            feature_set TEXT,
+            npy_path TEXT,                  -- 정규화 포즈 시퀀스
+            frames_path TEXT,               -- 시퀀스 행 → 원본 프레임 번호
+            npy_mtime INTEGER,              -- 같은 이름 영상 분석으로 npy가 덮어써졌는지 확인용
+            result TEXT,                    -- 분석 결과 JSON
+            created_at TEXT NOT NULL,
+            user_id TEXT                    -- 분석한 사용자 (결과/포즈 재사용은 같은 사용자끼리만)
+        );
+    """
+    )
+    existing = {row[1] for row in cur.execute("PRAGMA table_info(video_fingerprint)")}
+    if "user_id" not in existing:  # 기존 DB (user_id 없는 기록은 재사용 대상에서 제외)
+        cur.execute("ALTER TABLE video_fingerprint ADD COLUMN user_id TEXT")
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_fingerprint_content ON video_fingerprint (content_key)"
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_fingerprint_user ON video_fingerprint (user_id, content_key)"
+    )
+    # 해시 구간(band) 값 → 영상. 같은 값을 가진 영상만 정밀 비교
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS fingerprint_key (
+            key INTEGER NOT NULL,
+            video_id INTEGER NOT NULL
+        );
+    """
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_fingerprint_key ON fingerprint_key (key)")
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_fingerprint_key_video ON fingerprint_key (video_id)"
+    )
+    conn.commit()
+    conn.close()
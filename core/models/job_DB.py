@@ -0,0 +1,34 @@
+# core/models/job_DB.py
+from core.db import get_analysis_connection
+
+
+def create_job_table():
+    conn = get_analysis_connection()
+    cur = conn.cursor()
+    # 여러 워커가 동시에 읽고 쓰도록 WAL 모드
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            video_path TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',    -- queued / running / done / failed
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            lease_owner TEXT,                         -- 작업 중인 워커
+            lease_expires REAL,                       -- 임대 만료 (epoch 초)
+            result TEXT,                              -- 분석 결과 JSON
+            message TEXT,
+            analysis_id INTEGER,                      -- analysis 테이블 id
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+    """
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, lease_expires)"
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_user ON jobs (user_id, id)")
+    conn.commit()
+    conn.close()
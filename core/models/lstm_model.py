@@ -9,9 +9,13 @@ class LSTMModel(nn.Module):
         self.fc1 = nn.Linear(hidden_size, 32)
         self.fc2 = nn.Linear(32, num_classes)
 
-    def forward(self, x):
+    def forward(self, x, return_embedding=False):
         out, _ = self.lstm(x)
         out = out[:, -1, :]
+        # 마지막 시점 hidden state = 윈도우 행동 임베딩 (유사 행동 검색용)
+        embedding = out
         out = torch.relu(self.fc1(out))
         out = self.fc2(out)
+        if return_embedding:
+            return out, embedding
         return out
@@ -0,0 +1,24 @@
+# core/models/roi_DB.py
+from core.db import get_analysis_connection
+
+
+def create_roi_table():
+    conn = get_analysis_connection()
+    cur = conn.cursor()
+    # 카메라별 관심 영역 (좌표는 프레임 크기 대비 0~1 비율)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS camera_roi (
+            camera TEXT PRIMARY KEY,
+            x REAL NOT NULL,
+            y REAL NOT NULL,
+            w REAL NOT NULL,
+            h REAL NOT NULL,
+            upscale REAL NOT NULL DEFAULT 1.0,   -- 자른 영역 확대 배율 (멀리 있는 작은 사람용)
+            memo TEXT,
+            updated_at TEXT NOT NULL
+        );
+    """
+    )
+    conn.commit()
+    conn.close()
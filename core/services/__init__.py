@@ -1,4 +1,4 @@
-from .auth import register_user, verify_user
+from .auth import AUTH, register_user, verify_user
 from .save_analysis import save_analysis_result
 
 # from .history import fetch_user_history
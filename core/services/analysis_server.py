@@ -0,0 +1,307 @@
+# core/services/analysis_server.py
+import base64
+import io
+import itertools
+import json
+import os
+import re
+import threading
+import uuid
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from core.config import Config
+from core.services import embedding_index, export, job_queue
+from core.services.auth import verify_user
+from core.services.model_registry import MODELS
+
+JOB_PATH = re.compile(r"^/jobs/(\d+)$")
+SAFE_NAME = re.compile(r"[^0-9A-Za-z가-힣._-]+")
+
+
+class JobManager:
+    """
+    분석 작업 대기열(analysis.db jobs 테이블) + 워커 스레드 풀.
+    predict 모듈(모델 포함)은 start()에서 한 번만 import → 요청마다 로드 비용 없음.
+    서버가 죽어도 작업은 DB에 남고, 재시작하면 임대가 만료된 작업부터 이어서 처리.
+    """
+
+    def __init__(self, workers: int = 2, analyze=None, poll_sec: float = 0.5):
+        self.workers = max(int(workers), 1)
+        self.analyze = analyze
+        self.poll_sec = poll_sec
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self.analyze is None:
+            from core.services.predict import predict_from_video  # 모델 미리 로드
+
+            self.analyze = predict_from_video
+        self._stop.clear()
+        for i in range(self.workers):
+            t = threading.Thread(
+                target=job_queue.run_worker,
+                kwargs={
+                    "analyze": self.analyze,
+                    "worker_id": f"server-{os.getpid()}-{i}",
+                    "stop_event": self._stop,
+                    "poll_sec": self.poll_sec,
+                },
+                name=f"analysis-worker-{i}",
+                daemon=True,
+            )
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def submit(self, username: str, video_path: str) -> dict:
+        return self.view(job_queue.get_job(job_queue.enqueue(username, video_path)))
+
+    def get(self, job_id: int):
+        return job_queue.get_job(job_id)
+
+    def list(self, username: str = None):
+        return job_queue.list_jobs(username)
+
+    # 목록용 요약 (결과 본문 제외)
+    @staticmethod
+    def view(job: dict) -> dict:
+        return {k: v for k, v in job.items() if k != "result"}
+
+
+def make_handler(manager: JobManager, require_auth: bool = True, max_upload_mb: int = None):
+    max_bytes = (max_upload_mb or Config.SERVER_MAX_UPLOAD_MB) * 2**20
+
+    class AnalysisHandler(BaseHTTPRequestHandler):
+        server_version = "DrovisAnalysis/1.0"
+
+        def log_message(self, fmt, *args):
+            print(f"[SERVER] {self.address_string()} {fmt % args}")
+
+        # ---- 공통
+        def _send(self, status, body):
+            data = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _error(self, status, message):
+            self._send(status, {"success": False, "message": message})
+
+        # HTTP Basic 인증 → users.db 검증. 인증 끄면 X-User 헤더 또는 guest
+        def _user(self):
+            if not require_auth:
+                return self.headers.get("X-User", "guest")
+            header = self.headers.get("Authorization", "")
+            if not header.startswith("Basic "):
+                return None
+            try:
+                username, _, password = (
+                    base64.b64decode(header[6:]).decode("utf-8").partition(":")
+                )
+            except (ValueError, UnicodeDecodeError):
+                return None
+            return username if verify_user(username, password) else None
+
+        def _auth_or_401(self):
+            user = self._user()
+            if user is None:
+                self.send_response(HTTPStatus.UNAUTHORIZED)
+                self.send_header("WWW-Authenticate", 'Basic realm="drovis"')
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            return user
+
+        # Content-Length 헤더 (없으면 0, 숫자가 아니면 None)
+        def _content_length(self):
+            try:
+                return int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                return None
+
+        def _read_json(self):
+            length = self._content_length()
+            if length is None or length <= 0 or length > 2**20:
+                return None
+            try:
+                return json.loads(self.rfile.read(length).decode("utf-8"))
+            except (ValueError, UnicodeDecodeError):
+                return None
+
+        # ---- 라우팅
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/health":
+                return self._send(HTTPStatus.OK, {"success": True, "workers": manager.workers})
+            user = self._auth_or_401()
+            if user is None:
+                return
+            if url.path == "/jobs":
+                return self._send(HTTPStatus.OK, {"success": True, "jobs": manager.list(user)})
+            if url.path == "/models":
+                return self._send(HTTPStatus.OK, {"success": True, "models": MODELS.list()})
+            if url.path == "/similar":
+                return self._similar(user, parse_qs(url.query))
+            if url.path == "/export":
+                return self._export(user, parse_qs(url.query))
+            m = JOB_PATH.match(url.path)
+            if m:
+                job = manager.get(int(m.group(1)))
+                if job is None or job["user_id"] != user:
+                    return self._error(HTTPStatus.NOT_FOUND, "작업을 찾을 수 없습니다.")
+                return self._send(HTTPStatus.OK, {"success": True, "job": job})
+            self._error(HTTPStatus.NOT_FOUND, "지원하지 않는 경로입니다.")
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            user = self._auth_or_401()
+            if user is None:
+                return
+            if url.path == "/jobs":
+                body = self._read_json()
+                path = body.get("path") if isinstance(body, dict) else None
+                if not path or not os.path.isfile(path):
+                    return self._error(HTTPStatus.BAD_REQUEST, f"영상 파일이 존재하지 않습니다: {path}")
+                return self._send(HTTPStatus.ACCEPTED, {"success": True, "job": manager.submit(user, path)})
+            if url.path == "/jobs/upload":
+                return self._upload(user, parse_qs(url.query))
+            if url.path == "/models/active":
+                return self._activate_model(user)
+            self._error(HTTPStatus.NOT_FOUND, "지원하지 않는 경로입니다.")
+
+        # 분석 모델 교체 (Config.MODEL_ADMINS 사용자만, 진행 중인 작업은 이전 모델로 끝까지)
+        def _activate_model(self, user):
+            if user not in Config.MODEL_ADMINS:
+                return self._error(HTTPStatus.FORBIDDEN, "모델을 교체할 권한이 없습니다.")
+            body = self._read_json()
+            name = body.get("name") if isinstance(body, dict) else None
+            if not name or SAFE_NAME.search(name):
+                return self._error(HTTPStatus.BAD_REQUEST, f"잘못된 모델 이름: {name}")
+            try:
+                info = MODELS.activate(name)
+            except FileNotFoundError as e:
+                return self._error(HTTPStatus.NOT_FOUND, str(e))
+            self._send(HTTPStatus.OK, {"success": True, "model": info})
+
+        # 유사 행동 검색 (본인이 분석한 영상끼리만)
+        def _similar(self, user, query):
+            video = (query.get("video") or [None])[0]
+            try:
+                sec = float((query.get("sec") or ["0"])[0])
+                k = min(max(int((query.get("k") or ["10"])[0]), 1), 100)
+            except ValueError:
+                return self._error(HTTPStatus.BAD_REQUEST, "sec, k는 숫자여야 합니다.")
+            if not video:
+                return self._error(HTTPStatus.BAD_REQUEST, "video 경로가 필요합니다.")
+            approx = (query.get("approx") or ["0"])[0] == "1"
+            out = embedding_index.search_similar(video, sec, k, approx, user_id=user)
+            self._send(HTTPStatus.OK if out["success"] else HTTPStatus.NOT_FOUND, out)
+
+        # 분석 결과 내보내기 (본인 기록만, CSV/JSONL 스트리밍 - 응답 길이 없이 연결 종료로 끝)
+        def _export(self, user, query):
+            arg = lambda name: (query.get(name) or [None])[0]
+            fmt, detail = arg("format") or "jsonl", arg("detail") or "summary"
+            if fmt not in ("csv", "jsonl"):
+                return self._error(HTTPStatus.BAD_REQUEST, "format은 csv 또는 jsonl 입니다.")
+            if detail not in export.COLUMNS:
+                return self._error(HTTPStatus.BAD_REQUEST, f"지원하지 않는 detail: {detail}")
+            try:
+                min_pct = {
+                    label: float(arg(f"min_{label.lower()}"))
+                    for label in export.LABELS if arg(f"min_{label.lower()}")
+                }
+            except ValueError:
+                return self._error(HTTPStatus.BAD_REQUEST, "min_<라벨> 값은 숫자여야 합니다.")
+            try:
+                records = export.iter_records(
+                    user,
+                    risk=query.get("risk"),
+                    date_from=arg("from"),
+                    date_to=arg("to"),
+                    filename=arg("filename"),
+                    min_pct=min_pct,
+                )
+                first = next(records, None)  # 조건 오류는 응답 헤더 전에 확인
+            except ValueError as e:
+                return self._error(HTTPStatus.BAD_REQUEST, str(e))
+            self.send_response(HTTPStatus.OK)
+            self.send_header(
+                "Content-Type", "text/csv; charset=utf-8" if fmt == "csv" else "application/x-ndjson"
+            )
+            self.send_header("Content-Disposition", f'attachment; filename="drovis_{detail}.{fmt}"')
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            out = io.TextIOWrapper(self.wfile, encoding="utf-8", newline="", write_through=False)
+            try:
+                head = [first] if first is not None else []
+                rows = export.iter_rows(itertools.chain(head, records), detail)
+                export.write_rows(rows, out, fmt, detail)
+                out.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                out.detach()
+
+        # 영상 본문 업로드 → uploads/incoming 에 저장 후 작업 등록
+        def _upload(self, user, query):
+            name = SAFE_NAME.sub("_", os.path.basename((query.get("filename") or ["upload.mp4"])[0]))
+            if not name.lower().endswith(".mp4"):
+                return self._error(HTTPStatus.BAD_REQUEST, "mp4 파일만 업로드할 수 있습니다.")
+            length = self._content_length()
+            if length is None:
+                return self._error(HTTPStatus.BAD_REQUEST, "Content-Length가 숫자가 아닙니다.")
+            if length <= 0:
+                return self._error(HTTPStatus.LENGTH_REQUIRED, "Content-Length가 필요합니다.")
+            if length > max_bytes:
+                return self._error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "업로드 용량 초과")
+
+            folder = os.path.join(Config.UPLOAD_FOLDER, "incoming")
+            os.makedirs(folder, exist_ok=True)
+            path = os.path.join(folder, f"{uuid.uuid4().hex[:8]}_{name}")
+            remaining = length
+            with open(path, "wb") as f:
+                while remaining > 0:
+                    chunk = self.rfile.read(min(remaining, 1 << 20))
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    remaining -= len(chunk)
+            if remaining:
+                os.remove(path)
+                return self._error(HTTPStatus.BAD_REQUEST, "업로드가 중간에 끊겼습니다.")
+            self._send(HTTPStatus.ACCEPTED, {"success": True, "job": manager.submit(user, path)})
+
+    return AnalysisHandler
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8765, workers: int = 2, *,
+                require_auth: bool = True, analyze=None):
+    """분석 서버 생성 (port=0 이면 빈 포트 자동 할당). serve_forever()는 호출 측에서"""
+    manager = JobManager(workers=workers, analyze=analyze)
+    manager.start()
+    server = ThreadingHTTPServer((host, port), make_handler(manager, require_auth))
+    server.daemon_threads = True
+    server.manager = manager
+    return server
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, workers: int = 2, require_auth: bool = True):
+    server = make_server(host, port, workers, require_auth=require_auth)
+    print(f"[SERVER] Drovis 분석 서버 시작: http://{host}:{server.server_address[1]} (workers={workers})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.manager.stop(timeout=5)
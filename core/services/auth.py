@@ -1,33 +1,149 @@
+import hashlib
+import hmac
+import os
 import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import bcrypt
+
+from core.config import Config
 from core.db import get_user_connection
 
-# 회원가입
-def register_user(username, password, email):
-    conn = get_user_connection()     # DB 연결
-    cur = conn.cursor()
-    hashed_pw = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
-    try:
-        cur.execute(
-            "INSERT INTO users (username, password, email) VALUES (?, ?, ?)",
-            (username, hashed_pw, email),
+# 없는 아이디도 같은 시간이 걸리도록 비교할 더미 해시 (아이디 존재 여부 노출 방지, gensalt 기본 비용 12)
+_DUMMY_HASH = "$2b$12$BoNFD1CpW9y3BkXCGG38YOkouJJdpUlK6aQcZTsboPhlvy3CjRTOC"
+LOCKED_MESSAGE = "로그인 실패가 많아 잠시 후 다시 시도해주세요."
+
+
+class AuthService:
+    """
+    로그인/회원가입 (bcrypt는 작업 스레드 풀에서 → GUI/서버 스레드가 기다리지 않음)
+      - 작업 스레드마다 users.db 연결 1개를 계속 사용 (username UNIQUE 색인으로 조회)
+      - 아이디별 연속 실패 횟수 제한: 잠긴 동안은 bcrypt 없이 바로 거절
+      - 성공한 인증은 잠시 보관 (HTTP Basic 인증처럼 요청마다 같은 비밀번호를 검사하는 경우)
+    """
+
+    def __init__(self, workers: int = None):
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers or Config.AUTH_WORKERS, thread_name_prefix="auth"
         )
-        conn.commit()
-        return True, "회원가입 성공"
-    except sqlite3.IntegrityError:
-        return False, "이미 존재하는 아이디 또는 이메일"
-    finally:
-        conn.close()
-
-# 로그인 검증
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._failures = {}  # username -> [실패 시각, ...] (최근 창 안)
+        self._locked_until = {}  # username -> 잠금 해제 시각
+        self._verified = {}  # (username, 비밀번호 HMAC) -> 만료 시각
+        self._secret = os.urandom(32)  # 보관용 키 (비밀번호 원문/해시를 메모리에 두지 않음)
+
+    # ---- 연결 (작업 스레드별 재사용, DB 경로가 바뀌면 새로)
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.path != Config.USER_DB_PATH:
+            if conn is not None:
+                conn.close()
+            conn = self._local.conn = get_user_connection()
+            self._local.path = Config.USER_DB_PATH
+        return conn
+
+    # ---- 실패 횟수 제한
+    def retry_after(self, username: str) -> float:
+        """잠금 남은 시간(초), 잠기지 않았으면 0"""
+        with self._lock:
+            until = self._locked_until.get(username, 0.0)
+        return max(until - time.monotonic(), 0.0)
+
+    def _record_failure(self, username: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            window = [t for t in self._failures.get(username, []) if now - t < Config.AUTH_FAILURE_WINDOW_SEC]
+            window.append(now)
+            if len(window) >= Config.AUTH_MAX_FAILURES:
+                self._locked_until[username] = now + Config.AUTH_LOCKOUT_SEC
+                window = []
+            self._failures[username] = window
+            if len(self._failures) > 10000:  # 무작위 아이디 대입으로 커지지 않도록 오래된 항목 정리
+                self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        self._failures = {
+            u: ts for u, ts in self._failures.items() if ts and now - ts[-1] < Config.AUTH_FAILURE_WINDOW_SEC
+        }
+        self._locked_until = {u: t for u, t in self._locked_until.items() if t > now}
+
+    def _record_success(self, username: str, token: bytes) -> None:
+        with self._lock:
+            self._failures.pop(username, None)
+            self._locked_until.pop(username, None)
+            if Config.AUTH_CACHE_SEC > 0:
+                self._verified[(username, token)] = time.monotonic() + Config.AUTH_CACHE_SEC
+
+    def _token(self, password: str) -> bytes:
+        return hmac.new(self._secret, password.encode(), hashlib.sha256).digest()
+
+    def _cached(self, username: str, token: bytes) -> bool:
+        with self._lock:
+            expires = self._verified.get((username, token))
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self._verified[(username, token)]
+                return False
+            return True
+
+    # ---- 작업 (스레드 풀에서 실행)
+    def _login(self, username: str, password: str, token: bytes):
+        row = self._conn().execute(
+            "SELECT password FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        stored = row[0] if row else _DUMMY_HASH
+        if bcrypt.checkpw(password.encode(), stored.encode()) and row:
+            self._record_success(username, token)
+            return True, "로그인 성공"
+        self._record_failure(username)
+        return False, "아이디 또는 비밀번호가 틀렸습니다."
+
+    def _register(self, username: str, password: str, email: str):
+        hashed_pw = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+        conn = self._conn()
+        try:
+            conn.execute(
+                "INSERT INTO users (username, password, email) VALUES (?, ?, ?)",
+                (username, hashed_pw, email),
+            )
+            conn.commit()
+            return True, "회원가입 성공"
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            return False, "이미 존재하는 아이디 또는 이메일"
+
+    # ---- 공개 API (Future 반환, 결과는 (성공 여부, 메시지))
+    def login(self, username: str, password: str) -> Future:
+        """잠긴 아이디 / 최근 성공한 같은 비밀번호는 bcrypt 없이 바로 완료된 Future"""
+        token = self._token(password)
+        if self.retry_after(username) > 0:
+            return _done((False, LOCKED_MESSAGE))
+        if self._cached(username, token):
+            return _done((True, "로그인 성공"))
+        return self._pool.submit(self._login, username, password, token)
+
+    def register(self, username: str, password: str, email: str) -> Future:
+        return self._pool.submit(self._register, username, password, email)
+
+
+def _done(value) -> Future:
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+AUTH = AuthService()
+
+
+# 회원가입 (호출한 스레드에서 완료까지 대기, GUI에서는 AUTH.register 사용)
+def register_user(username, password, email):
+    return AUTH.register(username, password, email).result()
+
+
+# 로그인 검증 (호출한 스레드에서 완료까지 대기, GUI에서는 AUTH.login 사용)
 def verify_user(username, password):
-    conn = get_user_connection()     # DB 연결
-    cur = conn.cursor()
-    cur.execute("SELECT password FROM users WHERE username = ?", (username,))
-    row = cur.fetchone()
-    conn.close()
-
-    # 입력된 비밀번호화 해시 비교
-    if row and bcrypt.checkpw(password.encode(), row[0].encode()):
-        return True
-    return False
+    return AUTH.login(username, password).result()[0]
@@ -0,0 +1,116 @@
+# core/services/decode.py
+import cv2
+import numpy as np
+
+from core.config import Config
+
+try:  # 선택 의존성 (pip install av)
+    import av
+except ImportError:
+    av = None
+
+BACKENDS = ("opencv", "ffmpeg", "pyav")
+
+
+def available_backends() -> list:
+    return [b for b in BACKENDS if b != "pyav" or av is not None]
+
+
+class OpenCVReader:
+    """
+    cv2.VideoCapture 래퍼.
+      opencv: 플랫폼 기본 백엔드 (기존 동작)
+      ffmpeg: CAP_FFMPEG 강제 (Windows에서 MSMF 대신)
+    read()는 같은 BGR 버퍼를 재사용하므로 보관하려면 복사해야 함.
+    """
+
+    def __init__(self, path: str, name: str = "opencv"):
+        self.name = name
+        api = cv2.CAP_FFMPEG if name == "ffmpeg" else cv2.CAP_ANY
+        self.cap = cv2.VideoCapture(path, api)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 0.0
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        self._frame = None
+
+    def is_open(self) -> bool:
+        return self.cap.isOpened()
+
+    def grab(self) -> bool:
+        """다음 프레임으로 이동만 (BGR 변환/복사 없음)"""
+        return self.cap.grab()
+
+    def read(self):
+        ok, frame = self.cap.read(self._frame)
+        if ok:
+            self._frame = frame
+        return ok, frame
+
+    def release(self) -> None:
+        self.cap.release()
+
+
+class PyAVReader:
+    """PyAV(FFmpeg 바인딩) 디코더. 멀티스레드 디코딩 사용, grab()은 디코딩만 하고 변환 생략"""
+
+    name = "pyav"
+
+    def __init__(self, path: str):
+        self.container = av.open(path)
+        self.stream = self.container.streams.video[0]
+        self.stream.thread_type = "AUTO"
+        self.fps = float(self.stream.average_rate or 0.0)
+        self.frame_count = int(self.stream.frames or 0)
+        self._frames = self.container.decode(self.stream)
+
+    def is_open(self) -> bool:
+        return True
+
+    def _next(self):
+        try:
+            return next(self._frames)
+        except (StopIteration, av.error.FFmpegError):
+            return None
+
+    def grab(self) -> bool:
+        return self._next() is not None
+
+    def read(self):
+        frame = self._next()
+        if frame is None:
+            return False, None
+        return True, frame.to_ndarray(format="bgr24")
+
+    def release(self) -> None:
+        self.container.close()
+
+
+def open_video(path: str, backend: str = None):
+    """
+    디코더 열기. backend: "opencv" | "ffmpeg" | "pyav" (None이면 Config.DECODE_BACKEND)
+    pyav가 설치되어 있지 않으면 opencv로 대체.
+    """
+    backend = backend or Config.DECODE_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"지원하지 않는 디코딩 백엔드: {backend}")
+    if backend == "pyav":
+        if av is not None:
+            try:
+                return PyAVReader(path)
+            except (OSError, ValueError, IndexError) as e:
+                print(f"[WARN] PyAV로 열 수 없어 OpenCV 사용: {e}")
+        else:
+            print("[WARN] PyAV 미설치 → OpenCV 디코딩 사용")
+        backend = "opencv"
+    return OpenCVReader(path, backend)
+
+
+class RGBConverter:
+    """BGR → RGB 변환을 미리 할당한 버퍼에 (프레임마다 새 배열 생성 안 함)"""
+
+    def __init__(self):
+        self._dst = None
+
+    def __call__(self, frame_bgr):
+        if self._dst is None or self._dst.shape != frame_bgr.shape:
+            self._dst = np.empty_like(frame_bgr)
+        return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB, dst=self._dst)
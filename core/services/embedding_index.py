@@ -0,0 +1,355 @@
+# core/services/embedding_index.py
+"""
+행동 임베딩 저장 / 유사 행동 검색
+
+  - 분석 시 윈도우 Config.EMBED_STRIDE 개마다 LSTM 마지막 hidden state를 float16 npy로 저장
+    (영상/윈도우 시작 프레임은 analysis.db embedding_clip 테이블)
+  - 검색: 같은 모델 버전의 임베딩 전체를 코사인 유사도로 비교
+      exact: NumPy 행렬곱 1회 (전수 비교)
+      approx: IVF (k-means 클러스터 → 쿼리와 가까운 nprobe개 클러스터만 비교)
+  - 한 영상의 인접 윈도우가 결과를 채우지 않도록 같은 영상은 min_gap_sec 이상 떨어진 것만
+
+    python -m core.services.embedding_index C:/cctv/day1/cam01.mp4 83.5 --k 10 --approx
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+import torch
+
+from core.config import Config
+from core.db import get_analysis_connection
+from core.services.timeline import DEFAULT_FPS, format_timestamp
+
+EMB_SUFFIX = ".emb.npy"
+
+
+def embed_windows(windows, net, index=None, batch_size: int = 256) -> np.ndarray:
+    """윈도우 → 임베딩 (N, hidden) float32. index: 임베딩을 만들 윈도우 번호"""
+    device = next(net.parameters()).device
+    total = len(windows) if index is None else len(index)
+    out = []
+    with torch.no_grad():
+        for i in range(0, total, batch_size):
+            part = windows[i:i + batch_size] if index is None else windows[index[i:i + batch_size]]
+            batch = torch.from_numpy(np.array(part, dtype=np.float32, order="C")).to(device)
+            out.append(net(batch, return_embedding=True)[1].cpu().numpy())
+    if not out:
+        return np.empty((0, net.lstm.hidden_size), dtype=np.float32)
+    return np.vstack(out)
+
+
+def save_clip(user_id: str, video_path: str, model_version: str, embeddings, frames,
+              fps: float, folder: str = None) -> int:
+    """영상 1개 임베딩 저장 (같은 사용자/영상/모델 버전의 기존 기록은 교체). Returns: 기록 id"""
+    folder = folder or Config.EMBED_FOLDER
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.abspath(video_path)
+    key = hashlib.sha1(f"{user_id}|{path}|{model_version}".encode("utf-8")).hexdigest()[:8]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    emb_path = os.path.join(folder, f"{stem}.{key}{EMB_SUFFIX}")
+    # 임시 파일에 쓴 뒤 교체 (검색 색인이 쓰는 도중의 파일을 읽지 않도록)
+    fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.asarray(embeddings, dtype=np.float16))
+        os.replace(tmp_path, emb_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    frames = np.asarray(frames, dtype=np.int64)
+    conn = get_analysis_connection()
+    try:
+        conn.execute(
+            "DELETE FROM embedding_clip WHERE user_id = ? AND video_path = ? AND model_version = ?",
+            (user_id, path, model_version),
+        )
+        cur = conn.execute(
+            """
+            INSERT INTO embedding_clip (user_id, video_path, filename, model_version, emb_path,
+                frames, fps, count, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (user_id, path, os.path.basename(path), model_version, emb_path, frames.tobytes(),
+             float(fps or 0.0), len(frames), time.strftime("%Y-%m-%d %H:%M:%S")),
+        )
+        conn.commit()
+        return cur.lastrowid
+    finally:
+        conn.close()
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    return x / np.maximum(np.linalg.norm(x, axis=-1, keepdims=True), 1e-8)
+
+
+class IVFIndex:
+    """
+    근사 검색용 역색인 (spherical k-means).
+    벡터를 nlist개 클러스터로 나누고, 클러스터 순서로 정렬한 번호만 보관 (벡터는 복사하지 않음)
+    """
+
+    def __init__(self, vectors: np.ndarray, nlist: int = None, iters: int = 10, seed: int = 0):
+        n = len(vectors)
+        # 클러스터 수: √N (최대 256 → 전체 배정 비용과 검색 시 비교 범위의 균형)
+        nlist = max(1, min(int(nlist or np.sqrt(n)), n, 256))
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(n, size=min(n, nlist * 40), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+        for _ in range(iters):
+            assign = (sample @ centroids.T).argmax(axis=1)
+            onehot = np.zeros((len(sample), nlist), dtype=np.float32)
+            onehot[np.arange(len(sample)), assign] = 1.0
+            sums = onehot.T @ sample
+            empty = onehot.sum(axis=0) == 0
+            sums[empty] = centroids[empty]  # 빈 클러스터는 이전 중심 유지
+            centroids = _normalize(sums)
+        assign = np.concatenate([
+            (vectors[i:i + 65536] @ centroids.T).argmax(axis=1) for i in range(0, n, 65536)
+        ])
+        # 배정된 벡터가 없는 클러스터는 제외 (같은 벡터가 많으면 중심이 겹칠 수 있음)
+        used = np.unique(assign)
+        self.centroids = centroids[used]
+        self.nlist = len(used)
+        assign = np.searchsorted(used, assign)
+        self.order = np.argsort(assign, kind="stable")
+        self.bounds = np.searchsorted(assign[self.order], np.arange(self.nlist + 1))
+
+    def candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        lists = np.argsort(-(self.centroids @ query))[:max(int(nprobe), 1)]
+        return np.concatenate([self.order[self.bounds[c]:self.bounds[c + 1]] for c in lists])
+
+
+class EmbeddingIndex:
+    """
+    모델 버전 1개의 임베딩 전체 (메모리, 코사인 정규화).
+    user_id를 주면 그 사용자의 영상만.
+    load() 이후에는 바꾸지 않음 → 새 영상이 저장되면 get_index가 새 객체를 만들어 교체
+    (다른 스레드가 검색 중인 배열/목록은 그대로 유지)
+    """
+
+    def __init__(self, model_version: str, user_id: str = None):
+        self.model_version = model_version
+        self.user_id = user_id
+        self.clips = {}  # id → {"video_path", "filename", "fps", "user_id"}
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        self.clip_ids = np.empty(0, dtype=np.int64)
+        self.frames = np.empty(0, dtype=np.int64)
+        self.signature = None
+        self._ivf = None
+
+    def _query_rows(self, conn, columns: str):
+        sql = f"SELECT {columns} FROM embedding_clip WHERE model_version = ?"
+        params = [self.model_version]
+        if self.user_id is not None:
+            sql += " AND user_id = ?"
+            params.append(self.user_id)
+        return conn.execute(sql, params).fetchall()
+
+    def current_signature(self):
+        """(기록 수, 최대 id) - 바뀌었으면 다시 로드"""
+        conn = get_analysis_connection()
+        try:
+            return self._query_rows(conn, "COUNT(*), MAX(id)")[0]
+        finally:
+            conn.close()
+
+    def load(self, previous: "EmbeddingIndex" = None) -> "EmbeddingIndex":
+        """
+        목록에 있는 영상의 임베딩 읽기.
+        previous: 이전 색인 → 이미 읽은 영상은 그 벡터를 그대로 쓰고 새 영상 파일만 읽음
+        """
+        conn = get_analysis_connection()
+        try:
+            rows = self._query_rows(
+                conn, "id, user_id, video_path, filename, emb_path, frames, fps"
+            )
+        finally:
+            conn.close()
+        vectors, clip_ids, frames = [], [], []
+        clips = {}
+        if previous is not None and previous.clips:
+            kept = [r[0] for r in rows if r[0] in previous.clips]
+            mask = np.isin(previous.clip_ids, kept)
+            if mask.any():
+                vectors.append(previous.vectors[mask])
+                clip_ids.append(previous.clip_ids[mask])
+                frames.append(previous.frames[mask])
+            clips.update((clip_id, previous.clips[clip_id]) for clip_id in kept)
+        for clip_id, user_id, video_path, filename, emb_path, blob, fps in rows:
+            if clip_id in clips:
+                continue
+            try:
+                emb = np.load(emb_path, mmap_mode="r")
+            except (OSError, ValueError) as e:
+                print(f"[WARN] 임베딩 파일을 읽을 수 없습니다: {emb_path} ({e})")
+                continue
+            f = np.frombuffer(blob, dtype=np.int64)
+            if len(f) != len(emb):
+                continue
+            clips[clip_id] = {
+                "user_id": user_id, "video_path": video_path, "filename": filename, "fps": fps,
+            }
+            vectors.append(_normalize(emb))
+            clip_ids.append(np.full(len(f), clip_id, dtype=np.int64))
+            frames.append(f)
+        self.clips = clips
+        if vectors:
+            self.vectors = np.concatenate(vectors)
+            self.clip_ids = np.concatenate(clip_ids)
+            self.frames = np.concatenate(frames)
+        self.signature = (len(rows), max((r[0] for r in rows), default=None))
+        self._ivf = None
+        return self
+
+    def __len__(self) -> int:
+        return len(self.clip_ids)
+
+    def ivf(self) -> IVFIndex:
+        if self._ivf is None:
+            self._ivf = IVFIndex(self.vectors)
+        return self._ivf
+
+    def lookup(self, video_path: str, sec: float):
+        """해당 영상의 sec 초에 가장 가까운 임베딩 (벡터, 행 번호). 없으면 (None, None)"""
+        path = os.path.abspath(video_path)
+        ids = [cid for cid, c in self.clips.items() if c["video_path"] == path]
+        if not ids:
+            return None, None
+        rows = np.flatnonzero(np.isin(self.clip_ids, ids))
+        fps = self.clips[ids[0]]["fps"] or DEFAULT_FPS
+        row = rows[np.argmin(np.abs(self.frames[rows] / fps - sec))]
+        return self.vectors[row], int(row)
+
+    def search(self, query, k: int = 10, approx: bool = False, nprobe: int = None,
+               exclude_clip: int = None, min_gap_sec: float = 5.0) -> list:
+        """
+        query (hidden,) 와 코사인 유사도 상위 k개.
+        Returns: [{"score", "video_path", "filename", "user_id", "frame", "sec", "timestamp"}, ...]
+        """
+        if len(self) == 0:
+            return []
+        q = _normalize(query)
+        if approx:
+            idx = self.ivf().candidates(q, nprobe or Config.EMBED_NPROBE)
+            sims = self.vectors[idx] @ q
+        else:
+            idx = None
+            sims = self.vectors @ q
+        if exclude_clip is not None:
+            sims = np.where(self.clip_ids[idx if idx is not None else slice(None)] == exclude_clip,
+                            -np.inf, sims)
+        # 같은 영상의 인접 윈도우 제외 여유분까지 후보로
+        m = min(len(sims), k * 20)
+        top = np.argpartition(-sims, m - 1)[:m]
+        top = top[np.argsort(-sims[top])]
+        hits, taken = [], {}
+        for t in top:
+            if not np.isfinite(sims[t]) or len(hits) >= k:
+                break
+            row = idx[t] if idx is not None else t
+            clip_id = int(self.clip_ids[row])
+            clip = self.clips[clip_id]
+            sec = float(self.frames[row]) / (clip["fps"] or DEFAULT_FPS)
+            if any(abs(sec - s) < min_gap_sec for s in taken.get(clip_id, ())):
+                continue
+            taken.setdefault(clip_id, []).append(sec)
+            hits.append({
+                "score": round(float(sims[t]), 4),
+                "video_path": clip["video_path"],
+                "filename": clip["filename"],
+                "user_id": clip["user_id"],
+                "frame": int(self.frames[row]),
+                "sec": round(sec, 3),
+                "timestamp": format_timestamp(sec),
+            })
+        return hits
+
+
+_INDEXES = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def get_index(model_version: str, user_id: str = None) -> EmbeddingIndex:
+    """
+    모델 버전/사용자별 색인 (프로세스 안에서 재사용).
+    새 영상이 저장됐으면 새 색인을 만들어 교체 (바뀐 영상만 읽음, 기존 객체는 수정하지 않음)
+    """
+    with _INDEX_LOCK:
+        index = _INDEXES.get((model_version, user_id))
+        if index is None or index.signature != tuple(index.current_signature()):
+            index = EmbeddingIndex(model_version, user_id).load(previous=index)
+            _INDEXES[(model_version, user_id)] = index
+        return index
+
+
+def latest_version(video_path: str, user_id: str = None):
+    """영상에 저장된 가장 최근 임베딩의 모델 버전 (없으면 None)"""
+    sql = "SELECT model_version FROM embedding_clip WHERE video_path = ?"
+    params = [os.path.abspath(video_path)]
+    if user_id is not None:
+        sql += " AND user_id = ?"
+        params.append(user_id)
+    conn = get_analysis_connection()
+    try:
+        row = conn.execute(sql + " ORDER BY id DESC LIMIT 1", params).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+def search_similar(video_path: str, sec: float, k: int = 10, approx: bool = False,
+                   user_id: str = None, include_same_video: bool = False) -> dict:
+    """
+    분석한 영상의 sec 초 장면과 비슷하게 움직인 다른 장면 검색.
+    Returns: {"success", "model_version", "query", "results"} (실패 시 {"success": False, "message"})
+    """
+    version = latest_version(video_path, user_id)
+    if version is None:
+        return {"success": False, "message": f"임베딩이 저장된 분석 기록이 없습니다: {video_path}"}
+    index = get_index(version, user_id)
+    query, row = index.lookup(video_path, float(sec))
+    if query is None:
+        return {"success": False, "message": f"임베딩을 읽을 수 없습니다: {video_path}"}
+    exclude = None if include_same_video else int(index.clip_ids[row])
+    t0 = time.perf_counter()
+    results = index.search(query, k=k, approx=approx, exclude_clip=exclude)
+    return {
+        "success": True,
+        "model_version": version,
+        "query": {"video_path": os.path.abspath(video_path), "frame": int(index.frames[row])},
+        "searched": len(index),
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 2),
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="유사 행동 검색")
+    parser.add_argument("video")
+    parser.add_argument("sec", type=float)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--approx", action="store_true", help="IVF 근사 검색")
+    parser.add_argument("--user")
+    args = parser.parse_args(argv)
+
+    from core.models import create_embedding_table
+
+    create_embedding_table()
+    out = search_similar(args.video, args.sec, args.k, args.approx, args.user)
+    if not out["success"]:
+        print(f"[ERROR] {out['message']}")
+        return
+    print(f"[INFO] {out['searched']}개 윈도우 검색 ({out['elapsed_ms']}ms, {out['model_version']})")
+    for hit in out["results"]:
+        print(f"{hit['score']:.4f}  {hit['timestamp']}  {hit['video_path']}")
+
+
+if __name__ == "__main__":
+    main()
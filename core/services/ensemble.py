@@ -0,0 +1,68 @@
+# core/services/ensemble.py
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch
+
+COMBINE_METHODS = ("mean", "geometric")
+
+
+def normalize_weights(weights, n: int) -> np.ndarray:
+    w = np.ones(n, dtype=np.float64) if weights is None else np.asarray(weights, dtype=np.float64)
+    if w.shape != (n,) or np.any(w < 0) or w.sum() <= 0:
+        raise ValueError(f"가중치는 모델 수({n})만큼의 0 이상 값이어야 합니다: {weights}")
+    return w / w.sum()
+
+
+def combine_probs(prob_list, weights=None, method: str = "mean") -> np.ndarray:
+    """
+    모델별 확률 (N, C) 목록 → 앙상블 확률 (N, C)
+      mean:      가중 평균 (soft voting)
+      geometric: 가중 기하평균 후 재정규화 (한 모델이라도 낮게 본 라벨은 크게 깎임)
+    """
+    if method not in COMBINE_METHODS:
+        raise ValueError(f"지원하지 않는 결합 방식: {method}")
+    w = normalize_weights(weights, len(prob_list))
+    stacked = np.stack([np.asarray(p, dtype=np.float32) for p in prob_list])  # (M, N, C)
+    if method == "mean":
+        return np.tensordot(w, stacked, axes=1).astype(np.float32)
+    logp = np.log(np.clip(stacked, 1e-7, 1.0))
+    out = np.exp(np.tensordot(w, logp, axes=1))
+    return (out / out.sum(axis=1, keepdims=True)).astype(np.float32)
+
+
+def infer_ensemble(windows, nets, batch_size: int = 256, index=None, parallel: bool = False):
+    """
+    같은 윈도우 배치를 여러 모델에 입력 (배치 복사/텐서 변환은 배치당 1회).
+    parallel=True: 배치마다 모델별 forward를 스레드로 동시 실행 (torch 연산은 GIL 해제)
+    Returns: 모델별 softmax 확률 (N, C) 리스트 (nets 순서)
+    """
+    total = len(windows) if index is None else len(index)
+    outs = [[] for _ in nets]
+    devices = [next(net.parameters()).device for net in nets]
+
+    def forward(k, batch):
+        # no_grad는 스레드별 설정이라 작업 스레드 안에서 다시 지정
+        with torch.no_grad():
+            x = batch if batch.device == devices[k] else batch.to(devices[k])
+            return torch.softmax(nets[k](x), dim=1).cpu().numpy()
+
+    pool = ThreadPoolExecutor(max_workers=len(nets)) if parallel and len(nets) > 1 else None
+    try:
+        with torch.no_grad():
+            for i in range(0, total, batch_size):
+                part = windows[i:i + batch_size] if index is None else windows[index[i:i + batch_size]]
+                batch = torch.from_numpy(np.array(part, dtype=np.float32, order="C")).to(devices[0])
+                if pool is not None:
+                    results = list(pool.map(lambda k: forward(k, batch), range(len(nets))))
+                else:
+                    results = [forward(k, batch) for k in range(len(nets))]
+                for k, r in enumerate(results):
+                    outs[k].append(r)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return [
+        np.vstack(o) if o else np.empty((0, net.fc2.out_features), dtype=np.float32)
+        for o, net in zip(outs, nets)
+    ]
@@ -0,0 +1,149 @@
+# core/services/evidence.py
+import os
+import bisect
+
+import cv2
+
+
+class KeyframeBuffer:
+    """
+    디코딩 중인 프레임에서 축소 JPEG 키프레임을 일정 개수 이하로 보관.
+    개수가 max_frames를 넘으면 간격(stride)을 2배로 늘리고 절반을 버리므로
+    영상 길이와 무관하게 메모리 사용량이 고정됨.
+    """
+
+    def __init__(self, max_frames: int = 48, max_side: int = 320, quality: int = 80):
+        self.max_frames = max(int(max_frames), 2)
+        self.max_side = int(max_side)
+        self.quality = int(quality)
+        self.stride = 1
+        self.frames = {}  # 원본 프레임 번호 → JPEG bytes
+
+    def __len__(self):
+        return len(self.frames)
+
+    # 현재 간격에 해당하는 프레임만 인코딩해서 보관
+    def offer(self, frame_no: int, frame_bgr) -> None:
+        if frame_no % self.stride:
+            return
+        h, w = frame_bgr.shape[:2]
+        scale = self.max_side / float(max(h, w))
+        if scale < 1.0:
+            frame_bgr = cv2.resize(
+                frame_bgr, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA
+            )
+        ok, buf = cv2.imencode(
+            ".jpg", frame_bgr, [int(cv2.IMWRITE_JPEG_QUALITY), self.quality]
+        )
+        if not ok:
+            return
+        self.frames[frame_no] = buf.tobytes()
+
+        # 상한 초과 → 간격 2배로 늘리고 맞지 않는 프레임 제거
+        while len(self.frames) > self.max_frames:
+            self.stride *= 2
+            self.frames = {
+                k: v for k, v in self.frames.items() if k % self.stride == 0
+            }
+
+    # 요청한 프레임 번호와 가장 가까운 키프레임 (프레임 번호, JPEG bytes)
+    def nearest(self, frame_no: int):
+        if not self.frames:
+            return None, None
+        keys = sorted(self.frames)
+        i = bisect.bisect_left(keys, frame_no)
+        cands = keys[max(i - 1, 0): i + 1]
+        best = min(cands, key=lambda k: abs(k - frame_no))
+        return best, self.frames[best]
+
+
+def save_event_thumbnails(events, keyframes: KeyframeBuffer, out_dir: str, stem: str):
+    """
+    이벤트 구간 중앙에 가장 가까운 키프레임을 썸네일로 저장하고
+    각 이벤트 dict에 "thumbnail" 경로를 기록 (재디코딩 없음).
+    stem: 분석별 산출물 이름 (pose_store.run_key, 같은 영상의 다른 분석 기록과 겹치지 않게)
+    긴 영상은 키프레임 간격이 넓어 구간 안에 키프레임이 없을 수 있음
+      → 구간 밖 프레임이면 "thumbnail_approx": True (구간 장면이 아닌 근처 장면)
+    """
+    if not events or keyframes is None or len(keyframes) == 0:
+        return events
+    os.makedirs(out_dir, exist_ok=True)
+    for i, ev in enumerate(events):
+        mid = (ev["start_frame"] + ev["end_frame"]) // 2
+        frame_no, jpeg = keyframes.nearest(mid)
+        if jpeg is None:
+            continue
+        path = os.path.join(out_dir, f"{stem}.ev{i:03d}.jpg")
+        with open(path, "wb") as f:
+            f.write(jpeg)
+        ev["thumbnail"] = path
+        ev["thumbnail_frame"] = int(frame_no)
+        ev["thumbnail_approx"] = not (ev["start_frame"] <= frame_no <= ev["end_frame"])
+    return events
+
+
+def merge_intervals(events, fps: float, pad_sec: float = 0.0, max_frame=None):
+    """이벤트 구간(프레임)에 여유를 붙이고 겹치는 구간은 하나로 병합"""
+    pad = int(round(pad_sec * fps))
+    spans = sorted(
+        (max(ev["start_frame"] - pad, 0), ev["end_frame"] + pad) for ev in events
+    )
+    merged = []
+    for s, e in spans:
+        if max_frame is not None:
+            e = min(e, max_frame)
+        if merged and s <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], e)
+        else:
+            merged.append([s, e])
+    return [tuple(m) for m in merged]
+
+
+def export_event_clips(
+    video_path: str,
+    events,
+    out_dir: str,
+    pad_sec: float = 1.0,
+    fourcc: str = "mp4v",
+):
+    """
+    탐지된 구간만 잘라서 클립으로 저장.
+    구간 시작 프레임으로 바로 seek 하므로 영상 전체를 디코딩하지 않음.
+    Returns: 저장된 클립 경로 리스트
+    """
+    if not events:
+        return []
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"[ERROR] 영상 파일을 열 수 없습니다: {video_path}")
+        return []
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    spans = merge_intervals(
+        events, fps, pad_sec=pad_sec, max_frame=total - 1 if total > 0 else None
+    )
+
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(video_path))[0]
+    paths = []
+    try:
+        for start, end in spans:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+            path = os.path.join(out_dir, f"{stem}.{start:07d}-{end:07d}.mp4")
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, (w, h))
+            try:
+                for _ in range(end - start + 1):
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    writer.write(frame)
+            finally:
+                writer.release()
+            paths.append(path)
+    finally:
+        cap.release()
+    return paths
+
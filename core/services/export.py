@@ -0,0 +1,292 @@
+# core/services/export.py
+"""
+분석 결과 내보내기 (CSV / JSONL / Parquet)
+
+  - 기록은 analysis 테이블 색인에서 키셋 페이지 단위로 읽고 (history.json 전체를 읽지 않음)
+  - 윈도우별 확률은 .probs.npy 를 memmap으로 블록 단위로 읽어서 바로 기록
+    → 윈도우 수십만 개도 메모리 사용량 일정
+  detail
+    summary: 기록 1건 = 1행 (위험도, 라벨 비율, 이벤트 수 등)
+    events : 이벤트 1건 = 1행 (타임라인)
+    windows: 윈도우 1개 = 1행 (라벨, 라벨별 확률)
+  Parquet는 pyarrow 설치 시에만 (pip install pyarrow)
+
+  python -m core.services.export out.csv --user admin --risk 상 --from 2026-03-01 --to 2026-03-31
+  python -m core.services.export out.parquet --detail windows --filename "cam01*"
+"""
+import argparse
+import csv
+import json
+import os
+
+import numpy as np
+
+from core.services.history_query import LABELS, label_percentages, query_history
+
+try:  # 선택 의존성 (pip install pyarrow)
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+FORMATS = ("csv", "jsonl", "parquet")
+PAGE_SIZE = 500  # 색인에서 한 번에 읽는 기록 수
+BLOCK_ROWS = 8192  # 확률 파일에서 한 번에 읽는 윈도우 수 / Parquet 행 그룹 크기
+
+_PCT = [f"pct_{label.lower()}" for label in LABELS]
+_PROB = [f"p_{label.lower()}" for label in LABELS]
+
+# detail별 컬럼 (이름, 형식) - 세 형식 모두 같은 컬럼
+COLUMNS = {
+    "summary": [
+        ("analysis_id", "int"), ("record_id", "int"), ("username", "str"), ("filename", "str"),
+        ("video_path", "str"), ("analyzed_at", "str"), ("risk_level", "str"),
+        *[(c, "float") for c in _PCT],
+        ("windows", "int"), ("event_count", "int"), ("pose_success", "int"), ("pose_fail", "int"),
+        ("fps", "float"), ("model_version", "str"), ("feature_set", "str"), ("memo", "str"),
+    ],
+    "events": [
+        ("analysis_id", "int"), ("filename", "str"), ("label", "str"),
+        ("start_sec", "float"), ("end_sec", "float"), ("start_ts", "str"), ("end_ts", "str"),
+        ("windows", "int"), ("peak_conf", "float"), ("mean_conf", "float"), ("thumbnail", "str"),
+    ],
+    "windows": [
+        ("analysis_id", "int"), ("filename", "str"), ("window", "int"), ("start_sec", "float"),
+        ("label", "str"), ("confidence", "float"), *[(c, "float") for c in _PROB],
+    ],
+}
+
+
+def iter_records(user_id=None, page_size: int = PAGE_SIZE, **filters):
+    """조건에 맞는 기록을 페이지 단위로 읽어 하나씩 (filters: query_history 인자)"""
+    cursor = None
+    while True:
+        page = query_history(user_id, limit=page_size, cursor=cursor, **filters)
+        yield from page["items"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return
+
+
+def summary_row(record: dict) -> dict:
+    pct = label_percentages(record)
+    pose = record.get("pose_stats") if isinstance(record.get("pose_stats"), dict) else {}
+    counts = record.get("chunk_counts") or {}
+    return {
+        "analysis_id": record.get("analysis_id"),
+        "record_id": record.get("id"),
+        "username": record.get("username"),
+        "filename": record.get("filename"),
+        "video_path": record.get("video_path"),
+        "analyzed_at": record.get("timestamp"),
+        "risk_level": record.get("risk_level", record.get("result")),
+        **{col: pct[label] for col, label in zip(_PCT, LABELS)},
+        "windows": sum(counts.values()) if counts else None,
+        "event_count": len(record.get("events") or []),
+        "pose_success": pose.get("success"),
+        "pose_fail": pose.get("fail"),
+        "fps": pose.get("fps"),
+        "model_version": record.get("model_version"),
+        "feature_set": record.get("feature_set"),
+        "memo": record.get("memo"),
+    }
+
+
+def event_rows(record: dict):
+    for ev in record.get("events") or []:
+        yield {
+            "analysis_id": record.get("analysis_id"),
+            "filename": record.get("filename"),
+            **{k: ev.get(k) for k, _ in COLUMNS["events"][2:]},
+        }
+
+
+def _window_seconds(record: dict, n: int):
+    """
+    확률 행 → 윈도우 시작 시각(초).
+    가시성 마스킹으로 일부 윈도우가 빠진 기록은 행과 윈도우가 어긋나므로 None.
+    프레임 번호 파일(.frames.npy, 중복 감지 사용 시)이 없으면 시퀀스 행 기준 근사값
+    """
+    pose = record.get("pose_stats") if isinstance(record.get("pose_stats"), dict) else {}
+    fps = pose.get("fps") or 0.0
+    if fps <= 0 or pose.get("masked_windows"):
+        return None
+    frames_path = record["probs_path"][: -len(".probs.npy")] + ".frames.npy"
+    if os.path.isfile(frames_path):
+        frame_index = np.load(frames_path, mmap_mode="r")
+        if len(frame_index) >= n:
+            return lambda s, e: np.asarray(frame_index[s:e], dtype=np.float64) / fps
+    return lambda s, e: np.arange(s, e, dtype=np.float64) / fps
+
+
+def window_rows(record: dict):
+    """윈도우별 행 (확률 파일이 없는 기록은 건너뜀)"""
+    path = record.get("probs_path")
+    if not path or not os.path.isfile(path):
+        return
+    probs = np.load(path, mmap_mode="r")
+    if probs.ndim != 2 or probs.shape[1] != len(LABELS):
+        print(f"[WARN] 확률 파일 형식이 달라 윈도우 내보내기 생략: {path} {probs.shape}")
+        return
+    seconds = _window_seconds(record, len(probs))
+    base = {"analysis_id": record.get("analysis_id"), "filename": record.get("filename")}
+    for s in range(0, len(probs), BLOCK_ROWS):
+        block = np.asarray(probs[s:s + BLOCK_ROWS], dtype=np.float32)
+        labels = block.argmax(axis=1)
+        conf = block[np.arange(len(block)), labels]
+        starts = seconds(s, s + len(block)) if seconds else None
+        block = np.round(block.astype(np.float64), 4).tolist()
+        for i, row in enumerate(block):
+            yield {
+                **base,
+                "window": s + i,
+                "start_sec": round(float(starts[i]), 3) if starts is not None else None,
+                "label": LABELS[labels[i]],
+                "confidence": round(float(conf[i]), 4),
+                **dict(zip(_PROB, row)),
+            }
+
+
+def iter_rows(records, detail: str = "summary"):
+    if detail not in COLUMNS:
+        raise ValueError(f"지원하지 않는 detail: {detail}")
+    for record in records:
+        if detail == "summary":
+            yield summary_row(record)
+        elif detail == "events":
+            yield from event_rows(record)
+        else:
+            yield from window_rows(record)
+
+
+class CsvSink:
+    def __init__(self, f, columns):
+        self.writer = csv.DictWriter(f, fieldnames=[c for c, _ in columns], extrasaction="ignore")
+        self.writer.writeheader()
+
+    def write(self, row: dict):
+        self.writer.writerow(row)
+
+    def close(self):
+        pass
+
+
+class JsonlSink:
+    def __init__(self, f, columns):
+        self.f = f
+
+    def write(self, row: dict):
+        self.f.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+
+    def close(self):
+        pass
+
+
+class ParquetSink:
+    """행을 BLOCK_ROWS개씩 모아 행 그룹 단위로 기록"""
+
+    _TYPES = {"int": "int64", "float": "float64", "str": "string"}
+
+    def __init__(self, path, columns):
+        if pq is None:
+            raise RuntimeError("Parquet 내보내기에는 pyarrow가 필요합니다 (pip install pyarrow)")
+        self.names = [c for c, _ in columns]
+        self.schema = pa.schema([(c, getattr(pa, self._TYPES[t])()) for c, t in columns])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.rows = []
+
+    def write(self, row: dict):
+        self.rows.append(row)
+        if len(self.rows) >= BLOCK_ROWS:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            cols = {c: [r.get(c) for r in self.rows] for c in self.names}
+            self.writer.write_table(pa.Table.from_pydict(cols, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def write_rows(rows, f, fmt: str, detail: str = "summary") -> int:
+    """텍스트 스트림(f)에 CSV/JSONL 기록 (HTTP 응답 등). Returns: 행 수"""
+    sink = {"csv": CsvSink, "jsonl": JsonlSink}[fmt](f, COLUMNS[detail])
+    n = 0
+    for row in rows:
+        sink.write(row)
+        n += 1
+    sink.close()
+    return n
+
+
+def export(path: str, fmt: str = None, detail: str = "summary", user_id=None, **filters) -> dict:
+    """
+    조건에 맞는 기록을 파일로 내보내기 (임시 파일에 쓰고 끝나면 교체).
+    fmt: csv / jsonl / parquet (없으면 확장자로)
+    filters: query_history 인자 (risk, date_from, date_to, filename, min_pct, sort, descending)
+    Returns: {"path", "format", "detail", "records", "rows"}
+    """
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식: {fmt} ({', '.join(FORMATS)})")
+    if detail not in COLUMNS:
+        raise ValueError(f"지원하지 않는 detail: {detail}")
+    stats = {"path": path, "format": fmt, "detail": detail, "records": 0, "rows": 0}
+
+    def counted():
+        for record in iter_records(user_id, **filters):
+            stats["records"] += 1
+            yield record
+
+    rows = iter_rows(counted(), detail)
+    tmp = path + ".tmp"
+    try:
+        if fmt == "parquet":
+            sink = ParquetSink(tmp, COLUMNS[detail])
+            for row in rows:
+                sink.write(row)
+                stats["rows"] += 1
+            sink.close()
+        else:
+            with open(tmp, "w", encoding="utf-8-sig" if fmt == "csv" else "utf-8", newline="") as f:
+                stats["rows"] = write_rows(rows, f, fmt, detail)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drovis 분석 결과 내보내기")
+    parser.add_argument("out", help="저장 경로 (.csv / .jsonl / .parquet)")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--detail", choices=tuple(COLUMNS), default="summary")
+    parser.add_argument("--user", help="사용자 (없으면 전체)")
+    parser.add_argument("--risk", nargs="+", choices=("상", "중", "하"))
+    parser.add_argument("--from", dest="date_from", help="YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", help="YYYY-MM-DD (포함)")
+    parser.add_argument("--filename", help="파일명 패턴 (예: cam01*)")
+    parser.add_argument("--min-pct", nargs=2, action="append", metavar=("LABEL", "PCT"),
+                        help="라벨 윈도우 비율 하한 (예: --min-pct Handover 30)")
+    args = parser.parse_args(argv)
+
+    stats = export(
+        args.out,
+        args.format,
+        args.detail,
+        args.user,
+        risk=args.risk,
+        date_from=args.date_from,
+        date_to=args.date_to,
+        filename=args.filename,
+        min_pct={label: float(p) for label, p in args.min_pct or []},
+    )
+    print(f"[EXPORT] 기록 {stats['records']}건 → {stats['rows']}행 저장: {stats['path']}")
+
+
+if __name__ == "__main__":
+    main()
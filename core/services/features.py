@@ -0,0 +1,53 @@
+# core/services/features.py
+import numpy as np
+
+# 특징 세트 → 프레임당 차원
+#   xy:     정규화 x, y (33 x 2 = 66, 기존 모델 입력)
+#   xy_vis: xy + 랜드마크별 visibility (66 + 33 = 99, 이 입력으로 학습한 모델 필요)
+FEATURE_SETS = {"xy": 66, "xy_vis": 99}
+DEFAULT_FEATURE_SET = "xy"
+
+
+def feature_dim(feature_set: str) -> int:
+    if feature_set not in FEATURE_SETS:
+        raise ValueError(f"지원하지 않는 특징 세트: {feature_set}")
+    return FEATURE_SETS[feature_set]
+
+
+def needs_extras(feature_set: str, min_visibility: float = 0.0) -> bool:
+    """z/visibility 추출이 필요한지 (process_pose extras=True)"""
+    return feature_set != "xy" or (min_visibility or 0.0) > 0
+
+
+def npy_name(stem: str, feature_set: str) -> str:
+    """정규화 시퀀스 파일명. 특징 세트가 다르면 파일도 달라 캐시가 섞이지 않음 (xy는 기존 이름 유지)"""
+    if feature_set == DEFAULT_FEATURE_SET:
+        return f"{stem}.pipe_norm.npy"
+    return f"{stem}.pipe_norm.{feature_set}.npy"
+
+
+def build_features(xy_norm: np.ndarray, extra, feature_set: str = DEFAULT_FEATURE_SET) -> np.ndarray:
+    """
+    정규화 좌표 (T, 66) + extras (T, 33, 2: z, visibility) → 모델 입력 (T, D)
+    """
+    feature_dim(feature_set)
+    if feature_set == "xy":
+        return xy_norm
+    if extra is None:
+        raise ValueError(f"{feature_set} 특징 세트에는 visibility가 필요합니다.")
+    vis = np.asarray(extra, dtype=np.float32)[:, :, 1]
+    return np.concatenate([xy_norm, vis], axis=1)
+
+
+def frame_visibility(extra) -> np.ndarray:
+    """프레임별 평균 visibility (T,)"""
+    return np.asarray(extra, dtype=np.float32)[:, :, 1].mean(axis=1)
+
+
+def window_visibility(frame_vis: np.ndarray, window: int, step: int = 1) -> np.ndarray:
+    """슬라이딩 윈도우별 평균 visibility (N,) - make_windows와 같은 윈도우 순서"""
+    v = np.asarray(frame_vis, dtype=np.float64)
+    if len(v) < window:
+        return np.empty(0, dtype=np.float32)
+    c = np.concatenate(([0.0], np.cumsum(v)))
+    return ((c[window:] - c[:-window]) / window)[::step].astype(np.float32)
@@ -0,0 +1,381 @@
+# core/services/fingerprint.py
+"""
+영상 지문 (중복/겹치는 영상 감지)
+
+  - 일정 간격(Config.FINGERPRINT_INTERVAL_SEC)마다 프레임 1장 → 256비트 dHash
+    (샘플 시점은 초 단위라 fps/컨테이너가 달라도 같은 장면끼리 비교 가능)
+  - 해시를 32비트 구간(band) 8개로 나눈 값을 색인 → 같은 값이 있는 영상만 정밀 비교
+  - 정밀 비교: 샘플끼리 해밍 거리 → 시간축 어긋남(offset)별 일치 비율이 가장 높은 위치
+    여러 offset에서 똑같이 일치하면(움직임 없는 고정 화면 등) 위치를 특정할 수 없으므로 중복으로 보지 않음
+
+    python -m core.services.fingerprint C:/cctv/day1/cam01.mp4 ...
+"""
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+import cv2
+import numpy as np
+
+from core.config import Config
+from core.db import get_analysis_connection
+from core.services.decode import open_video
+from core.services.timeline import DEFAULT_FPS, format_timestamp
+
+HASH_SIZE = 16                       # 16 x 16 = 256비트
+HASH_BYTES = HASH_SIZE * HASH_SIZE // 8
+BANDS = 8                            # 색인 구간 수 (구간당 32비트)
+COVERAGE = 0.95                      # 영상 길이 대비 겹친 비율이 이 이상이면 "전체"
+AMBIGUITY_MARGIN = 0.1               # 다른 위치보다 일치 비율이 이만큼 높아야 위치 확정
+MIN_OVERLAP = 10                     # 최소 겹친 샘플 수
+MAX_CANDIDATES = 20
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+_COLUMNS = (
+    "id", "video_path", "content_key", "fps", "frame_count", "interval", "hashes",
+    "feature_set", "npy_path", "frames_path", "npy_mtime", "result",
+)
+# 종류: identical(바이트가 같은 사본) / duplicate(같은 영상 재인코딩·살짝 잘린 사본)
+#       contained(기존 영상의 일부 구간) / overlap(일부만 겹침)
+KINDS = ("identical", "duplicate", "contained", "overlap")
+
+
+def content_key(path: str, block: int = 1 << 20) -> str:
+    """크기 + 앞/뒤 block 바이트 해시 (전체를 읽지 않고 바이트가 같은 사본 확인)"""
+    size = os.path.getsize(path)
+    h = hashlib.sha1(str(size).encode("ascii"))
+    with open(path, "rb") as f:
+        h.update(f.read(block))
+        if size > 2 * block:
+            f.seek(-block, os.SEEK_END)
+            h.update(f.read(block))
+    return h.hexdigest()
+
+
+def dhash(frame_bgr) -> np.ndarray:
+    """가로로 이웃한 픽셀 밝기 비교 해시 (32바이트)"""
+    small = cv2.resize(frame_bgr, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    return np.packbits(gray[:, 1:] > gray[:, :-1])
+
+
+def video_fingerprint(video_path: str, interval: float = None, backend: str = None):
+    """
+    영상 지문. 샘플 사이 프레임은 grab만 (색 변환/포즈 추정 없음)
+    Returns: {"video_path", "content_key", "fps", "frame_count", "interval", "hashes": (M, 32) uint8}
+             열 수 없으면 None
+    """
+    interval = float(interval or Config.FINGERPRINT_INTERVAL_SEC)
+    cap = open_video(video_path, backend)
+    if not cap.is_open():
+        print(f"[ERROR] 영상 파일을 열 수 없습니다: {video_path}")
+        return None
+    fps = cap.fps or 0.0
+    step_fps = fps or DEFAULT_FPS
+    hashes = []
+    frame_no = -1
+    while True:
+        target = int(round(len(hashes) * interval * step_fps))
+        if frame_no + 1 < target:
+            if not cap.grab():
+                break
+            frame_no += 1
+            continue
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame_no += 1
+        hashes.append(dhash(frame))
+    cap.release()
+    return {
+        "video_path": os.path.abspath(video_path),
+        "content_key": content_key(video_path),
+        "fps": float(fps),
+        "frame_count": frame_no + 1,
+        "interval": interval,
+        "hashes": np.array(hashes, dtype=np.uint8).reshape(-1, HASH_BYTES),
+    }
+
+
+def band_keys(hashes: np.ndarray) -> list:
+    """색인 키 (구간 번호 << 32 | 구간 값), 중복 제거"""
+    values = np.ascontiguousarray(hashes).view(np.uint32).astype(np.int64)  # (M, BANDS)
+    keys = (np.arange(BANDS, dtype=np.int64) << 32) | values
+    return np.unique(keys).tolist()
+
+
+def hamming(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """(M, 32) x (N, 32) → (M, N) 해밍 거리"""
+    return _POPCOUNT[a[:, None, :] ^ b[None, :, :]].sum(axis=2, dtype=np.uint16)
+
+
+def align(query: np.ndarray, cand: np.ndarray, max_bits: int = None,
+          min_overlap: int = MIN_OVERLAP, block: int = 64):
+    """
+    두 지문의 시간축 정렬. 쿼리 샘플 i ↔ 후보 샘플 i + offset
+    Returns: {"offset", "overlap", "matched", "ratio", "runner_up"} (겹칠 수 없으면 None)
+    """
+    max_bits = Config.FINGERPRINT_MAX_BITS if max_bits is None else max_bits
+    m, n = len(query), len(cand)
+    if min(m, n) < min_overlap:
+        return None
+    # offset별 일치 샘플 수 (블록 단위 → 거리 행렬 전체를 메모리에 두지 않음)
+    matched = np.zeros(m + n - 1, dtype=np.int64)
+    for i0 in range(0, m, block):
+        ii, jj = np.nonzero(hamming(query[i0:i0 + block], cand) <= max_bits)
+        matched += np.bincount(jj - (ii + i0) + (m - 1), minlength=m + n - 1)
+    offsets = np.arange(-(m - 1), n)
+    overlap = np.minimum(m, n - offsets) - np.maximum(0, -offsets)
+    valid = overlap >= min_overlap
+    ratio = np.where(valid, matched / np.maximum(overlap, 1), 0.0)
+    k = int(np.argmax(np.where(valid, matched, -1)))
+    if matched[k] == 0:
+        return None
+    far = valid & (np.abs(offsets - offsets[k]) > 2)
+    return {
+        "offset": int(offsets[k]),
+        "overlap": int(overlap[k]),
+        "matched": int(matched[k]),
+        "ratio": float(ratio[k]),
+        "runner_up": float(ratio[far].max()) if far.any() else 0.0,
+    }
+
+
+def same_samples(query: np.ndarray, cand: np.ndarray, max_bits: int = None) -> bool:
+    """offset 0 정렬: 샘플 수가 같고 같은 시점 샘플끼리 모두 해밍 거리 max_bits 이하"""
+    max_bits = Config.FINGERPRINT_MAX_BITS if max_bits is None else max_bits
+    if len(query) != len(cand) or len(query) == 0:
+        return False
+    return bool((_POPCOUNT[query ^ cand].sum(axis=1) <= max_bits).all())
+
+
+def classify(alignment, m: int, n: int, min_match: float = None):
+    """정렬 결과 → 종류 (duplicate / contained / overlap), 같은 영상이 아니면 None"""
+    min_match = Config.DEDUP_MIN_MATCH if min_match is None else min_match
+    if alignment is None or alignment["ratio"] < min_match:
+        return None
+    if alignment["ratio"] - alignment["runner_up"] < AMBIGUITY_MARGIN:
+        return None
+    if alignment["overlap"] >= COVERAGE * m:
+        return "duplicate" if alignment["overlap"] >= COVERAGE * n else "contained"
+    return "overlap"
+
+
+def _row(conn, where: str, params):
+    row = conn.execute(
+        f"SELECT {', '.join(_COLUMNS)} FROM video_fingerprint WHERE {where}", params
+    ).fetchone()
+    if row is None:
+        return None
+    entry = dict(zip(_COLUMNS, row))
+    entry["hashes"] = np.frombuffer(entry["hashes"], dtype=np.uint8).reshape(-1, HASH_BYTES)
+    entry["result"] = json.loads(entry["result"]) if entry["result"] else None
+    return entry
+
+
+def find_duplicate(fp: dict, feature_set: str = None, user_id: str = None):
+    """
+    색인에서 같은/겹치는 영상 찾기 (feature_set이 같은 기록만)
+    user_id: 이 사용자가 분석한 영상만 (다른 사용자의 결과/경로가 노출되지 않도록, None이면 전체)
+    Returns: 기록 dict + {"kind", "offset_sec", "match", "query_coverage"} 또는 None
+             offset_sec: 쿼리 t초 = 기존 영상 t + offset_sec 초
+    """
+    feature_set = feature_set or Config.FEATURE_SET
+    owner = () if user_id is None else (user_id,)
+    conn = get_analysis_connection()
+    try:
+        # 1) 바이트가 같은 사본 (앞/뒤만 비교한 키라 중간이 바뀐 파일은 샘플 해시로 확인)
+        entry = _row(
+            conn,
+            f"content_key = ? AND feature_set = ?{' AND user_id = ?' if owner else ''} "
+            "ORDER BY id DESC LIMIT 1",
+            (fp["content_key"], feature_set, *owner),
+        )
+        if (
+            entry is not None
+            and entry["interval"] == fp["interval"]
+            and same_samples(fp["hashes"], entry["hashes"])
+        ):
+            return {**entry, "kind": "identical", "offset_sec": 0.0, "match": 1.0,
+                    "query_coverage": 1.0}
+
+        # 2) 해시 구간 값이 같은 영상 → 정밀 비교
+        keys = band_keys(fp["hashes"])
+        hits = Counter()
+        for i in range(0, len(keys), 500):
+            part = keys[i:i + 500]
+            rows = conn.execute(
+                f"SELECT k.video_id, COUNT(*) FROM fingerprint_key k "
+                f"JOIN video_fingerprint v ON v.id = k.video_id "
+                f"WHERE k.key IN ({', '.join('?' * len(part))})"
+                f"{' AND v.user_id = ?' if owner else ''} GROUP BY k.video_id",
+                (*part, *owner),
+            ).fetchall()
+            hits.update(dict(rows))
+        best = None
+        for video_id, _ in hits.most_common(MAX_CANDIDATES):
+            entry = _row(conn, "id = ? AND feature_set = ?", (video_id, feature_set))
+            if entry is None or entry["interval"] != fp["interval"]:
+                continue
+            m, n = len(fp["hashes"]), len(entry["hashes"])
+            alignment = align(fp["hashes"], entry["hashes"])
+            kind = classify(alignment, m, n)
+            if kind is None:
+                continue
+            rank = (KINDS.index(kind), -alignment["matched"])
+            if best is None or rank < best[0]:
+                best = (rank, {
+                    **entry,
+                    "kind": kind,
+                    "offset_sec": alignment["offset"] * fp["interval"],
+                    "match": round(alignment["ratio"], 4),
+                    "query_coverage": round(alignment["overlap"] / m, 4),
+                })
+        return best[1] if best else None
+    finally:
+        conn.close()
+
+
+def describe(match: dict, reused: str = None) -> dict:
+    """결과에 넣을 요약 (reused: "result" / "pose" / None)"""
+    return {
+        "video_path": match["video_path"],
+        "kind": match["kind"],
+        "offset_sec": round(match["offset_sec"], 3),
+        "match": match["match"],
+        "query_coverage": match["query_coverage"],
+        "reused": reused,
+    }
+
+
+def _shift(items, offset_sec: float, src_fps: float, fps: float, duration: float) -> list:
+    """기존 영상 기준 구간(이벤트/정지 구간) → 쿼리 영상 기준 (범위 밖은 제외, 경계는 자름)"""
+    src_fps = src_fps or DEFAULT_FPS
+    fps = fps or DEFAULT_FPS
+    out = []
+    for item in items or []:
+        start = item.get("start_sec", item["start_frame"] / src_fps) - offset_sec
+        end = item.get("end_sec", (item["end_frame"] + 1) / src_fps) - offset_sec
+        if end <= 0 or start >= duration:
+            continue
+        start, end = max(start, 0.0), min(end, duration)
+        moved = dict(item)
+        moved.update(
+            start_frame=int(round(start * fps)),
+            end_frame=max(int(round(end * fps)) - 1, int(round(start * fps))),
+            start_ts=format_timestamp(start),
+            end_ts=format_timestamp(end),
+        )
+        if "start_sec" in item:
+            moved.update(start_sec=round(start, 3), end_sec=round(end, 3))
+        out.append(moved)
+    return out
+
+
+def reuse_result(match: dict, filename: str, fp: dict) -> dict:
+    """같은 영상의 기존 결과를 이 영상 기준으로 (이벤트 시각은 offset만큼 이동)"""
+    result = dict(match["result"])
+    duration = fp["frame_count"] / (fp["fps"] or DEFAULT_FPS)
+    for key in ("events", "idle_spans"):
+        result[key] = _shift(result.get(key), match["offset_sec"], match["fps"], fp["fps"], duration)
+    result["filename"] = filename
+    result["duplicate_of"] = describe(match, "result")
+    return result
+
+
+def reused_idle_spans(match: dict, fp: dict) -> list:
+    """기존 영상의 정지 구간 (motion gate) → 이 영상 기준 [(시작 프레임, 끝 프레임), ...] (포즈 재사용 시)"""
+    duration = fp["frame_count"] / (fp["fps"] or DEFAULT_FPS)
+    spans = _shift(
+        (match["result"] or {}).get("idle_spans"), match["offset_sec"], match["fps"], fp["fps"], duration
+    )
+    return [(s["start_frame"], s["end_frame"]) for s in spans]
+
+
+def load_pose_slice(match: dict, fp: dict):
+    """
+    기존 영상의 정규화 포즈 시퀀스 중 이 영상과 겹치는 구간 (MediaPipe 재실행 없음)
+    Returns: (sequence (T, D) float32, frame_index (T,) 이 영상 기준 프레임 번호) 또는 None
+    """
+    npy_path, frames_path = match.get("npy_path"), match.get("frames_path")
+    if not npy_path or not frames_path or not os.path.exists(npy_path) or not os.path.exists(frames_path):
+        return None
+    if os.stat(npy_path).st_mtime_ns != match["npy_mtime"]:
+        return None  # 같은 이름의 다른 영상 분석으로 덮어써짐
+    seq = np.load(npy_path, mmap_mode="r")
+    frames = np.load(frames_path)
+    if len(seq) != len(frames):
+        return None
+    fps = fp["fps"] or DEFAULT_FPS
+    t = frames / (match["fps"] or DEFAULT_FPS) - match["offset_sec"]
+    keep = (t >= 0) & (t < fp["frame_count"] / fps)
+    frame_index = np.minimum(np.round(t[keep] * fps).astype(np.int64), max(fp["frame_count"] - 1, 0))
+    return np.asarray(seq[keep], dtype=np.float32), frame_index
+
+
+def save_frame_index(frame_index, stem: str, folder: str = None) -> str:
+    """시퀀스 행 → 원본 프레임 번호 (다른 영상이 포즈를 재사용할 때 필요)"""
+    folder = folder or Config.UPLOAD_FOLDER
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{stem}.frames.npy")
+    np.save(path, np.asarray(frame_index, dtype=np.int64))
+    return path
+
+
+def register(fp: dict, result: dict, feature_set: str = None, frames_path: str = None,
+             user_id: str = None) -> int:
+    """
+    분석한 영상 지문 + 결과 색인에 추가 (같은 사용자의 바이트가 같은 기존 기록은 교체).
+    Returns: 기록 id
+    """
+    npy_path = result.get("npy_path")
+    npy_mtime = os.stat(npy_path).st_mtime_ns if npy_path and os.path.exists(npy_path) else None
+    conn = get_analysis_connection()
+    try:
+        old = [r[0] for r in conn.execute(
+            "SELECT id FROM video_fingerprint WHERE content_key = ? AND user_id IS ?",
+            (fp["content_key"], user_id),
+        )]
+        for video_id in old:
+            conn.execute("DELETE FROM fingerprint_key WHERE video_id = ?", (video_id,))
+            conn.execute("DELETE FROM video_fingerprint WHERE id = ?", (video_id,))
+        cur = conn.execute(
+            """
+            INSERT INTO video_fingerprint (video_path, content_key, fps, frame_count, interval,
+                hashes, feature_set, npy_path, frames_path, npy_mtime, result, created_at, user_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                fp["video_path"], fp["content_key"], fp["fps"], fp["frame_count"], fp["interval"],
+                fp["hashes"].tobytes(), feature_set or Config.FEATURE_SET, npy_path, frames_path,
+                npy_mtime, json.dumps(result, ensure_ascii=False, default=str),
+                time.strftime("%Y-%m-%d %H:%M:%S"), user_id,
+            ),
+        )
+        video_id = cur.lastrowid
+        conn.executemany(
+            "INSERT INTO fingerprint_key (key, video_id) VALUES (?, ?)",
+            [(k, video_id) for k in band_keys(fp["hashes"])],
+        )
+        conn.commit()
+        return video_id
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    from core.models import create_fingerprint_table
+
+    create_fingerprint_table()
+    for path in argv if argv is not None else sys.argv[1:]:
+        fp = video_fingerprint(path)
+        if fp is None:
+            continue
+        match = find_duplicate(fp)
+        print(f"{path}: {describe(match) if match else '중복 없음'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,30 @@
-import json, os, time
+import json, os, sqlite3, tempfile, threading, time
+from contextlib import contextmanager
 from pathlib import Path
 from typing import List, Dict, Any, Optional
+from filelock import FileLock
+from core.services.metrics import REGISTRY
 
 APP_ROOT = Path(__file__).resolve().parents[2]
 DATA_DIR = APP_ROOT / "data"
 HISTORY_PATH = str(DATA_DIR / "history.json")
 
+# 쓰기(읽기-수정-쓰기)는 한 번에 하나만: 스레드(서버/GUI 워커) + 프로세스(worker.py --workers N, 정리 작업)
+_LOCK = threading.RLock()
+_FILE_LOCKS: Dict[str, FileLock] = {}
+
+
+@contextmanager
+def _locked():
+    with _LOCK:
+        path = HISTORY_PATH + ".lock"
+        if path not in _FILE_LOCKS:
+            os.makedirs(os.path.dirname(HISTORY_PATH), exist_ok=True)
+            _FILE_LOCKS[path] = FileLock(path)
+        with _FILE_LOCKS[path]:
+            yield
+
+
 def _read() -> List[Dict[str, Any]]:
     if not os.path.exists(HISTORY_PATH):
         return []
@@ -16,11 +35,44 @@ def _read() -> List[Dict[str, Any]]:
         return []
     
 def _write(data: List[Dict[str, Any]]) -> None:
-    os.makedirs(os.path.dirname(HISTORY_PATH), exist_ok=True)
-    tmp = HISTORY_PATH + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    os.replace(tmp, HISTORY_PATH)
+    # 쓰기마다 다른 임시 파일 → 다 쓴 뒤 교체 (읽는 쪽은 항상 완성된 파일만 봄)
+    folder = os.path.dirname(HISTORY_PATH)
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix="history.", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, HISTORY_PATH)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _new_id(data: List[Dict[str, Any]]) -> int:
+    # 밀리초 시각 기반, 기존 id와 겹치면 최대 id + 1 (잠금 안에서 호출)
+    ids = [d["id"] for d in data if isinstance(d.get("id"), int)]
+    return max(int(time.time() * 1000), max(ids, default=0) + 1)
+
+
+def _mirror(records: List[Dict[str, Any]] = None, delete_user: Any = False,
+            delete_ids: List[Any] = None) -> Optional[int]:
+    # 조회용 색인(analysis.db)에 같은 변경 반영. 실패해도 history.json 기록은 유지
+    # Returns: 기록 1개면 해당 analysis 행 id
+    from core.services import history_query
+
+    try:
+        if delete_user is not False:
+            history_query.delete_records(delete_user)
+        if delete_ids:
+            history_query.delete_records(ids=delete_ids)
+        if records:
+            history_query.mirror_records(records)
+            if len(records) == 1:
+                return history_query.analysis_id_for(records[0]["id"])
+    except sqlite3.Error as e:
+        print(f"[WARN] 기록 색인 갱신 실패 (다음 시작 시 다시 가져옴): {e}")
+    return None
 
 
 def load_all(username: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -30,21 +82,121 @@ def load_all(username: Optional[str] = None) -> List[Dict[str, Any]]:
     return [d for d in data if d.get("username") == username]
 
 
+def make_record(
+    result_data: Dict[str, Any],
+    username: str,
+    video_path: str,
+    timestamp: Optional[str] = None,
+    description: str = "AI 자동 분석 결과",
+) -> Dict[str, Any]:
+    # predict_from_video 결과 → 분석 기록 (GUI / 분석 서버 공통)
+    return {
+        "username": username,
+        "filename": result_data["filename"],
+        "result": result_data["result"],  # 위험도
+        "risk_level": result_data["result"],  # (옵션)
+        "pose_stats": result_data.get("pose_stats"),
+        "behavior_counts": result_data.get("behavior_counts"),
+        "result_per_chunk": result_data.get("result_per_chunk"),
+        "events": result_data.get("events"),  # 이벤트 타임라인
+        "video_path": video_path,  # 이벤트 위치 이동용 원본 경로
+        "probs_path": result_data.get("probs_path"),  # 재채점용 확률
+        "feature_set": result_data.get("feature_set"),  # 포즈 특징 세트 (xy / xy_vis)
+        "model_version": result_data.get("model_version"),  # 분석 모델 (이름@해시)
+        "ensemble": result_data.get("ensemble"),  # 앙상블 모델별 결과 (선택)
+        "roi": result_data.get("roi"),  # 적용한 카메라 ROI (선택)
+        "profile_path": result_data.get("profile_path"),  # 프로파일(선택)
+        "confidence": None,
+        "timestamp": timestamp or time.strftime("%Y-%m-%d %H:%M"),
+        "description": description,
+    }
+
+
 def append_record(item: Dict[str, Any]) -> None:
-    data = _read()
-    item.setdefault("id", int(time.time() * 1000))
-    data.append(item)
-    _write(data)
+    # job_id가 같은 기록이 이미 있으면 (대기열 작업 재시도) 같은 id로 덮어씀 → 중복 기록 없음
+    # 색인 반영도 잠금 안에서 → 쓰기 순서와 같은 순서로 analysis.db에 반영
+    with _locked():
+        with REGISTRY.timer("history_write"):
+            data = _read()
+            job_id = item.get("job_id")
+            pos = next(
+                (i for i, d in enumerate(data) if job_id is not None and d.get("job_id") == job_id),
+                None,
+            )
+            if pos is None:
+                if item.get("id") is None or any(d.get("id") == item["id"] for d in data):
+                    item["id"] = _new_id(data)
+                data.append(item)
+            else:
+                item["id"] = data[pos].get("id")
+                data[pos] = item
+            _write(data)
+        item["analysis_id"] = _mirror([item])  # 대기열 결과 등에서 analysis 행 번호로 사용
+
+
+def update_records(updates: Dict[Any, Dict[str, Any]]) -> int:
+    # id별 변경 필드를 한 번의 읽기/쓰기로 반영
+    if not updates:
+        return 0
+    with _locked():
+        data = _read()
+        changed = []
+        for d in data:
+            fields = updates.get(d.get("id"))
+            if fields:
+                d.update(fields)
+                changed.append(d)
+        if changed:
+            _write(data)
+            _mirror(changed)
+    return len(changed)
+
+
+def compact_records(before: str) -> int:
+    """
+    before(YYYY-MM-DD HH:MM)보다 오래된 기록의 윈도우별 라벨 목록 → 라벨별 개수 (chunk_counts)
+    (윈도우별 값은 probs_path 확률 파일에 그대로 남아 있음)
+    Returns: 줄인 기록 수
+    """
+    with _locked():
+        data = _read()
+        changed = []
+        for d in data:
+            chunks = d.get("result_per_chunk")
+            if isinstance(chunks, list) and (d.get("timestamp") or "") < before:
+                counts: Dict[str, int] = {}
+                for label in chunks:
+                    counts[label] = counts.get(label, 0) + 1
+                d["chunk_counts"] = counts
+                d.pop("result_per_chunk")
+                changed.append(d)
+        if changed:
+            _write(data)
+            _mirror(changed)
+    return len(changed)
+
+
+def delete_before(before: str) -> List[Dict[str, Any]]:
+    """before(YYYY-MM-DD HH:MM)보다 오래된 기록 삭제. Returns: 삭제한 기록"""
+    with _locked():
+        data = _read()
+        removed = [d for d in data if (d.get("timestamp") or "") < before]
+        if removed:
+            _write([d for d in data if (d.get("timestamp") or "") >= before])
+            _mirror(delete_ids=[d.get("id") for d in removed])
+    return removed
 
 
 def delete_all(username: Optional[str] = None) -> int:
-    data = _read()
-    if username is None:
-        remained = []
-    else:
-        remained = [d for d in data if d.get("username") != username]
-    deleted = len(data) - len(remained)
-    _write(remained)
+    with _locked():
+        data = _read()
+        if username is None:
+            remained = []
+        else:
+            remained = [d for d in data if d.get("username") != username]
+        deleted = len(data) - len(remained)
+        _write(remained)
+        _mirror(delete_user=username)
     return deleted
 
 
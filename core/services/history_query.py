@@ -0,0 +1,313 @@
+# core/services/history_query.py
+"""
+분석 기록 색인 / 조회 (analysis.db analysis 테이블 요약 컬럼)
+
+  - history.json 에 기록을 쓸 때 같은 내용을 analysis 테이블에도 반영 (history_id로 연결)
+  - 조회: 위험도 / 기간 / 파일명 패턴 / 라벨별 비율 하한 필터 + 정렬, 키셋 페이지
+    (OFFSET 없이 "마지막 행 다음부터" → 뒤쪽 페이지도 색인 범위 검색 1번)
+"""
+import base64
+import json
+import os
+import sqlite3
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from core.config import Config
+
+LABELS = ("Normal", "Loitering", "Handover", "Reapproach")
+RISK_RANK = {"상": 3, "중": 2, "하": 1}
+# 정렬 키 → 컬럼 (색인 순서와 같게, 마지막에 id를 붙여 키셋 경계로 사용)
+SORTS = {
+    "date": ("analyzed_at",),
+    "filename": ("filename",),
+    "risk": ("risk_rank", "analyzed_at"),  # 같은 위험도는 시간순
+    **{label.lower(): (f"pct_{label.lower()}",) for label in LABELS},
+}
+_SUMMARY_FIELDS = (
+    "history_id", "user_id", "filename", "result", "uploaded_at", "video_path", "analyzed_at",
+    "risk_rank", "pct_normal", "pct_loitering", "pct_handover", "pct_reapproach",
+    "event_count", "model_version", "record",
+)
+
+
+def _connect():
+    conn = sqlite3.connect(Config.ANALYSIS_DB_PATH)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def label_percentages(record: dict) -> dict:
+    """
+    라벨별 윈도우 비율(%) - 기록 창 표시와 같은 기준 (result_per_chunk 개수)
+    윈도우 목록이 없는 기록은 behavior_counts(확률 평균 %) 사용
+    """
+    counts = record.get("chunk_counts")
+    if counts is None and isinstance(record.get("result_per_chunk"), list):
+        counts = Counter(record["result_per_chunk"])
+    if counts:
+        total = sum(counts.values()) or 1
+        return {label: round(counts.get(label, 0) * 100.0 / total, 2) for label in LABELS}
+    pct = record.get("behavior_counts") or {}
+    return {label: float(pct.get(label) or 0.0) for label in LABELS}
+
+
+def _summary(record: dict) -> tuple:
+    pct = label_percentages(record)
+    compact = {k: v for k, v in record.items() if k != "result_per_chunk"}
+    if isinstance(record.get("result_per_chunk"), list):
+        compact["chunk_counts"] = dict(Counter(record["result_per_chunk"]))
+    level = record.get("risk_level") or record.get("result") or "-"
+    stamp = record.get("timestamp") or ""
+    return (
+        record.get("id"),
+        record.get("username") or "",
+        record.get("filename") or "",
+        level,
+        datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+        record.get("video_path"),
+        stamp,
+        RISK_RANK.get(level, 0),
+        pct["Normal"],
+        pct["Loitering"],
+        pct["Handover"],
+        pct["Reapproach"],
+        len(record.get("events") or []),
+        record.get("model_version"),
+        json.dumps(compact, ensure_ascii=False, default=str),
+    )
+
+
+def index_records(records, conn=None) -> int:
+    """기록(make_record 형식, id 포함) → analysis 테이블 (같은 history_id는 갱신). Returns: 반영 수"""
+    rows = [_summary(r) for r in records if r.get("id") is not None]
+    if not rows:
+        return 0
+    own = conn is None
+    conn = conn or _connect()
+    try:
+        updates = ", ".join(f"{f} = excluded.{f}" for f in _SUMMARY_FIELDS if f not in ("history_id", "uploaded_at"))
+        conn.executemany(
+            f"""
+            INSERT INTO analysis ({', '.join(_SUMMARY_FIELDS)})
+            VALUES ({', '.join('?' * len(_SUMMARY_FIELDS))})
+            ON CONFLICT (history_id) DO UPDATE SET {updates}
+            """,
+            rows,
+        )
+        conn.commit()
+        return len(rows)
+    finally:
+        if own:
+            conn.close()
+
+
+def _mark_synced(conn) -> None:
+    """history.json 현재 상태가 색인에 반영됐음을 기록 (다음 시작 시 가져오기 생략)"""
+    from core.services import history_json
+
+    if os.path.exists(history_json.HISTORY_PATH):
+        conn.execute(
+            "INSERT OR REPLACE INTO analysis_meta (key, value) VALUES ('history_json_mtime', ?)",
+            (str(os.stat(history_json.HISTORY_PATH).st_mtime_ns),),
+        )
+        conn.commit()
+
+
+def mirror_records(records) -> int:
+    """history.json 에 쓴 기록을 바로 색인 (history_json 쓰기 직후 호출)"""
+    conn = _connect()
+    try:
+        n = index_records(records, conn)
+        _mark_synced(conn)
+        return n
+    finally:
+        conn.close()
+
+
+def analysis_id_for(history_id) -> int:
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT id FROM analysis WHERE history_id = ?", (history_id,)
+        ).fetchone()
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+
+def delete_records(username=None, ids=None) -> int:
+    """색인된 기록 삭제 (history_json.delete_all 과 같은 범위, ids: history.json 기록 id 목록)"""
+    conn = _connect()
+    try:
+        if ids is not None:
+            cur = conn.executemany(
+                "DELETE FROM analysis WHERE history_id = ?", [(i,) for i in ids]
+            )
+        elif username is None:
+            cur = conn.execute("DELETE FROM analysis WHERE history_id IS NOT NULL")
+        else:
+            cur = conn.execute(
+                "DELETE FROM analysis WHERE history_id IS NOT NULL AND user_id = ?", (username,)
+            )
+        conn.commit()
+        _mark_synced(conn)
+        return cur.rowcount
+    finally:
+        conn.close()
+
+
+def import_history_json(force: bool = False) -> int:
+    """
+    history.json 기록을 analysis 테이블로 가져오기 (기존 기록 이전용).
+    파일이 마지막 가져오기 이후 바뀌지 않았으면 읽지 않음. Returns: 반영 수
+    """
+    from core.services import history_json
+
+    path = history_json.HISTORY_PATH
+    if not os.path.exists(path):
+        return 0
+    stamp = str(os.stat(path).st_mtime_ns)
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT value FROM analysis_meta WHERE key = 'history_json_mtime'"
+        ).fetchone()
+        if row and row[0] == stamp and not force:
+            return 0
+        n = index_records(history_json.load_all(), conn)
+        _mark_synced(conn)
+        return n
+    finally:
+        conn.close()
+
+
+def _encode_cursor(values) -> str:
+    raw = json.dumps(list(values), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str, size: int) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError, UnicodeDecodeError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError(f"잘못된 페이지 커서: {cursor}")
+    return values
+
+
+def _date_bound(value, end: bool) -> str:
+    """date/datetime/문자열 → analyzed_at 비교값. 날짜만 주면 end는 다음 날 0시 (미포함)"""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M")
+    if isinstance(value, date):
+        value = value.strftime("%Y-%m-%d")
+    value = str(value).strip()
+    if end and len(value) == 10:
+        return (datetime.strptime(value, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+    return value
+
+
+def _like_pattern(pattern: str) -> str:
+    """파일명 패턴 (* ? 와일드카드, 없으면 부분 일치) → LIKE"""
+    escaped = pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    if "*" not in pattern and "?" not in pattern:
+        return f"%{escaped}%"
+    return escaped.replace("*", "%").replace("?", "_")
+
+
+def _filters(user_id, risk, date_from, date_to, filename, min_pct):
+    where, params = ["history_id IS NOT NULL"], []
+    if user_id is not None:
+        where.append("user_id = ?")
+        params.append(user_id)
+    if risk:
+        levels = [risk] if isinstance(risk, str) else list(risk)
+        where.append(f"risk_rank IN ({', '.join('?' * len(levels))})")
+        params.extend(RISK_RANK.get(level, 0) for level in levels)
+    if date_from:
+        where.append("analyzed_at >= ?")
+        params.append(_date_bound(date_from, end=False))
+    if date_to:
+        bound = _date_bound(date_to, end=True)
+        where.append("analyzed_at < ?" if len(bound) == 10 else "analyzed_at <= ?")
+        params.append(bound)
+    if filename:
+        where.append("filename LIKE ? ESCAPE '\\'")
+        params.append(_like_pattern(filename))
+    for label, threshold in (min_pct or {}).items():
+        if label not in LABELS:
+            raise ValueError(f"알 수 없는 라벨: {label}")
+        where.append(f"pct_{label.lower()} >= ?")
+        params.append(float(threshold))
+    return where, params
+
+
+def query_history(
+    user_id=None,
+    *,
+    risk=None,
+    date_from=None,
+    date_to=None,
+    filename=None,
+    min_pct=None,
+    sort: str = "date",
+    descending: bool = True,
+    limit: int = 100,
+    cursor: str = None,
+) -> dict:
+    """
+    기록 조회.
+      risk: "상" 또는 ["상", "중"]
+      date_from / date_to: "YYYY-MM-DD" (양 끝 포함) 또는 "YYYY-MM-DD HH:MM"
+      filename: "cam01*" (* ? 와일드카드, 없으면 부분 일치, 대소문자 무시)
+      min_pct: {"Handover": 30} → Handover 윈도우 비율 30% 이상
+      sort: date / filename / risk / normal / loitering / handover / reapproach
+      cursor: 이전 결과의 next_cursor (다음 페이지)
+    Returns: {"items": [기록 dict, ...], "next_cursor": str 또는 None}
+    """
+    if sort not in SORTS:
+        raise ValueError(f"지원하지 않는 정렬: {sort}")
+    columns = SORTS[sort] + ("id",)
+    where, params = _filters(user_id, risk, date_from, date_to, filename, min_pct)
+    op, order = ("<", "DESC") if descending else (">", "ASC")
+    if cursor:
+        where.append(f"({', '.join(columns)}) {op} ({', '.join('?' * len(columns))})")
+        params.extend(_decode_cursor(cursor, len(columns)))
+    limit = max(int(limit), 1)
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            f"""
+            SELECT record, memo, {', '.join(columns)} FROM analysis
+            WHERE {' AND '.join(where)}
+            ORDER BY {', '.join(f'{c} {order}' for c in columns)}
+            LIMIT ?
+            """,
+            params + [limit],
+        ).fetchall()
+    finally:
+        conn.close()
+    items = []
+    for row in rows:
+        item = json.loads(row[0])
+        item["analysis_id"] = row[-1]
+        if row[1] is not None:
+            item["memo"] = row[1]
+        items.append(item)
+    next_cursor = _encode_cursor(rows[-1][2:]) if len(rows) == limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def count_history(user_id=None, *, risk=None, date_from=None, date_to=None, filename=None,
+                  min_pct=None) -> int:
+    """query_history 와 같은 필터의 전체 건수"""
+    where, params = _filters(user_id, risk, date_from, date_to, filename, min_pct)
+    conn = _connect()
+    try:
+        return conn.execute(
+            f"SELECT COUNT(*) FROM analysis WHERE {' AND '.join(where)}", params
+        ).fetchone()[0]
+    finally:
+        conn.close()
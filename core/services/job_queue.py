@@ -0,0 +1,267 @@
+# core/services/job_queue.py
+import json
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from core.config import Config
+from core.db import get_analysis_connection
+from core.services.history_json import append_record, make_record
+
+# 작업 상태
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _connect():
+    # 트랜잭션을 직접 제어 (BEGIN IMMEDIATE 로 작업 선점을 원자적으로)
+    conn = get_analysis_connection()
+    conn.isolation_level = None
+    conn.row_factory = lambda cur, row: {d[0]: v for d, v in zip(cur.description, row)}
+    return conn
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{threading.get_ident()}"
+
+
+def enqueue(user_id: str, video_path: str, max_attempts: int = None,
+            worker_id: str = None, lease_sec: float = None) -> int:
+    """
+    분석 작업 등록.
+    worker_id 지정 시 해당 워커가 선점한 상태(running, 임대 포함)로 등록
+      → 등록과 선점 사이에 다른 워커가 가져갈 수 없음 (GUI에서 바로 실행하는 경우)
+    Returns: 작업 id
+    """
+    max_attempts = max_attempts or Config.JOB_MAX_ATTEMPTS
+    if worker_id is None:
+        status, attempts, expires = QUEUED, 0, None
+    else:
+        status, attempts = RUNNING, 1
+        expires = time.time() + (lease_sec or Config.JOB_LEASE_SEC)
+    conn = _connect()
+    try:
+        cur = conn.execute(
+            """
+            INSERT INTO jobs (user_id, video_path, status, attempts, max_attempts, lease_owner,
+                              lease_expires, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (user_id, video_path, status, attempts, max_attempts, worker_id, expires, _now(), _now()),
+        )
+        return cur.lastrowid
+    finally:
+        conn.close()
+
+
+def claim(worker_id: str, lease_sec: float = None, job_id: int = None) -> Optional[Dict[str, Any]]:
+    """
+    대기 중인 작업 1개 선점 (임대 만료된 running 작업 = 죽은 워커의 작업도 다시 가져옴).
+    job_id 지정 시 해당 작업만 선점.
+    Returns: 작업 dict 또는 None
+    """
+    lease_sec = lease_sec or Config.JOB_LEASE_SEC
+    now = time.time()
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        # 재시도 횟수를 다 쓴 채로 버려진 작업은 실패 처리
+        conn.execute(
+            """
+            UPDATE jobs SET status = ?, lease_owner = NULL, updated_at = ?,
+                   message = '워커 중단 후 재시도 횟수 초과'
+            WHERE status = ? AND lease_expires < ? AND attempts >= max_attempts
+            """,
+            (FAILED, _now(), RUNNING, now),
+        )
+        sql = """
+            SELECT * FROM jobs
+            WHERE (status = ? OR (status = ? AND lease_expires < ?))
+        """
+        params = [QUEUED, RUNNING, now]
+        if job_id is not None:
+            sql += " AND id = ?"
+            params.append(job_id)
+        job = conn.execute(sql + " ORDER BY id LIMIT 1", params).fetchone()
+        if job is None:
+            conn.execute("COMMIT")
+            return None
+
+        conn.execute(
+            """
+            UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?,
+                   lease_expires = ?, updated_at = ?
+            WHERE id = ?
+            """,
+            (RUNNING, worker_id, now + lease_sec, _now(), job["id"]),
+        )
+        conn.execute("COMMIT")
+        job.update(status=RUNNING, attempts=job["attempts"] + 1, lease_owner=worker_id)
+        return job
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def heartbeat(job_id: int, worker_id: str, lease_sec: float = None) -> bool:
+    """임대 연장. False면 임대를 잃은 것 (다른 워커가 가져감)"""
+    lease_sec = lease_sec or Config.JOB_LEASE_SEC
+    conn = _connect()
+    try:
+        cur = conn.execute(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_owner = ? AND status = ?",
+            (time.time() + lease_sec, job_id, worker_id, RUNNING),
+        )
+        return cur.rowcount > 0
+    finally:
+        conn.close()
+
+
+def complete(job_id: int, worker_id: str, result: dict, analysis_id: int = None) -> bool:
+    conn = _connect()
+    try:
+        cur = conn.execute(
+            """
+            UPDATE jobs SET status = ?, result = ?, analysis_id = ?, message = NULL,
+                   lease_owner = NULL, lease_expires = NULL, updated_at = ?
+            WHERE id = ? AND lease_owner = ? AND status = ?
+            """,
+            (DONE, json.dumps(result, ensure_ascii=False, default=str), analysis_id,
+             _now(), job_id, worker_id, RUNNING),
+        )
+        return cur.rowcount > 0
+    finally:
+        conn.close()
+
+
+def fail(job_id: int, worker_id: str, message: str, retry: bool = True) -> bool:
+    """실패 기록. retry=True이고 재시도 횟수가 남아 있으면 다시 대기열로"""
+    conn = _connect()
+    try:
+        cur = conn.execute(
+            """
+            UPDATE jobs SET
+                status = CASE WHEN ? AND attempts < max_attempts THEN ? ELSE ? END,
+                message = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ?
+            WHERE id = ? AND lease_owner = ? AND status = ?
+            """,
+            (int(retry), QUEUED, FAILED, message, _now(), job_id, worker_id, RUNNING),
+        )
+        return cur.rowcount > 0
+    finally:
+        conn.close()
+
+
+def get_job(job_id: int) -> Optional[Dict[str, Any]]:
+    conn = _connect()
+    try:
+        job = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    if job and job.get("result"):
+        job["result"] = json.loads(job["result"])
+    return job
+
+
+def list_jobs(user_id: str = None, status: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+    """작업 목록 (최신순, 결과 본문 제외)"""
+    sql = (
+        "SELECT id, user_id, video_path, status, attempts, max_attempts, message, "
+        "analysis_id, created_at, updated_at FROM jobs WHERE 1 = 1"
+    )
+    params = []
+    if user_id is not None:
+        sql += " AND user_id = ?"
+        params.append(user_id)
+    if status is not None:
+        sql += " AND status = ?"
+        params.append(status)
+    sql += " ORDER BY id DESC LIMIT ?"
+    params.append(limit)
+    conn = _connect()
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def store_result(job: dict, result: dict, description: str = "대기열 분석 결과") -> int:
+    """
+    성공한 분석 결과를 분석 기록(history.json)에 저장 (analysis 테이블 색인은 함께 갱신).
+    기록은 job_id로 구분 → 저장 후 완료 표시 전에 중단되어 재시도되어도 기록은 1건 (덮어씀)
+    """
+    record = make_record(result, job["user_id"], job["video_path"], description=description)
+    record["job_id"] = job["id"]
+    append_record(record)
+    return record.get("analysis_id")
+
+
+def process_job(job: dict, analyze, worker_id: str, lease_sec: float = None,
+                description: str = "대기열 분석 결과") -> dict:
+    """
+    선점한 작업 1개 실행. 실행 중에는 임대를 주기적으로 연장하고
+    결과를 저장한 뒤 done/failed로 표시.
+    임대를 잃었으면(다른 워커가 이어받음) 결과를 저장하지 않음 → success False
+    """
+    lease_sec = lease_sec or Config.JOB_LEASE_SEC
+    stop = threading.Event()
+
+    def keep_alive():
+        while not stop.wait(lease_sec / 3.0):
+            if not heartbeat(job["id"], worker_id, lease_sec):
+                break
+
+    beat = threading.Thread(target=keep_alive, daemon=True)
+    beat.start()
+    try:
+        result = analyze(job["video_path"], job["user_id"])
+    except Exception as e:
+        fail(job["id"], worker_id, f"분석 오류: {e}", retry=True)
+        return {"success": False, "message": f"분석 오류: {e}"}
+    finally:
+        stop.set()
+        beat.join()
+
+    if result.get("success"):
+        # 저장 직전에 임대 연장 → 성공해야 아직 이 워커의 작업
+        if not heartbeat(job["id"], worker_id, lease_sec):
+            print(f"[WARN] 작업 #{job['id']} 임대를 잃어 결과를 저장하지 않습니다.")
+            return {"success": False, "message": "작업 임대가 만료되어 다른 워커가 처리 중입니다."}
+        try:
+            analysis_id = store_result(job, result, description)
+        except OSError as e:
+            fail(job["id"], worker_id, f"결과 저장 오류: {e}", retry=True)
+            return {"success": False, "message": f"결과 저장 오류: {e}"}
+        if not complete(job["id"], worker_id, result, analysis_id):
+            print(f"[WARN] 작업 #{job['id']} 완료 표시 실패 (임대 만료), 기록은 job_id 기준으로 1건 유지")
+        result["job_id"] = job["id"]
+        result["analysis_id"] = analysis_id
+    else:
+        # 파일 없음 / 포즈 없음 등은 다시 해도 같은 결과 → 재시도 안 함
+        fail(job["id"], worker_id, result.get("message", "분석 실패"), retry=False)
+    return result
+
+
+def run_worker(analyze=None, worker_id: str = None, stop_event=None,
+               poll_sec: float = 1.0, lease_sec: float = None) -> None:
+    """stop_event가 설정될 때까지 대기열에서 작업을 가져와 처리"""
+    if analyze is None:
+        from core.services.predict import predict_from_video
+
+        analyze = predict_from_video
+    worker_id = worker_id or default_worker_id()
+    stop_event = stop_event or threading.Event()
+    while not stop_event.is_set():
+        job = claim(worker_id, lease_sec)
+        if job is None:
+            stop_event.wait(poll_sec)
+            continue
+        process_job(job, analyze, worker_id, lease_sec)
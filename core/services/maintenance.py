@@ -0,0 +1,336 @@
+# core/services/maintenance.py
+"""
+보관 기간 / 정리 (uploads 산출물, history.json, analysis.db)
+
+  1. 보관 기간 (Config.RETENTION_RECORD_DAYS, 0 = 무기한): 오래된 기록/작업/지문/임베딩 행 삭제
+  2. 압축 (Config.RETENTION_COMPACT_DAYS): 오래된 기록·완료 작업 결과의 윈도우별 라벨 목록 → 라벨별 개수
+  3. 참조 없는 파일 삭제: 포즈 시퀀스(.pipe_norm*.npy), 확률(.probs.npy), 프레임 번호(.frames.npy),
+     임베딩(.emb.npy), 썸네일, 포즈 체크포인트 폴더, 업로드 원본(uploads/incoming)
+     (Config.RETENTION_GRACE_HOURS 보다 최근 파일은 분석 중일 수 있어 유지)
+  4. analysis.db ANALYZE / VACUUM
+  이벤트 구간 클립(clips)과 프로파일은 사용자가 직접 만든 산출물이라 건드리지 않음
+
+    python -m core.services.maintenance --dry-run     # 지울 대상/용량만 보고
+    python -m core.services.maintenance               # 실행
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from core.config import Config
+from core.db import get_analysis_connection
+from core.services import history_json
+from core.services.embedding_index import EMB_SUFFIX
+
+_SEQ_SUFFIXES = (".probs.npy", ".frames.npy")
+
+
+def _key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _size(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(
+            os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files
+        )
+    return os.path.getsize(path)
+
+
+def _mtime(path: str) -> float:
+    if os.path.isdir(path):
+        stamps = [
+            os.path.getmtime(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files
+        ]
+        return max(stamps, default=os.path.getmtime(path))
+    return os.path.getmtime(path)
+
+
+def _stamp(days: float, now: float) -> str:
+    """지금부터 days일 전 (기록 timestamp 형식)"""
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(now - days * 86400))
+
+
+def _db_size() -> int:
+    path = Config.ANALYSIS_DB_PATH
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+def _stem(name: str):
+    """산출물 파일명 → 영상 stem (아는 형식이 아니면 None)"""
+    if ".pipe_norm" in name and name.endswith(".npy"):
+        return name.split(".pipe_norm")[0]
+    for suffix in _SEQ_SUFFIXES:
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return None
+
+
+def _references(records, conn):
+    """기록/DB가 참조하는 파일 경로와 영상 stem"""
+    files, stems = set(), set()
+    for r in records:
+        if r.get("filename"):
+            stems.add(os.path.splitext(r["filename"])[0])
+        for path in (r.get("probs_path"), r.get("video_path")):
+            if path:
+                files.add(_key(path))
+        # 프레임 번호 파일은 확률 파일과 같은 분석별 이름 (내보내기에서 사용)
+        if (r.get("probs_path") or "").endswith(".probs.npy"):
+            files.add(_key(r["probs_path"][: -len(".probs.npy")] + ".frames.npy"))
+        for ev in r.get("events") or []:
+            if ev.get("thumbnail"):
+                files.add(_key(ev["thumbnail"]))
+    queries = (
+        "SELECT npy_path FROM video_fingerprint",
+        "SELECT frames_path FROM video_fingerprint",
+        "SELECT emb_path FROM embedding_clip",
+        "SELECT video_path FROM jobs WHERE status IN ('queued', 'running')",
+    )
+    for sql in queries:
+        files.update(_key(row[0]) for row in conn.execute(sql) if row[0])
+    return files, stems
+
+
+def _candidates():
+    """(분류, 경로) - 정리 대상이 될 수 있는 파일/폴더"""
+    upload = Config.UPLOAD_FOLDER
+    for path in glob.glob(os.path.join(upload, "*.npy")):
+        if _stem(os.path.basename(path)) is not None:
+            yield ("pose" if ".pipe_norm" in path else "sequence"), path
+    for path in glob.glob(os.path.join(Config.EMBED_FOLDER, "*" + EMB_SUFFIX)):
+        yield "embedding", path
+    for path in glob.glob(os.path.join(Config.THUMBNAIL_FOLDER, "*")):
+        if os.path.isfile(path):
+            yield "thumbnail", path
+    for path in glob.glob(os.path.join(Config.POSE_CHECKPOINT_FOLDER, "*")):
+        if os.path.isdir(path):
+            yield "checkpoint", path
+    for path in glob.glob(os.path.join(upload, "incoming", "*")):
+        if os.path.isfile(path):
+            yield "incoming", path
+
+
+def find_orphans(records, conn, grace_hours: float = None, now: float = None) -> list:
+    """참조 없는 산출물 [(분류, 경로, 크기), ...] (체크포인트 폴더는 유예 시간이 지나면 대상)"""
+    grace = (Config.RETENTION_GRACE_HOURS if grace_hours is None else grace_hours) * 3600
+    now = now or time.time()
+    files, stems = _references(records, conn)
+    out = []
+    for kind, path in _candidates():
+        try:
+            if now - _mtime(path) < grace:
+                continue
+            if kind != "checkpoint":
+                if _key(path) in files:
+                    continue
+                if kind in ("pose", "sequence") and _stem(os.path.basename(path)) in stems:
+                    continue
+            out.append((kind, path, _size(path)))
+        except OSError:
+            continue  # 검사 중 다른 프로세스가 지운 파일
+    return out
+
+
+def _compact_result(result: dict) -> bool:
+    chunks = result.get("result_per_chunk")
+    if not isinstance(chunks, list):
+        return False
+    result["chunk_counts"] = dict(Counter(chunks))
+    del result["result_per_chunk"]
+    return True
+
+
+def compact_jobs(conn, before: str, batch: int = 200, dry_run: bool = False) -> int:
+    """완료 작업 결과(jobs.result)의 윈도우별 라벨 목록 → 라벨별 개수. Returns: 줄인 작업 수"""
+    before = before + ":59"  # jobs.updated_at 은 초 단위
+    changed, last_id = 0, 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, result FROM jobs WHERE id > ? AND status = 'done' AND updated_at < ? "
+            "AND result LIKE '%result_per_chunk%' ORDER BY id LIMIT ?",
+            (last_id, before, batch),
+        ).fetchall()
+        if not rows:
+            return changed
+        updates = []
+        for job_id, text in rows:
+            try:
+                result = json.loads(text)
+            except (TypeError, ValueError):
+                continue
+            if isinstance(result, dict) and _compact_result(result):
+                updates.append((json.dumps(result, ensure_ascii=False, default=str), job_id))
+        if updates and not dry_run:
+            conn.executemany("UPDATE jobs SET result = ? WHERE id = ?", updates)
+            conn.commit()
+        changed += len(updates)
+        last_id = rows[-1][0]
+
+
+def expire(conn, before: str, dry_run: bool = False) -> dict:
+    """보관 기간이 지난 기록/작업/지문/임베딩 행 삭제 (파일은 다음 단계에서 참조 없는 파일로 삭제)"""
+    stamp = before + ":59"
+    if dry_run:
+        old = [r for r in history_json.load_all() if (r.get("timestamp") or "") < before]
+        records = len(old)
+    else:
+        records = len(history_json.delete_before(before))
+    counts = {"records": records}
+    for table, where in (
+        ("jobs", "status IN ('done', 'failed') AND updated_at < ?"),
+        ("video_fingerprint", "created_at < ?"),
+        ("embedding_clip", "created_at < ?"),
+    ):
+        if dry_run:
+            counts[table] = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", (stamp,)).fetchone()[0]
+        else:
+            counts[table] = conn.execute(f"DELETE FROM {table} WHERE {where}", (stamp,)).rowcount
+    if not dry_run:
+        conn.execute(
+            "DELETE FROM fingerprint_key WHERE video_id NOT IN (SELECT id FROM video_fingerprint)"
+        )
+        conn.commit()
+    return counts
+
+
+def run_maintenance(dry_run: bool = False, vacuum: bool = True, now: float = None) -> dict:
+    """
+    정리 1회 실행.
+    dry_run: 삭제/변경 없이 대상과 용량만 계산 (보관 기간으로 지워질 기록이 참조하는 파일은 제외된 값)
+    Returns: 보고서 dict (freed_bytes = 삭제한 파일 + DB/history.json 감소분)
+    """
+    now = now or time.time()
+    t0 = time.perf_counter()
+    report = {"dry_run": dry_run, "db_before": _db_size()}
+    history_path = history_json.HISTORY_PATH
+    report["history_before"] = os.path.getsize(history_path) if os.path.exists(history_path) else 0
+
+    conn = get_analysis_connection()
+    try:
+        # 1. 보관 기간
+        if Config.RETENTION_RECORD_DAYS > 0:
+            report["expired"] = expire(conn, _stamp(Config.RETENTION_RECORD_DAYS, now), dry_run)
+
+        # 2. 윈도우별 라벨 목록 압축
+        before = _stamp(Config.RETENTION_COMPACT_DAYS, now)
+        if dry_run:
+            report["compacted_records"] = sum(
+                1 for r in history_json.load_all()
+                if isinstance(r.get("result_per_chunk"), list) and (r.get("timestamp") or "") < before
+            )
+        else:
+            report["compacted_records"] = history_json.compact_records(before)
+        report["compacted_jobs"] = compact_jobs(conn, before, dry_run=dry_run)
+
+        # 3. 참조 없는 파일
+        orphans = find_orphans(history_json.load_all(), conn, now=now)
+        by_kind = {}
+        for kind, path, size in orphans:
+            if not dry_run:
+                try:
+                    if os.path.isdir(path):
+                        shutil.rmtree(path)
+                    else:
+                        os.remove(path)
+                except OSError as e:
+                    print(f"[WARN] 삭제 실패: {path} ({e})")
+                    continue
+            entry = by_kind.setdefault(kind, {"files": 0, "bytes": 0})
+            entry["files"] += 1
+            entry["bytes"] += size
+        report["orphans"] = by_kind
+
+        # 4. 파일이 없어진 임베딩 행 + DB 통계/압축
+        missing = [
+            (clip_id,) for clip_id, path in conn.execute("SELECT id, emb_path FROM embedding_clip")
+            if not os.path.exists(path)
+        ]
+        report["dangling_embeddings"] = len(missing)
+        if not dry_run:
+            conn.executemany("DELETE FROM embedding_clip WHERE id = ?", missing)
+            conn.commit()
+            conn.execute("ANALYZE")
+            if vacuum:
+                conn.execute("VACUUM")
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute(
+                "INSERT OR REPLACE INTO analysis_meta (key, value) VALUES ('maintenance_at', ?)",
+                (time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now)),),
+            )
+            conn.commit()
+    finally:
+        conn.close()
+
+    report["db_after"] = _db_size()
+    report["history_after"] = os.path.getsize(history_path) if os.path.exists(history_path) else 0
+    report["freed_bytes"] = (
+        sum(v["bytes"] for v in report["orphans"].values())
+        + max(report["db_before"] - report["db_after"], 0)
+        + max(report["history_before"] - report["history_after"], 0)
+    )
+    report["sec"] = round(time.perf_counter() - t0, 2)
+    return report
+
+
+def describe(report: dict) -> str:
+    mb = lambda n: f"{n / 2**20:.1f}MB"
+    lines = [f"{'[점검] ' if report['dry_run'] else ''}확보 용량 {mb(report['freed_bytes'])} ({report['sec']}초)"]
+    if "expired" in report:
+        lines.append(f"  보관 기간 만료: {report['expired']}")
+    lines.append(
+        f"  압축: 기록 {report['compacted_records']}건, 작업 결과 {report['compacted_jobs']}건 "
+        f"(history.json {mb(report['history_before'])} → {mb(report['history_after'])})"
+    )
+    for kind, v in sorted(report["orphans"].items()):
+        lines.append(f"  참조 없는 {kind}: {v['files']}개 {mb(v['bytes'])}")
+    lines.append(
+        f"  analysis.db {mb(report['db_before'])} → {mb(report['db_after'])}, "
+        f"파일 없는 임베딩 행 {report['dangling_embeddings']}개"
+    )
+    return "\n".join(lines)
+
+
+def start_scheduler(stop_event: threading.Event, interval_hours: float = None):
+    """interval_hours마다 정리 실행하는 스레드 (0이면 시작 안 함). Returns: 스레드 또는 None"""
+    hours = Config.MAINTENANCE_INTERVAL_HOURS if interval_hours is None else interval_hours
+    if hours <= 0:
+        return None
+
+    def loop():
+        while not stop_event.wait(hours * 3600):
+            try:
+                print(f"[MAINT] {describe(run_maintenance())}")
+            except (OSError, sqlite3.Error) as e:
+                print(f"[WARN] 정리 실패 (다음 주기에 다시 시도): {e}")
+
+    thread = threading.Thread(target=loop, name="maintenance", daemon=True)
+    thread.start()
+    return thread
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drovis 산출물/DB 정리")
+    parser.add_argument("--dry-run", action="store_true", help="지우지 않고 대상/용량만 보고")
+    parser.add_argument("--no-vacuum", action="store_true", help="VACUUM 생략 (DB 잠금 시간 단축)")
+    parser.add_argument("--record-days", type=int, help="기록 보관 기간 (기본 Config.RETENTION_RECORD_DAYS)")
+    parser.add_argument("--compact-days", type=int, help="압축 기준 (기본 Config.RETENTION_COMPACT_DAYS)")
+    parser.add_argument("--grace-hours", type=float, help="유예 시간 (기본 Config.RETENTION_GRACE_HOURS)")
+    args = parser.parse_args(argv)
+    if args.record_days is not None:
+        Config.RETENTION_RECORD_DAYS = args.record_days
+    if args.compact_days is not None:
+        Config.RETENTION_COMPACT_DAYS = args.compact_days
+    if args.grace_hours is not None:
+        Config.RETENTION_GRACE_HOURS = args.grace_hours
+    print(describe(run_maintenance(dry_run=args.dry_run, vacuum=not args.no_vacuum)))
+
+
+if __name__ == "__main__":
+    main()
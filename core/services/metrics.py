@@ -0,0 +1,160 @@
+# core/services/metrics.py
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+
+class MetricsRegistry:
+    """
+    프로세스 전체 단계별 시간/카운터 누적 (스레드 안전).
+    JSON lines / Prometheus 텍스트 파일로 내보내기 가능.
+    """
+
+    def __init__(self, prefix: str = "drovis"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.timers = {}  # 단계 → {"count", "total", "max"(1회 평균 기준 최댓값)}
+        self.counters = {}
+
+    def reset(self):
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+
+    def observe(self, name: str, seconds: float, count: int = 1):
+        with self._lock:
+            t = self.timers.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+            t["count"] += count
+            t["total"] += seconds
+            t["max"] = max(t["max"], seconds / max(count, 1))
+
+    def inc(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def timer(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "timers": {k: dict(v) for k, v in self.timers.items()},
+                "counters": dict(self.counters),
+            }
+
+    def export_jsonl(self, path: str) -> None:
+        """현재 누적값을 한 줄 JSON으로 추가 기록"""
+        line = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), **self.snapshot()}
+        _append_jsonl(path, line)
+
+    def export_prometheus(self, path: str) -> None:
+        """Prometheus textfile collector 형식으로 저장 (원자적 교체)"""
+        snap = self.snapshot()
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_stage_seconds_total 단계별 누적 소요 시간(초)",
+            f"# TYPE {p}_stage_seconds_total counter",
+        ]
+        for name, t in sorted(snap["timers"].items()):
+            lines.append(f'{p}_stage_seconds_total{{stage="{name}"}} {t["total"]:.6f}')
+        lines += [f"# TYPE {p}_stage_calls_total counter"]
+        for name, t in sorted(snap["timers"].items()):
+            lines.append(f'{p}_stage_calls_total{{stage="{name}"}} {t["count"]}')
+        lines += [f"# TYPE {p}_stage_seconds_max gauge"]
+        for name, t in sorted(snap["timers"].items()):
+            lines.append(f'{p}_stage_seconds_max{{stage="{name}"}} {t["max"]:.6f}')
+        for name, v in sorted(snap["counters"].items()):
+            lines.append(f"# TYPE {p}_{name}_total counter")
+            lines.append(f"{p}_{name}_total {v}")
+
+        # 작업마다 다른 임시 파일에 쓴 뒤 교체 (여러 워커가 동시에 내보내도 서로 덮어쓰지 않음)
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=folder)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+
+# 프로세스 전역 레지스트리
+REGISTRY = MetricsRegistry()
+
+
+class RunMetrics:
+    """
+    분석 1건의 단계별 시간/카운터. 결과 dict에 첨부하고 flush()로 전역 레지스트리에 합산.
+    프레임 루프처럼 호출이 잦은 곳은 add_time()으로 누적만 함.
+    """
+
+    def __init__(self, registry=REGISTRY):
+        self.registry = registry
+        self.stages = {}  # 단계 → [누적 초, 호출 수]
+        self.counters = {}
+
+    def add_time(self, name: str, seconds: float):
+        st = self.stages.get(name)
+        if st is None:
+            self.stages[name] = [seconds, 1]
+        else:
+            st[0] += seconds
+            st[1] += 1
+
+    def inc(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def timer(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - t0)
+
+    def merge(self, snapshot: dict) -> None:
+        """다른 프로세스에서 측정한 as_dict() 결과를 합산 (포즈 추출 프로세스 등)"""
+        calls = snapshot.get("calls", {})
+        for name, sec in snapshot.get("stages", {}).items():
+            st = self.stages.setdefault(name, [0.0, 0])
+            st[0] += sec
+            st[1] += calls.get(name, 1)
+        for name, n in snapshot.get("counters", {}).items():
+            self.inc(name, n)
+
+    def as_dict(self) -> dict:
+        return {
+            "stages": {k: round(v[0], 6) for k, v in self.stages.items()},
+            "calls": {k: v[1] for k, v in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+    def flush(self):
+        if self.registry is None:
+            return
+        for name, (sec, calls) in self.stages.items():
+            self.registry.observe(name, sec, calls)
+        for name, n in self.counters.items():
+            self.registry.inc(name, n)
+
+
+def _append_jsonl(path: str, row: dict) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def append_run(path: str, run: RunMetrics, **extra) -> None:
+    """분석 1건 측정값을 JSON lines로 추가 (느린 입력 추적/알림용)"""
+    _append_jsonl(path, {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), **extra, **run.as_dict()})
@@ -0,0 +1,178 @@
+# core/services/model_registry.py
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import torch
+
+from core.config import Config
+from core.models.lstm_model import LSTMModel
+from core.services.features import FEATURE_SETS
+
+DEFAULT_LABEL_MAP = {0: "Normal", 1: "Loitering", 2: "Handover", 3: "Reapproach"}
+_LAYER_KEY = re.compile(r"^lstm\.weight_ih_l(\d+)$")
+
+
+def file_hash(path: str, block: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _shape_from_state(state: dict) -> dict:
+    """state_dict 가중치 크기로 LSTMModel 생성 인자 추정"""
+    w = state["lstm.weight_ih_l0"]
+    layers = [int(m.group(1)) for m in map(_LAYER_KEY.match, state) if m]
+    return {
+        "input_size": int(w.shape[1]),
+        "hidden_size": int(w.shape[0] // 4),
+        "num_layers": max(layers) + 1,
+        "num_classes": int(state["fc2.weight"].shape[0]),
+    }
+
+
+def read_info(path: str) -> dict:
+    """
+    체크포인트 메타데이터. <이름>.json 이 있으면 그 값을 우선 사용
+    (input_size, hidden_size, num_layers, num_classes, label_map, feature_set, description)
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    digest = file_hash(path)
+    info = {
+        "name": name,
+        "path": os.path.abspath(path),
+        "sha256": digest,
+        "version": f"{name}@{digest[:12]}",
+        "mtime": int(os.path.getmtime(path)),
+    }
+    meta_path = os.path.splitext(path)[0] + ".json"
+    meta = {}
+    if os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    info.update(meta)
+    info["label_map"] = {
+        int(k): v for k, v in (meta.get("label_map") or DEFAULT_LABEL_MAP).items()
+    }
+    return info
+
+
+def _fill_shape(info: dict, state: dict) -> None:
+    # 메타데이터에 없는 값은 가중치 크기에서
+    for k, v in _shape_from_state(state).items():
+        info.setdefault(k, v)
+    info.setdefault(
+        "feature_set",
+        next((fs for fs, dim in FEATURE_SETS.items() if dim == info["input_size"]), None),
+    )
+
+
+class ModelRegistry:
+    """
+    ai_models/*.pt 체크포인트 목록 / 로드 / 교체.
+      - get(name): 메모리에 최대 capacity개 보관 (LRU)
+      - current(): 사용 중인 (모델, 정보) 쌍. 분석 시작 시 한 번 받아 끝까지 사용
+      - activate(name) / refresh(): 새 모델을 완전히 로드한 뒤 참조만 교체 (원자적)
+        → 진행 중인 분석은 이전 모델로 끝까지 처리
+    """
+
+    def __init__(self, folder: str = None, capacity: int = None, device=None):
+        self.folder = folder or Config.MODEL_FOLDER
+        self.capacity = max(int(capacity or Config.MODEL_CACHE_SIZE), 1)
+        self.device = device or torch.device("cpu")
+        self._lock = threading.RLock()
+        self._cache = OrderedDict()  # version → (net, info)
+        self._active = None  # (net, info)
+
+    def path_for(self, name: str) -> str:
+        return os.path.join(self.folder, f"{name}.pt")
+
+    def list(self) -> list:
+        out = []
+        for path in sorted(glob.glob(os.path.join(self.folder, "*.pt"))):
+            try:
+                info = read_info(path)
+                _fill_shape(info, torch.load(path, map_location="cpu"))
+            except (OSError, ValueError, RuntimeError, KeyError) as e:
+                print(f"[WARN] 모델 정보를 읽을 수 없습니다: {path} ({e})")
+                continue
+            active = self._active
+            info["active"] = active is not None and active[1]["version"] == info["version"]
+            out.append(info)
+        return out
+
+    def _load(self, info: dict):
+        state = torch.load(info["path"], map_location=self.device)
+        _fill_shape(info, state)
+        net = LSTMModel(
+            input_size=info["input_size"],
+            hidden_size=info["hidden_size"],
+            num_layers=info["num_layers"],
+            num_classes=info["num_classes"],
+        )
+        net.load_state_dict(state)
+        net.to(self.device)
+        net.eval()
+        return net
+
+    def get(self, name: str):
+        """(모델, 정보) - 같은 파일 내용(해시)이면 캐시 재사용"""
+        path = self.path_for(name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"모델 파일이 없습니다: {path}")
+        info = read_info(path)
+        with self._lock:
+            hit = self._cache.get(info["version"])
+            if hit is not None:
+                self._cache.move_to_end(info["version"])
+                return hit
+        net = self._load(info)  # 로드는 잠금 밖에서 (다른 분석을 막지 않음)
+        with self._lock:
+            self._cache[info["version"]] = (net, info)
+            self._cache.move_to_end(info["version"])
+            # 사용 중인 모델이 캐시에서 빠져도 _active 참조가 남아 있으므로 안전
+            while len(self._cache) > self.capacity:
+                self._cache.popitem(last=False)
+            return net, info
+
+    def activate(self, name: str) -> dict:
+        """사용 모델 교체. Returns: 새 모델 정보"""
+        net, info = self.get(name)
+        with self._lock:
+            self._active = (net, info)
+        return info
+
+    def current(self):
+        """(모델, 정보). 아직 없으면 Config.ACTIVE_MODEL 로드, 파일이 없으면 (None, None)"""
+        active = self._active
+        if active is not None:
+            return active
+        try:
+            self.activate(Config.ACTIVE_MODEL)
+        except FileNotFoundError:
+            return None, None
+        return self._active
+
+    def refresh(self) -> bool:
+        """사용 중인 모델 파일이 바뀌었으면(재학습 후 덮어쓰기 등) 다시 로드. 바뀌었으면 True"""
+        active = self._active
+        if active is None:
+            return False
+        name = active[1]["name"]
+        path = self.path_for(name)
+        if not os.path.exists(path) or int(os.path.getmtime(path)) == active[1]["mtime"]:
+            return False
+        if read_info(path)["version"] == active[1]["version"]:
+            return False
+        self.activate(name)
+        return True
+
+
+# 프로세스 전역 모델 레지스트리
+MODELS = ModelRegistry(device=torch.device("cuda" if torch.cuda.is_available() else "cpu"))
@@ -0,0 +1,111 @@
+# core/services/motion.py
+import cv2
+import numpy as np
+
+from core.config import Config
+
+
+class MotionGate:
+    """
+    고정 카메라의 정지 구간에서 포즈 추정 생략.
+      - 프레임을 작은 흑백 이미지로 줄여 직전 프레임과 비교,
+        밝기 차가 pixel_delta 넘는 픽셀 비율(0~1) = 움직임 크기 (넓은 화면 속 작은 사람도 잡히도록 평균 대신 비율)
+      - threshold 미만이 hold 프레임 넘게 이어지면 정지 구간 → idle_sample 프레임마다 1장만 포즈 추정
+        (가만히 서 있는 사람도 드문드문 추적되도록 완전히 끄지는 않음)
+      - 정지 구간은 idle_spans [(시작 프레임, 끝 프레임), ...] 으로 기록
+    """
+
+    def __init__(self, threshold: float = None, idle_sample: int = None, hold: int = None,
+                 width: int = 160, pixel_delta: int = 15):
+        self.threshold = Config.MOTION_THRESHOLD if threshold is None else float(threshold)
+        self.pixel_delta = pixel_delta  # 센서 노이즈/압축 잡음 무시용
+        self.idle_sample = max(int(idle_sample or Config.MOTION_IDLE_SAMPLE), 1)
+        self.hold = Config.MOTION_HOLD if hold is None else int(hold)
+        self.width = width
+        self.skipped = 0
+        self.idle_spans = []
+        self._prev = None
+        self._small = None
+        self._gray = None
+        self._diff = None
+        self._quiet = 0  # 연속 정지 프레임 수
+        self._span_start = None
+        self._last_frame = -1
+
+    def energy(self, frame_bgr) -> float:
+        """직전 프레임 대비 바뀐 픽셀 비율 (축소 흑백, 버퍼 재사용)"""
+        h, w = frame_bgr.shape[:2]
+        size = (self.width, max(int(h * self.width / w), 1))
+        self._small = cv2.resize(frame_bgr, size, dst=self._small, interpolation=cv2.INTER_AREA)
+        self._gray = cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        if self._prev is None:
+            self._prev = self._gray.copy()
+            return float("inf")
+        self._diff = cv2.absdiff(self._gray, self._prev, dst=self._diff)
+        self._prev, self._gray = self._gray, self._prev
+        changed = cv2.countNonZero(
+            cv2.threshold(self._diff, self.pixel_delta, 255, cv2.THRESH_BINARY, dst=self._diff)[1]
+        )
+        return changed / float(self._diff.size)
+
+    def should_process(self, frame_no: int, frame_bgr) -> bool:
+        """이 프레임에 포즈 추정을 할지"""
+        self._last_frame = frame_no
+        if self.energy(frame_bgr) >= self.threshold:
+            self._quiet = 0
+            self._close(frame_no - 1)
+            return True
+        self._quiet += 1
+        if self._quiet <= self.hold:
+            return True
+        if self._span_start is None:
+            self._span_start = frame_no
+        if (frame_no - self._span_start) % self.idle_sample == 0:
+            return True
+        self.skipped += 1
+        return False
+
+    def state(self) -> dict:
+        """체크포인트 저장용 (정지 구간, 건너뛴 프레임 수, 아직 닫히지 않은 구간)"""
+        return {
+            "skipped": self.skipped,
+            "idle_spans": [list(s) for s in self.idle_spans],
+            "quiet": self._quiet,
+            "span_start": self._span_start,
+            "last_frame": self._last_frame,
+        }
+
+    def restore(self, state: dict, prev_frame=None) -> None:
+        """체크포인트에서 이어서 처리. prev_frame: 이어서 처리할 프레임 바로 앞 프레임 (비교 기준)"""
+        self.skipped = int(state.get("skipped", 0))
+        self.idle_spans = [tuple(s) for s in state.get("idle_spans", [])]
+        self._quiet = int(state.get("quiet", 0))
+        self._span_start = state.get("span_start")
+        self._last_frame = int(state.get("last_frame", -1))
+        if prev_frame is not None:
+            self.energy(prev_frame)
+
+    def _close(self, end_frame: int) -> None:
+        if self._span_start is not None:
+            self.idle_spans.append((self._span_start, end_frame))
+            self._span_start = None
+
+    def finish(self) -> list:
+        """영상 끝 → 열린 정지 구간 닫고 전체 목록 반환"""
+        self._close(self._last_frame)
+        return self.idle_spans
+
+
+def idle_windows(frame_index, idle_spans, window: int) -> np.ndarray:
+    """
+    윈도우별 정지 구간 포함 여부 (bool, 윈도우 수).
+    정지 구간은 idle_sample 프레임마다 1장만 남아 윈도우 1개가 실제로는 훨씬 긴 시간을 덮음
+    → 학습 때와 시간 축이 달라 추론에 쓰지 않음
+    """
+    fi = np.asarray(frame_index, dtype=np.int64)
+    n = max(len(fi) - window + 1, 0)
+    inside = np.zeros(len(fi), dtype=bool)
+    for a, b in idle_spans:
+        inside[np.searchsorted(fi, a):np.searchsorted(fi, b, side="right")] = True
+    counts = np.r_[0, np.cumsum(inside)]
+    return counts[window:window + n] - counts[:n] > 0
@@ -0,0 +1,280 @@
+# core/services/pose_store.py
+import glob
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+from core.config import Config
+
+CHECKPOINT_NAME = "checkpoint.json"
+
+
+def video_key(video_path: str) -> str:
+    """
+    영상별 산출물 이름 (stem.경로해시8자리).
+    다른 폴더의 같은 이름 영상(camA/a.mp4, camB/a.mp4)끼리 파일이 덮어써지지 않도록 사용
+    """
+    path = os.path.abspath(video_path)
+    key = hashlib.sha1(path.encode("utf-8")).hexdigest()[:8]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return f"{stem}.{key}"
+
+
+def run_key(video_path: str) -> str:
+    """
+    분석 1회의 산출물 이름 (video_key.실행id8자리).
+    같은 영상을 다른 모델/사용자로 다시 분석해도 이전 기록의 확률/썸네일 파일을 덮어쓰지 않도록 사용
+    """
+    return f"{video_key(video_path)}.{uuid.uuid4().hex[:8]}"
+
+
+def checkpoint_dir_for(video_path: str, folder: str = None) -> str:
+    """영상별 체크포인트 폴더 (같은 이름의 다른 영상과 섞이지 않도록 경로 해시 포함)"""
+    return os.path.join(folder or Config.POSE_CHECKPOINT_FOLDER, video_key(video_path))
+
+
+class LandmarkBuffer:
+    """
+    포즈 좌표 float32 버퍼 (미리 할당, 부족하면 2배로 확장).
+      xy:    (N, points*2)  x, y 교대 배치 (기존 66차원 입력과 동일)
+      index: (N,)           원본 프레임 번호
+      extra: (N, points, 2) z, visibility (extras=True 일 때만)
+    프레임마다 파이썬 float 리스트를 만들지 않고 행에 바로 기록.
+    set_affine(): ROI로 자른 영상의 좌표를 전체 프레임 기준으로 바꿔 기록 (x * sx + ox, y * sy + oy)
+    """
+
+    def __init__(self, capacity: int = 1024, points: int = 33, extras: bool = False):
+        capacity = max(int(capacity), 1)
+        self.points = points
+        self.n = 0
+        self.xy = np.empty((capacity, points * 2), dtype=np.float32)
+        self.index = np.empty(capacity, dtype=np.int64)
+        self.extra = np.empty((capacity, points, 2), dtype=np.float32) if extras else None
+        self.affine = None
+
+    def set_affine(self, affine) -> None:
+        """(sx, ox, sy, oy) 또는 None (변환 없음)"""
+        self.affine = tuple(float(v) for v in affine) if affine is not None else None
+
+    @property
+    def capacity(self) -> int:
+        return self.xy.shape[0]
+
+    def _grow(self):
+        cap = self.capacity * 2
+        for name in ("xy", "index", "extra"):
+            old = getattr(self, name)
+            if old is None:
+                continue
+            new = np.empty((cap,) + old.shape[1:], dtype=old.dtype)
+            new[: self.n] = old[: self.n]
+            setattr(self, name, new)
+
+    def push(self, frame_no: int, landmarks) -> None:
+        """MediaPipe landmark 목록 1프레임 기록"""
+        if self.n == self.capacity:
+            self._grow()
+        self._write(self.n, frame_no, landmarks)
+        self.n += 1
+
+    def extend(self, index, xy, extra=None) -> None:
+        """이미 배열로 된 여러 행을 뒤에 추가 (공유 메모리 링 버퍼에서 받은 블록 등)"""
+        k = len(index)
+        while self.n + k > self.capacity:
+            self._grow()
+        self.index[self.n : self.n + k] = index
+        self.xy[self.n : self.n + k] = xy
+        if self.extra is not None and extra is not None:
+            self.extra[self.n : self.n + k] = extra
+        self.n += k
+
+    def _write(self, i: int, frame_no: int, landmarks) -> None:
+        """i번째 행에 1프레임 기록 (affine 변환 포함)"""
+        row = self.xy[i]
+        row[0::2] = [lm.x for lm in landmarks]
+        row[1::2] = [lm.y for lm in landmarks]
+        if self.affine is not None:
+            sx, ox, sy, oy = self.affine
+            row[0::2] *= sx
+            row[0::2] += ox
+            row[1::2] *= sy
+            row[1::2] += oy
+        if self.extra is not None:
+            self.extra[i, :, 0] = [lm.z for lm in landmarks]
+            self.extra[i, :, 1] = [lm.visibility for lm in landmarks]
+            if self.affine is not None:
+                self.extra[i, :, 0] *= self.affine[0]  # z는 x와 같은 축척
+        self.index[i] = frame_no
+
+    def clear(self) -> None:
+        self.n = 0
+
+    def arrays(self) -> dict:
+        """기록된 구간 view (복사 없음)"""
+        out = {"xy": self.xy[: self.n], "index": self.index[: self.n]}
+        if self.extra is not None:
+            out["extra"] = self.extra[: self.n]
+        return out
+
+
+def _video_identity(video_path: str) -> dict:
+    st = os.stat(video_path)
+    return {"video": os.path.abspath(video_path), "size": st.st_size, "mtime": int(st.st_mtime)}
+
+
+class PoseCheckpoint:
+    """
+    긴 영상용 포즈 좌표 청크 저장소.
+      - chunk_frames 프레임(포즈 추정 기준)마다 LandmarkBuffer 내용을 float32 청크(.npy)로 기록
+      - checkpoint.json 에 다음에 처리할 프레임 번호 / 누적 통계 저장
+      - 중단 후 다시 열면 마지막 체크포인트 프레임부터 이어서 처리
+      - assemble(): 청크를 memmap으로 읽어 배열별 파일 하나로 합침 (전체를 메모리에 올리지 않음)
+    """
+
+    def __init__(self, folder: str, video_path: str, points: int = 33,
+                 chunk_frames: int = None, extras: bool = False, stride: int = 1, roi=None,
+                 motion_gate: bool = False):
+        self.folder = folder
+        self.video_path = video_path
+        self.chunk_frames = chunk_frames or Config.POSE_CHUNK_FRAMES
+        self.state = {
+            **_video_identity(video_path),
+            "points": points,
+            "extras": extras,
+            "stride": stride,
+            "roi": roi,  # ROI가 바뀌면 좌표가 달라지므로 처음부터
+            "motion_gate": motion_gate,
+            "next_frame": 0,
+            "chunks": 0,
+            "success": 0,
+            "fail": 0,
+            "done": False,
+            "motion": None,  # MotionGate.state() (정지 구간, 건너뛴 프레임 수)
+        }
+        # 플러시 주기 = 버퍼 크기 → 청크 1개 분량 이상 늘어나지 않음
+        self.buffer = LandmarkBuffer(self.chunk_frames, points, extras)
+        self._since_flush = 0
+
+    @property
+    def next_frame(self) -> int:
+        return self.state["next_frame"]
+
+    def load(self) -> bool:
+        """
+        기존 체크포인트 불러오기. 같은 영상/설정이면 True (이어서 처리),
+        아니면 폴더를 비우고 처음부터.
+        """
+        path = os.path.join(self.folder, CHECKPOINT_NAME)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            saved = None
+        same = saved is not None and all(
+            saved.get(k) == self.state[k] for k in ("video", "size", "mtime", "points", "extras", "stride", "roi", "motion_gate")
+        )
+        if same:
+            self.state.update(saved)
+            return True
+        self.discard()
+        os.makedirs(self.folder, exist_ok=True)
+        return False
+
+    def push(self, frame_no: int, landmarks) -> None:
+        self.buffer.push(frame_no, landmarks)
+
+    def due(self) -> bool:
+        """프레임 1개 처리 후 호출. 청크를 기록할 차례인지"""
+        self._since_flush += 1
+        return self._since_flush >= self.chunk_frames
+
+    def flush(self, next_frame: int, success: int, fail: int, motion: dict = None) -> None:
+        """
+        현재 청크 기록 후 체크포인트 갱신 (청크 → 체크포인트 순서라 중간에 죽어도 일관됨)
+        motion: 움직임 감지 상태 (MotionGate.state(), 사용 시)
+        """
+        i = self.state["chunks"]
+        for name, arr in self.buffer.arrays().items():
+            np.save(os.path.join(self.folder, f"chunk_{i:05d}.{name}.npy"), arr)
+        self.buffer.clear()
+        self._since_flush = 0
+        self.state.update(chunks=i + 1, next_frame=next_frame, success=success, fail=fail, motion=motion)
+        self._write_state()
+
+    def _write_state(self) -> None:
+        tmp = os.path.join(self.folder, CHECKPOINT_NAME + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(self.folder, CHECKPOINT_NAME))
+
+    def _names(self):
+        return ("xy", "index", "extra") if self.state["extras"] else ("xy", "index")
+
+    def assemble(self) -> dict:
+        """
+        청크들을 배열별 파일(xy.npy, index.npy, extra.npy) 하나로 합쳐 memmap으로 반환.
+        Returns: {"xy": (T, points*2), "index": (T,), "extra": (T, points, 2)}
+        """
+        for name in self._names():
+            paths = [
+                os.path.join(self.folder, f"chunk_{i:05d}.{name}.npy")
+                for i in range(self.state["chunks"])
+            ]
+            parts = [np.load(p, mmap_mode="r") for p in paths]
+            like = getattr(self.buffer, name)
+            out = np.lib.format.open_memmap(
+                os.path.join(self.folder, f"{name}.npy"),
+                mode="w+",
+                dtype=like.dtype,
+                shape=(sum(len(a) for a in parts),) + like.shape[1:],
+            )
+            pos = 0
+            for a in parts:
+                out[pos : pos + len(a)] = a
+                pos += len(a)
+            out.flush()
+            del out, parts
+        self.state["done"] = True
+        self._write_state()
+        # 합친 뒤에는 청크 불필요
+        for p in glob.glob(os.path.join(self.folder, "chunk_*.npy")):
+            os.remove(p)
+        return self.load_assembled()
+
+    def load_assembled(self) -> dict:
+        """이미 합쳐 둔 결과 (done 상태에서만)"""
+        return {
+            name: np.load(os.path.join(self.folder, f"{name}.npy"), mmap_mode="r")
+            for name in self._names()
+        }
+
+    def discard(self) -> None:
+        discard(self.folder)
+
+
+def discard(folder: str) -> None:
+    """체크포인트 폴더 삭제 (분석 완료 후 또는 다른 영상으로 바뀐 경우)"""
+
+    def warn(func, path, exc_info):
+        print(f"[WARN] 체크포인트 파일을 삭제할 수 없습니다: {path} ({exc_info[1]})")
+
+    if os.path.isdir(folder):
+        shutil.rmtree(folder, onerror=warn)
+
+
+def list_checkpoints(folder: str = None) -> list:
+    """중단된(미완료) 추출 목록"""
+    out = []
+    for path in glob.glob(os.path.join(folder or Config.POSE_CHECKPOINT_FOLDER, "*", CHECKPOINT_NAME)):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if not state.get("done"):
+            out.append({"folder": os.path.dirname(path), **state})
+    return out
@@ -1,14 +1,42 @@
 import os
+import sqlite3
 import numpy as np
 import torch
-import math
 from collections import Counter
+from contextlib import nullcontext
 from core.services.preprocess import process_pose
+from core.services import pose_store
+from core.services.features import (
+    build_features,
+    feature_dim,
+    frame_visibility,
+    needs_extras,
+    npy_name,
+    window_visibility,
+)
+from core.services.timeline import build_event_timeline, format_timestamp
+from core.services.evidence import save_event_thumbnails
+from core.services.motion import idle_windows
+from core.services.scoring import (
+    SuspicionScorer,
+    evaluate_rules,
+    behavior_percentages,
+    DEFAULT_RULES,
+)
+from core.services.prob_store import save_probs
+from core.services.metrics import RunMetrics, REGISTRY, append_run
+from core.services.profiling import ProfileSession
+from core.services.model_registry import MODELS
+from core.services.ensemble import combine_probs, infer_ensemble, normalize_weights
+from core.services.roi import camera_for_video, get_roi, roi_geometry
+from core.services import fingerprint
+from core.services import embedding_index
+from core.services import shm_transport
 from core.config import Config
-from core.models.lstm_model import LSTMModel
 
 
-DEBUG = True  # 개발- True, 운영 - False
+# 개발- True, 운영 - False (기본 끔, 환경변수 DROVIS_DEBUG=1 로 켜기)
+DEBUG = os.environ.get("DROVIS_DEBUG", "0") == "1"
 
 # Mediapipe 포즈 좌표 인덱스
 PELVIS_L, PELVIS_R = 23, 24          # 좌우 골반
@@ -20,78 +48,174 @@ def normalize_seq_2d(seq: np.ndarray) -> np.ndarray:
     if seq.ndim != 2 or seq.shape[1] != 66:
         return seq.astype(np.float32)
 
-    out = np.zeros_like(seq, dtype=np.float32)
-    for t, fr in enumerate(seq):
-        kp = fr.reshape(33, 2).astype(np.float32)
-        # 골반 중앙 좌표
-        pelvis = (kp[PELVIS_L] + kp[PELVIS_R]) / 2.0
-        # 어깨 높이 
-        shoulder_y = (kp[SHOULDER_L, 1] + kp[SHOULDER_R, 1]) / 2.0
-        # 상체 길이(골반 ~ 어깨)
-        torso_h = abs(pelvis[1] - shoulder_y)
-        if torso_h < 1e-6:
-            torso_h = 1.0
-
-        # 정규화
-        out[t] = ((kp - pelvis) / torso_h).flatten()
-    return out
+    # 프레임 전체를 한 번에 계산 (프레임별 반복과 같은 float32 결과, 입력은 공유 메모리 view도 가능)
+    kp = np.asarray(seq, dtype=np.float32).reshape(len(seq), 33, 2)
+    # 골반 중앙 좌표
+    pelvis = (kp[:, PELVIS_L] + kp[:, PELVIS_R]) / 2.0
+    # 어깨 높이
+    shoulder_y = (kp[:, SHOULDER_L, 1] + kp[:, SHOULDER_R, 1]) / 2.0
+    # 상체 길이(골반 ~ 어깨)
+    torso_h = np.abs(pelvis[:, 1] - shoulder_y)
+    torso_h[torso_h < 1e-6] = 1.0
+
+    # 정규화
+    return ((kp - pelvis[:, None, :]) / torso_h[:, None, None]).reshape(len(seq), 66)
 
 # 라벨 매핑
 LABEL_MAP = {0: "Normal", 1: "Loitering", 2: "Handover", 3: "Reapproach"}
 SUSPICIOUS_LABELS = {1, 2, 3}
-MODEL_PATH = os.path.join(Config.MODEL_FOLDER, "lstm_model.pt")
 UPLOAD_FOLDER = Config.UPLOAD_FOLDER
+KEYFRAME_LIMIT = 48  # 분석 1건당 보관할 축소 키프레임 최대 개수
+WINDOW_SIZE = 30  # 슬라이딩 윈도우 길이 (프레임)
+BATCH_SIZE = 256  # 모델 1회 forward 당 윈도우 수
+FEATURE_SET = Config.FEATURE_SET  # 모델 입력 특징 세트 (기본 xy = 66차원)
+MIN_WINDOW_VISIBILITY = Config.MIN_WINDOW_VISIBILITY  # 이 값 미만 윈도우는 추론 제외 (0 = 끔)
+DEDUP = Config.DEDUP  # 분석 전 중복 영상 확인 (같은 영상이면 결과, 포함된 구간이면 포즈 재사용)
+SAVE_EMBEDDINGS = Config.SAVE_EMBEDDINGS  # 윈도우 행동 임베딩 저장 (유사 행동 검색용)
+POSE_PROCESS = Config.POSE_PROCESS  # 포즈 추출을 별도 프로세스에서 (좌표는 공유 메모리 링 버퍼)
 
 # GPU 사용 여부 확인
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
-# AI 모델 로드
-model = None
-if os.path.exists(MODEL_PATH):
-    model = LSTMModel()
-    state = torch.load(MODEL_PATH, map_location=device)
-    model.load_state_dict(state)
-    model.to(device)
-    model.eval()
+# AI 모델 로드 (Config.ACTIVE_MODEL). 실행 중 교체는 MODELS.activate(이름)
+#  분석 1건은 시작할 때 받은 모델로 끝까지 처리 → 교체 중에도 결과가 섞이지 않음
+model, model_info = MODELS.current()
+if model is not None:
     torch.set_num_threads(1)
 
 
-# 위험도(상, 중, 하) 판단 함수
+# 위험도(상, 중, 하) 판단 함수 (라벨 카운트 기준, 기본 규칙)
 def get_suspicion_level(label_counts: Counter, *, min_total_chunks: int = 4) -> str:
     total = sum(label_counts.values())
-    if total == 0 or total < min_total_chunks:
-        return "하"
-
-    loitering = label_counts.get(1, 0)
-    handover = label_counts.get(2, 0)
-    reapproach = label_counts.get(3, 0)
-
-    # 총 chunk 수 대비 20%, 80% 기준
-    thr20 = math.ceil(0.20 * total)
-    thr80 = math.ceil(0.80 * total)
-
-    # 20% 이상 등장한 행동 개수
-    meets20 = [
-        loitering >= thr20,
-        handover >= thr20,
-        reapproach >= thr20,
-    ]
-    cnt20 = sum(meets20)
-
-    # 위험도 규칙
-    if cnt20 == 3:
-        return "상"
-    if cnt20 >= 2:
-        return "중"
-    if loitering >= thr80 or handover >= thr80 or reapproach >= thr80:
-        return "중"
-    if cnt20 == 1:
-        return "하"
-    return "하"
-
-
-# 전체 예측 함수
-def predict_from_video(video_path: str, user_id: str) -> dict:
+    level, _ = evaluate_rules(
+        dict(label_counts), total, DEFAULT_RULES, min_total=min_total_chunks
+    )
+    return level
+
+
+# 슬라이딩 윈도우 (N, window, D) - 원본 시퀀스를 공유하는 읽기 전용 view
+def make_windows(seq: np.ndarray, window: int = WINDOW_SIZE, step: int = 1) -> np.ndarray:
+    if len(seq) < window:
+        return np.empty((0, window) + seq.shape[1:], dtype=seq.dtype)
+    view = np.lib.stride_tricks.sliding_window_view(seq, window, axis=0)
+    return view.transpose(0, 2, 1)[::step]
+
+
+# 윈도우 배열 → 라벨별 softmax 확률 (N, C)
+#  index: 추론할 윈도우 번호만 지정 (가시성 마스킹 등, 전체를 복사하지 않고 배치 단위로 선택)
+def infer_windows(windows: np.ndarray, batch_size: int = BATCH_SIZE, net=None, index=None) -> np.ndarray:
+    net = net or MODELS.current()[0]
+    total = len(windows) if index is None else len(index)
+    out = []
+    with torch.no_grad():
+        for i in range(0, total, batch_size):
+            # view → 연속 메모리 배치 복사 (배치 크기만큼만)
+            part = windows[i:i + batch_size] if index is None else windows[index[i:i + batch_size]]
+            batch = np.array(part, dtype=np.float32, order="C")
+            logits = net(torch.from_numpy(batch).to(device))
+            out.append(torch.softmax(logits, dim=1).cpu().numpy())
+    if not out:
+        return np.empty((0, len(LABEL_MAP)), dtype=np.float32)
+    return np.vstack(out)
+
+
+# 추론한 윈도우 확률 + 정지 구간 윈도우(idle=True, Normal 확률 1) → 전체 윈도우 순서의 (N, C)
+def fill_idle(probs: np.ndarray, idle: np.ndarray) -> np.ndarray:
+    if not idle.any():
+        return probs
+    full = np.zeros((len(idle), probs.shape[1]), dtype=probs.dtype)
+    full[:, 0] = 1.0
+    full[~idle] = probs
+    return full
+
+
+# 확률 배열 기반 위험도 계산기 (기본값 = 기존 20%/80% 규칙, 스무딩 없음)
+scorer = SuspicionScorer()
+
+
+# 전체 예측 함수 (단계별 측정값을 결과와 전역 레지스트리에 기록)
+#  profile=True: cProfile + tracemalloc + torch 연산 프로파일을 파일로 저장 (느린 영상 진단용)
+#  models=[이름, ...]: 앙상블 (포즈 추출/윈도우 1회, 모델별 추론 후 weights로 확률 결합)
+#  camera: ROI 프리셋 이름 (없으면 영상이 들어 있는 폴더 이름, 프리셋이 없으면 전체 프레임)
+def predict_from_video(video_path: str, user_id: str, profile=None,
+                       models=None, weights=None, combine=None, camera=None) -> dict:
+    if profile is None:
+        profile = Config.PROFILE_ANALYSIS
+    if models is None:
+        models, weights = Config.ENSEMBLE_MODELS or None, weights or Config.ENSEMBLE_WEIGHTS
+    ensemble = {"models": models, "weights": weights, "combine": combine or Config.ENSEMBLE_COMBINE}
+    run = RunMetrics()
+    session = (
+        ProfileSession(os.path.splitext(os.path.basename(video_path))[0])
+        if profile
+        else None
+    )
+    with run.timer("total"), (session or nullcontext()):
+        result = _predict_from_video(video_path, user_id, run, session, ensemble, camera)
+    if session is not None:
+        result["profile_path"] = session.paths.get("json")
+        result["profile"] = {
+            k: v for k, v in session.summary.items() if k != "top_allocations"
+        }
+    run.inc("analyses")
+    if not result.get("success"):
+        run.inc("analysis_errors")
+    run.flush()
+    result["metrics"] = run.as_dict()
+
+    # 측정값 내보내기 (실패해도 분석 결과에는 영향 없음)
+    try:
+        if Config.METRICS_LOG_PATH:
+            append_run(
+                Config.METRICS_LOG_PATH,
+                run,
+                filename=os.path.basename(video_path),
+                success=bool(result.get("success")),
+            )
+        if Config.METRICS_PROM_PATH:
+            REGISTRY.export_prometheus(Config.METRICS_PROM_PATH)
+    except OSError as e:
+        print(f"[WARN] 측정값 기록 실패: {e}")
+
+    if DEBUG:
+        stages = ", ".join(f"{k}={v:.3f}s" for k, v in result["metrics"]["stages"].items())
+        print(f"[TIME] {stages}")
+    return result
+
+
+# 저장된 정규화 시퀀스(.pipe_norm.npy)를 다른 모델로 다시 추론 (포즈 추출 없이 모델 A/B 비교)
+def predict_cached(npy_path: str, model_name: str = None) -> dict:
+    net, info = MODELS.get(model_name) if model_name else MODELS.current()
+    if net is None:
+        return {"success": False, "message": "AI 모델 파일이 없습니다."}
+    sequence = np.load(npy_path, mmap_mode="r")
+    if sequence.ndim != 2 or sequence.shape[1] != info["input_size"]:
+        return {
+            "success": False,
+            "message": f"시퀀스 차원({sequence.shape[-1]})과 모델 입력 크기({info['input_size']})가 다릅니다.",
+        }
+    windows = make_windows(sequence, window=WINDOW_SIZE)
+    if len(windows) == 0:
+        return {"success": False, "message": f"입력 포즈 시퀀스 길이가 부족합니다. ({len(sequence)}프레임 < 30)"}
+    probs = infer_windows(windows, net=net)
+    score = scorer.score(probs)
+    return {
+        "success": True,
+        "model_version": info["version"],
+        "result": score["level"],
+        "behavior_probs_pct": behavior_percentages(probs),
+        "score_evidence": score["evidence"],
+        "probs": probs,
+    }
+
+
+# 여러 영상 순차 분석 (모델은 한 번만 로드된 상태 그대로 재사용)
+def predict_batch(video_paths, user_id: str, profile=None) -> list:
+    return [predict_from_video(p, user_id, profile=profile) for p in video_paths]
+
+
+def _predict_from_video(video_path: str, user_id: str, run: RunMetrics, session=None,
+                        ensemble=None, camera=None) -> dict:
     # 입력 파일 체크
     if not os.path.isfile(video_path):
         return {
@@ -99,30 +223,130 @@ def predict_from_video(video_path: str, user_id: str) -> dict:
             "message": f"영상 파일이 존재하지 않습니다: {video_path}",
         }
     filename = os.path.basename(video_path)
-    npy_name = os.path.splitext(filename)[0] + ".pipe_norm.npy"
-    npy_path = os.path.join(UPLOAD_FOLDER, npy_name)
+    # 확률/프레임 번호/썸네일 파일 이름 (경로 해시 + 실행 id → 다른 영상/이전 분석 기록과 겹치지 않음)
+    artifact = pose_store.run_key(video_path)
+    npy_path = os.path.join(UPLOAD_FOLDER, npy_name(os.path.splitext(filename)[0], FEATURE_SET))
 
-    # 1) 포즈 추출
+    # 이번 분석에 사용할 모델 (도중에 교체되어도 이 모델로 끝까지)
+    ensemble = ensemble or {}
     try:
-        pose_seq, pose_stats = process_pose(
-            video_path,
-            detected_points=33,
-            return_stats=True,
-        )
-        if pose_seq is None or len(pose_seq) == 0:
-            return {"success": False, "message": "MediaPipe pose 변환 실패"}
+        if ensemble.get("models"):
+            members = [MODELS.get(name) for name in ensemble["models"]]
+            weights = normalize_weights(ensemble.get("weights"), len(members))
+        else:
+            members, weights = [MODELS.current()], None
+    except (FileNotFoundError, ValueError) as e:
+        return {"success": False, "message": f"모델 설정 오류: {e}"}
+    net, net_info = members[0]
+
+    # 특징 세트와 모델 입력 크기가 다르면 포즈 추출 전에 중단
+    for _, info in members:
+        if info is not None and info["input_size"] != feature_dim(FEATURE_SET):
+            return {
+                "success": False,
+                "message": f"모델 입력 크기({info['input_size']})와 특징 세트"
+                f"({FEATURE_SET}, {feature_dim(FEATURE_SET)})가 맞지 않습니다.",
+            }
+
+    # 카메라별 ROI 프리셋
+    camera = camera or camera_for_video(video_path)
+    try:
+        roi = get_roi(camera)
+    except sqlite3.Error as e:
+        print(f"[WARN] ROI 프리셋을 읽을 수 없습니다: {camera} ({e})")
+        roi = None
+
+    # 0) 중복 영상 확인: 같은 영상(같은 모델/ROI)이면 기존 결과, 기존 영상에 포함된 구간이면 포즈 재사용
+    fp, duplicate, reused = None, None, None
+    if DEDUP:
+        try:
+            with run.timer("fingerprint"):
+                fp = fingerprint.video_fingerprint(video_path)
+                duplicate = fingerprint.find_duplicate(fp, FEATURE_SET, user_id) if fp else None
+        except sqlite3.Error as e:
+            print(f"[WARN] 영상 지문 색인을 읽을 수 없습니다: {e}")
+    if duplicate is not None:
+        previous = duplicate["result"] or {}
+        same_roi = roi_geometry(previous.get("roi")) == roi_geometry(roi)
+        version = "+".join(info["version"] for _, info in members if info is not None)
+        if same_roi and duplicate["kind"] in ("identical", "duplicate"):
+            if previous.get("success") and previous.get("model_version") == version:
+                run.inc("dedup_result_reused")
+                return fingerprint.reuse_result(duplicate, filename, fp)
+        if same_roi and duplicate["kind"] != "overlap":
+            reused = fingerprint.load_pose_slice(duplicate, fp)
+
+    # 1) 포즈 추출 (재사용할 포즈가 있으면 생략)
+    try:
+        if reused is not None:
+            run.inc("dedup_pose_reused")
+            pose_seq = None
+            pose_stats = {
+                "success": int(len(reused[0])),
+                "fail": 0,
+                "fps": fp["fps"],
+                "frame_index": reused[1],
+                "idle_spans": fingerprint.reused_idle_spans(duplicate, fp),
+                "keyframes": None,
+                "checkpoint": None,
+            }
+        elif POSE_PROCESS:
+            # 포즈 프로세스가 링 버퍼에 쓴 좌표를 받는 즉시 정규화 (추출과 정규화가 겹쳐 진행)
+            pose_seq, pose_stats = shm_transport.extract_pose(
+                video_path,
+                transform=normalize_seq_2d,
+                metrics=run,
+                detected_points=33,
+                keyframes=KEYFRAME_LIMIT,
+                extras=needs_extras(FEATURE_SET, MIN_WINDOW_VISIBILITY),
+                roi=roi,
+            )
+            if pose_seq is None or len(pose_seq) == 0:
+                return {"success": False, "message": "MediaPipe pose 변환 실패"}
+        else:
+            pose_seq, pose_stats = process_pose(
+                video_path,
+                detected_points=33,
+                return_stats=True,
+                keyframes=KEYFRAME_LIMIT,
+                metrics=run,
+                checkpoint_dir=pose_store.checkpoint_dir_for(video_path),
+                extras=needs_extras(FEATURE_SET, MIN_WINDOW_VISIBILITY),
+                roi=roi,
+            )
+            if pose_seq is None or len(pose_seq) == 0:
+                return {"success": False, "message": "MediaPipe pose 변환 실패"}
     except Exception as e:
         return {"success": False, "message": f"전처리 오류: {str(e)}"}
 
-    if model is None:
+    if net is None:
         return {"success": False, "message": "AI 모델 파일이 없습니다."}
 
-
     try:
         # 2) 정규화 및 저장
-        sequence = normalize_seq_2d(np.asarray(pose_seq, dtype=np.float32))
-        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-        np.save(npy_path, sequence)
+        # z/visibility (extras 추출 시) → 특징/마스킹에만 사용, 결과(JSON)에는 넣지 않음
+        extra = pose_stats.pop("landmark_extra", None)
+        if reused is not None:
+            sequence = reused[0]  # 이미 정규화/특징 변환된 시퀀스
+        elif pose_stats.pop("normalized", False):
+            with run.timer("features"):
+                sequence = build_features(pose_seq, extra, FEATURE_SET)  # 받으면서 정규화 완료
+        else:
+            with run.timer("normalize"):
+                sequence = normalize_seq_2d(np.asarray(pose_seq, dtype=np.float32))
+                sequence = build_features(sequence, extra, FEATURE_SET)
+        with run.timer("np_save"):
+            os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+            np.save(npy_path, sequence)
+        # 긴 영상 체크포인트는 정규화 결과를 저장한 뒤 정리
+        #  (체크포인트 파일의 memmap을 모두 놓아야 삭제됨 - Windows는 열린 파일을 지울 수 없음)
+        checkpoint = pose_stats.pop("checkpoint", None)
+        if checkpoint:
+            del pose_seq
+            pose_stats["frame_index"] = np.array(pose_stats["frame_index"])
+            if extra is not None:
+                extra = np.array(extra)
+            pose_store.discard(checkpoint)
 
         if len(sequence) < 30:
             return {
@@ -131,52 +355,125 @@ def predict_from_video(video_path: str, user_id: str) -> dict:
             }
 
 
-        # 3) 30 프레임 슬라이딩 윈도우 생성
-        def make_chunk_step(seq: np.ndarray, window: int = 30, step: int = 1):
-            n = len(seq)
-            return [seq[i:i+window] for i in range(0, n - window + 1, step)]
-        
-        chunks = make_chunk_step(sequence, window=30)
-        if not chunks:
+        # 3) 30 프레임 슬라이딩 윈도우 생성 (복사 없는 view)
+        with run.timer("windows"):
+            chunks = make_windows(sequence, window=WINDOW_SIZE)
+        run.inc("windows", len(chunks))
+        if len(chunks) == 0:
             return {
                 "success": False,
                 "message": f"윈도우가 생성되지 않았습니다. (frames={len(sequence)} < 30)",
             }
 
-        # 4) 모델 예측
-        predictions = []
-        probs_list = []
-
-        with torch.no_grad():
-            for chunk in chunks:
-                x = (
-                    torch.from_numpy(np.asarray(chunk, dtype=np.float32))
-                    .unsqueeze(0)
-                    .to(device)
-                )
-                logits = model(x)
-
-                probs = torch.softmax(logits, dim=1)[0].cpu().numpy()
-                pred_label = int(np.argmax(probs))
-                predictions.append(pred_label)
-                probs_list.append(probs)
+        # 3-1) 가림/저화질 구간: 윈도우 평균 visibility가 기준 미만이면 추론 제외
+        window_starts = None
+        if MIN_WINDOW_VISIBILITY > 0 and extra is not None:
+            vis = window_visibility(frame_visibility(extra), WINDOW_SIZE)
+            window_starts = np.flatnonzero(vis >= MIN_WINDOW_VISIBILITY)
+            pose_stats["masked_windows"] = int(len(chunks) - len(window_starts))
+            run.inc("windows_masked", pose_stats["masked_windows"])
+            if len(window_starts) == 0:
+                return {
+                    "success": False,
+                    "message": f"모든 윈도우의 가시성이 기준({MIN_WINDOW_VISIBILITY}) 미만입니다.",
+                }
+
+        # 3-2) 움직임 없는 구간 (motion gate): 정지 구간 프레임이 섞인 윈도우는 추론하지 않고 Normal로 채점
+        rows = np.arange(len(chunks)) if window_starts is None else window_starts
+        idle = np.zeros(len(rows), dtype=bool)
+        if pose_stats.get("idle_spans") and pose_stats.get("frame_index") is not None:
+            idle = idle_windows(pose_stats["frame_index"], pose_stats["idle_spans"], WINDOW_SIZE)[rows]
+            pose_stats["idle_windows"] = int(idle.sum())
+            run.inc("windows_idle", pose_stats["idle_windows"])
+        infer_index = rows[~idle] if idle.any() else window_starts
+
+        # 4) 모델 예측 (배치 단위)
+        with run.timer("model_forward"), (
+            session.torch_ops() if session is not None else nullcontext()
+        ):
+            if len(members) == 1:
+                probs = fill_idle(infer_windows(chunks, net=net, index=infer_index), idle)
+            else:
+                member_probs = [
+                    fill_idle(p, idle)
+                    for p in infer_ensemble(
+                        chunks, [m for m, _ in members], BATCH_SIZE, infer_index, parallel=True
+                    )
+                ]
+        ensemble_detail = None
+        if len(members) > 1:
+            with run.timer("ensemble_combine"):
+                probs = combine_probs(member_probs, weights, ensemble["combine"])
+            # 모델별 결과 (비교용)
+            ensemble_detail = {
+                "combine": ensemble["combine"],
+                "members": [
+                    {
+                        "model_version": info["version"],
+                        "weight": round(float(w), 4),
+                        "result": scorer.score(p)["level"],
+                        "behavior_probs_pct": behavior_percentages(p),
+                    }
+                    for (_, info), w, p in zip(members, weights, member_probs)
+                ],
+            }
+        predictions = probs.argmax(axis=1).tolist()
 
         label_counts = Counter(predictions)
 
         # 포즈 통계 기본값 보정
         if not isinstance(pose_stats, dict):
             pose_stats = {"success": int(len(sequence)), "fail": 0}
+        # 프레임 번호 배열/키프레임은 결과(JSON)에 넣지 않고 후처리에만 사용
+        frame_index = pose_stats.pop("frame_index", None)
+        keyframes = pose_stats.pop("keyframes", None)
+        fps = pose_stats.get("fps") or 0.0
+        # 움직임 없는 구간 (motion gate 사용 시) → 시각 포함 목록, 해당 구간 윈도우는 3-2)에서 Normal로 채점
+        idle_spans = [
+            {
+                "start_frame": int(a),
+                "end_frame": int(b),
+                "start_ts": format_timestamp(a / (fps or 30.0)),
+                "end_ts": format_timestamp((b + 1) / (fps or 30.0)),
+            }
+            for a, b in pose_stats.pop("idle_spans", [])
+        ]
 
-        # 5) 행동별 평균 확률 계산
-        avg = np.mean(np.vstack(probs_list), axis=0)
-        behavior_probs_pct = {
-            "Loitering": round(float(avg[1] * 100), 1),
-            "Handover": round(float(avg[2] * 100), 1),
-            "Reapproach": round(float(avg[3] * 100), 1),
-        }
+        # 5) 행동별 평균 확률 계산 + 윈도우별 확률 저장 (재추론 없이 재채점용)
+        behavior_probs_pct = behavior_percentages(probs)
+        with run.timer("probs_save"):
+            probs_path = save_probs(probs, artifact)
+
+        # 5-1) 행동 임베딩 (EMBED_STRIDE 윈도우마다, 앙상블이면 첫 모델 기준)
+        embeddings = None
+        if SAVE_EMBEDDINGS:
+            with run.timer("embeddings"):
+                picked = rows[~idle][::max(int(Config.EMBED_STRIDE), 1)]
+                embeddings = (
+                    embedding_index.embed_windows(chunks, net, index=picked, batch_size=BATCH_SIZE),
+                    frame_index[picked] if frame_index is not None else picked,
+                )
 
-        # 6) 위험도 계산
-        suspicion_level = get_suspicion_level(label_counts)
+        # 6) 위험도 계산 (윈도우별 확률 → 규칙 적용, 규칙별 근거 포함)
+        with run.timer("scoring"):
+            score = scorer.score(probs)
+        suspicion_level = score["level"]
+
+        # 7) 연속 윈도우 → 이벤트 타임라인 (라벨, 시작/끝 프레임·시간, 최대/평균 신뢰도)
+        with run.timer("timeline"):
+            events = build_event_timeline(
+                probs,
+                frame_index=frame_index,
+                fps=fps,
+                window=WINDOW_SIZE,
+                step=1,
+                label_map=LABEL_MAP,
+                window_starts=window_starts,
+            )
+            # 디코딩 중 보관한 키프레임으로 이벤트 썸네일 저장
+            save_event_thumbnails(
+                events, keyframes, Config.THUMBNAIL_FOLDER, artifact
+            )
 
 
         # DEBUG 출력
@@ -204,6 +501,11 @@ def predict_from_video(video_path: str, user_id: str) -> dict:
             print(
                 f"[DBG] frames(after norm)={len(sequence)}, chunks={len(chunks)}, expect={max(len(sequence)-29,0)}"
             )
+            for ev in events:
+                print(
+                    f"[EVENT] {ev['start_ts']} ~ {ev['end_ts']} {ev['label']} "
+                    f"(최대 {ev['peak_conf'] * 100:.1f}%, 평균 {ev['mean_conf'] * 100:.1f}%)"
+                )
 
         # 실제 탐지된 행동 라벨 리스트
         detected = [
@@ -215,7 +517,7 @@ def predict_from_video(video_path: str, user_id: str) -> dict:
 
 
     # 최종 결과 반환
-    return {
+    result = {
         "success": True,
         "filename": filename,
         "result": suspicion_level,                  # 위험도(상/중/하)
@@ -223,6 +525,37 @@ def predict_from_video(video_path: str, user_id: str) -> dict:
         "behavior_probs_pct": behavior_probs_pct,   # 탐지 행동 비율(%)
         "behavior_counts":behavior_probs_pct,       # 프론트 호환용
         "detected_actions": detected,               
+        "score_evidence": score["evidence"],        # 위험도 규칙별 근거
         "result_per_chunk": [LABEL_MAP[p] for p in predictions],
+        "events": events,                           # 행동 이벤트 타임라인
+        "idle_spans": idle_spans,                   # 움직임 없어 포즈 추정을 생략한 구간
         "npy_path": npy_path,
+        "feature_set": FEATURE_SET,                 # npy / 모델 입력 특징 세트
+        "model_version": "+".join(info["version"] for _, info in members),  # 분석 모델 (이름@해시)
+        "ensemble": ensemble_detail,                # 앙상블 사용 시 모델별 결과
+        "roi": roi,                                 # 적용한 ROI 프리셋 (없으면 None)
+        "probs_path": probs_path,                   # 윈도우별 확률 (float16)
+        "duplicate_of": (                           # 중복/겹치는 기존 영상 (DEDUP 사용 시)
+            fingerprint.describe(duplicate, "pose" if reused is not None else None)
+            if duplicate is not None
+            else None
+        ),
     }
+
+    # 임베딩 저장 (analysis.db embedding_clip + npy)
+    if embeddings is not None:
+        try:
+            result["embedding_id"] = embedding_index.save_clip(
+                user_id, video_path, members[0][1]["version"], embeddings[0], embeddings[1], fps
+            )
+        except (OSError, sqlite3.Error) as e:
+            print(f"[WARN] 임베딩 저장 실패: {e}")
+
+    # 지문 색인에 등록 (이후 같은 영상은 재분석 생략)
+    if fp is not None:
+        try:
+            frames_path = fingerprint.save_frame_index(frame_index, artifact)
+            fingerprint.register(fp, result, FEATURE_SET, frames_path, user_id)
+        except (OSError, sqlite3.Error) as e:
+            print(f"[WARN] 영상 지문 등록 실패: {e}")
+    return result
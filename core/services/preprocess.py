@@ -1,13 +1,40 @@
-import cv2
-import numpy as np
+import time
 import mediapipe as mp
+from core.services.decode import open_video, RGBConverter
+from core.services.motion import MotionGate
+from core.services.roi import RoiCropper, roi_geometry
+from core.services.evidence import KeyframeBuffer
+from core.services.metrics import RunMetrics
+from core.services.pose_store import LandmarkBuffer, PoseCheckpoint
+from core.config import Config
 
 
 def process_pose(
     video_path,
     detected_points=33,
     return_stats=True,
+    keyframes=0,
+    metrics=None,
+    checkpoint_dir=None,
+    checkpoint_min_frames=None,
+    extras=False,
+    backend=None,
+    stride=1,
+    motion_gate=None,
+    roi=None,
+    sink=None,
 ):
+    # stride > 1: stride 프레임마다 1장만 포즈 추정 (나머지는 grab으로 건너뜀).
+    #   frame_index는 원본 프레임 번호 그대로 → 타임스탬프 정확. 모델 입력 간격은 달라지므로 기본 1
+    # roi: {"x", "y", "w", "h", "upscale"} (0~1 비율). 이 영역만 잘라(확대해) 포즈 추정,
+    #   좌표는 전체 프레임 기준으로 되돌려 기록 → 정규화/모델 입력은 ROI 없을 때와 같은 좌표계
+    #   (키프레임/움직임 감지는 전체 프레임 사용)
+    # sink: 좌표를 이 버퍼(LandmarkBuffer 호환, 예: 공유 메모리 링 버퍼)에 바로 기록.
+    #   다른 프로세스가 읽어 가므로 체크포인트 없이 처리, 반환 좌표 배열은 비어 있음
+    # 단계별 시간 측정 (전달받지 않으면 이번 호출에서만 사용)
+    metrics = metrics if metrics is not None else RunMetrics(registry=None)
+    clock = time.perf_counter
+
     # Mediapipe Pose 객체 초기화
     mp_pose = mp.solutions.pose
     pose = mp_pose.Pose(
@@ -16,42 +43,191 @@ def process_pose(
         min_tracking_confidence=0.5       # 추적 최소 신뢰도 (0~1)
         )
 
-    # OpenCV로 영상 열기
-    cap = cv2.VideoCapture(video_path)
-    frames = []
+    # 영상 열기 (디코딩 백엔드: Config.DECODE_BACKEND)
+    stride = max(int(stride), 1)
+    t0 = clock()
+    cap = open_video(video_path, backend)
+    metrics.add_time("open", clock() - t0)
     success_cnt, fail_cnt = 0, 0
 
     # 영상 파일 열기 실패 시 에러 반환
-    if not cap.isOpened():
+    if not cap.is_open():
         print(f"[ERROR] 영상 파일을 열 수 없습니다: {video_path}")
         return (None, None) if return_stats else None
 
+    # 타임스탬프 계산용 FPS (메타데이터 없으면 0)
+    fps = cap.fps
+
+    # 증거 키프레임 (디코딩 중에 같이 보관 → 재디코딩 불필요)
+    kf_buffer = KeyframeBuffer(max_frames=keyframes) if keyframes else None
+
+    # 컨테이너에 기록된 전체 프레임 수 (없거나 부정확할 수 있음 → 버퍼는 필요 시 확장)
+    frame_count = cap.frame_count
+
+    roi_key = roi_geometry(roi)
+
+    # 움직임 없는 구간은 포즈 추정 생략 (None이면 Config.MOTION_GATE)
+    if motion_gate is None:
+        motion_gate = Config.MOTION_GATE
+    gate = MotionGate() if motion_gate else None
+
+    # 긴 영상: 청크 단위로 디스크에 기록하며 체크포인트 (중단 시 이어서 처리)
+    checkpoint = None
+    start_frame = 0
+    if checkpoint_dir and sink is None:
+        if checkpoint_min_frames is None:
+            checkpoint_min_frames = Config.POSE_CHECKPOINT_MIN_FRAMES
+        if frame_count >= checkpoint_min_frames:
+            checkpoint = PoseCheckpoint(
+                checkpoint_dir, video_path, points=detected_points, extras=extras,
+                stride=stride, roi=roi_key, motion_gate=bool(gate),
+            )
+            checkpoint.load()
+    if checkpoint is not None:
+        if checkpoint.state["done"]:
+            # 이미 추출 완료 (분석 단계에서 중단된 경우)
+            cap.release()
+            pose.close()
+            return _output(
+                checkpoint.load_assembled(), checkpoint.state["success"],
+                checkpoint.state["fail"], fps, kf_buffer, checkpoint.folder, return_stats,
+                **_motion_stats(checkpoint.state["motion"], checkpoint.next_frame),
+            )
+        start_frame = checkpoint.next_frame
+        success_cnt, fail_cnt = checkpoint.state["success"], checkpoint.state["fail"]
+        # 처리한 구간은 디코딩만 하고 건너뜀 (grab: 색 변환/포즈 추정 없음)
+        #  움직임 감지 사용 시 마지막 1장은 읽어서 비교 기준으로
+        resume_gate = gate is not None and checkpoint.state["motion"] and start_frame > 0
+        t0 = clock()
+        for _ in range(start_frame - 1 if resume_gate else start_frame):
+            if not cap.grab():
+                break
+        if resume_gate:
+            # 정지 구간/건너뛴 수는 체크포인트 이전 구간까지 포함해 이어서 기록
+            ret, prev = cap.read()
+            gate.restore(checkpoint.state["motion"], prev if ret else None)
+        metrics.add_time("resume_seek", clock() - t0)
+        metrics.inc("frames_resumed", start_frame)
+
+    # 좌표 버퍼: 외부 sink > 체크포인트 사용 시 청크 크기 > 전체 프레임 수로 미리 할당
+    if sink is not None:
+        buffer = sink
+    elif checkpoint is not None:
+        buffer = checkpoint.buffer
+    else:
+        buffer = LandmarkBuffer(-(-frame_count // stride) or 1024, detected_points, extras)
+    to_rgb = RGBConverter()
+    cropper = None  # 첫 프레임 크기를 보고 생성
+    skipped_before = gate.skipped if gate is not None else 0
+
     # 프레임 단위로 영상 읽기
+    frame_no = start_frame - 1
     while True:
+        # 건너뛸 프레임은 grab만 (BGR 변환/복사 없음)
+        if stride > 1 and (frame_no + 1) % stride:
+            t0 = clock()
+            ok = cap.grab()
+            metrics.add_time("grab", clock() - t0)
+            if not ok:
+                break
+            frame_no += 1
+            metrics.inc("frames_skipped")
+            continue
+        t0 = clock()
         ret, frame = cap.read()
+        t1 = clock()
         if not ret:
             break
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        frame_no += 1
+        tg = t1
+        if gate is not None:
+            process = gate.should_process(frame_no, frame)
+            tg = clock()
+            metrics.add_time("motion_gate", tg - t1)
+            if not process:
+                metrics.add_time("decode", t1 - t0)
+                continue
+        if roi_key is not None:
+            if cropper is None:
+                cropper = RoiCropper(roi_key, frame.shape[1], frame.shape[0])
+                buffer.set_affine(cropper.affine)
+            frame_rgb = to_rgb(cropper.crop(frame))
+        else:
+            frame_rgb = to_rgb(frame)
+        t2 = clock()
         results = pose.process(frame_rgb)
+        t3 = clock()
+        metrics.add_time("decode", t1 - t0)
+        metrics.add_time("cvt_color", t2 - tg)
+        metrics.add_time("pose_process", t3 - t2)
 
         # 포즈 좌표 검출된 경우
         if results.pose_landmarks:
-            coords = []
-            for lm in results.pose_landmarks.landmark:
-                # 각 랜드마크의 (x, y) 좌표 저장
-                coords.extend([lm.x, lm.y])
-            frames.append(coords)
+            # 각 랜드마크의 (x, y) 좌표를 버퍼 행에 바로 기록
+            buffer.push(frame_no, results.pose_landmarks.landmark)
             success_cnt += 1
+            # 사람이 검출된 프레임만 키프레임 후보
+            if kf_buffer is not None:
+                kf_buffer.offer(frame_no, frame)
         else:
             fail_cnt += 1
-            continue
+
+        if checkpoint is not None and checkpoint.due():
+            checkpoint.flush(
+                frame_no + 1, success_cnt, fail_cnt, gate.state() if gate is not None else None
+            )
 
     cap.release()
     pose.close()
+    metrics.inc("frames_decoded", frame_no + 1 - start_frame)
+    metrics.inc("pose_success", success_cnt)
+    metrics.inc("pose_fail", fail_cnt)
+
+    motion = None
+    if gate is not None:
+        metrics.inc("frames_motion_skipped", gate.skipped - skipped_before)
+        gate.finish()  # 열린 정지 구간 닫기
+        motion = gate.state()
+    if checkpoint is not None:
+        # 남은 청크 기록 후 청크들을 memmap으로 합침
+        with metrics.timer("pose_assemble"):
+            checkpoint.flush(frame_no + 1, success_cnt, fail_cnt, motion)
+            arrays = checkpoint.assemble()
+    else:
+        arrays = buffer.arrays()
+
+    motion = _motion_stats(motion, frame_no + 1)
+    return _output(
+        arrays, success_cnt, fail_cnt, fps, kf_buffer,
+        checkpoint.folder if checkpoint is not None else None, return_stats, **motion,
+    )
+
+
+def _motion_stats(motion, decoded: int) -> dict:
+    # MotionGate.state() → 결과 통계 (움직임 감지 미사용이면 빈 dict)
+    if not motion:
+        return {}
+    return {
+        "motion_skipped": motion["skipped"],
+        "motion_skipped_ratio": round(motion["skipped"] / decoded, 4) if decoded else 0.0,
+        "idle_spans": [tuple(s) for s in motion["idle_spans"]],
+    }
 
-    # 리스트를 numpy로 변환
-    frames = np.asarray(frames, dtype=np.float32)  
 
-    if return_stats:
-        return frames, {"success": success_cnt, "fail": fail_cnt}
-    return frames
+def _output(arrays, success_cnt, fail_cnt, fps, kf_buffer, checkpoint, return_stats, **extra_stats):
+    frames = arrays["xy"]
+    if not return_stats:
+        return frames
+    stats = {
+        "success": success_cnt,
+        "fail": fail_cnt,
+        "fps": float(fps),
+        "frame_index": arrays["index"],
+        "keyframes": kf_buffer,
+        "checkpoint": checkpoint,
+        **extra_stats,
+    }
+    # z, visibility (extras=True 일 때) (T, 33, 2)
+    if "extra" in arrays:
+        stats["landmark_extra"] = arrays["extra"]
+    return frames, stats
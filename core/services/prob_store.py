@@ -0,0 +1,80 @@
+# core/services/prob_store.py
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from core.config import Config
+from core.services import history_json
+from core.services.scoring import SuspicionScorer, behavior_percentages
+
+PROBS_SUFFIX = ".probs.npy"
+
+
+def save_probs(probs, stem: str, folder: Optional[str] = None) -> str:
+    """
+    윈도우별 확률 (N, C)을 float16 .npy로 저장 (np.load(mmap_mode="r")로 바로 매핑 가능)
+    stem: 분석별 산출물 이름 (pose_store.run_key, 같은 영상의 다른 분석 기록과 겹치지 않게)
+    Returns: 저장 경로
+    """
+    folder = folder or Config.UPLOAD_FOLDER
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, stem + PROBS_SUFFIX)
+    np.save(path, np.asarray(probs, dtype=np.float16))
+    return path
+
+
+def load_probs(path: str, mmap: bool = True) -> np.ndarray:
+    """저장된 확률 로드 (기본: 메모리 매핑, 읽기 전용)"""
+    return np.load(path, mmap_mode="r" if mmap else None)
+
+
+def rescore_probs(probs, scorer: SuspicionScorer, label_map=None) -> Dict[str, Any]:
+    """저장된 확률 하나로 위험도/요약 재계산"""
+    probs = np.asarray(probs, dtype=np.float32)
+    score = scorer.score(probs)
+    label_map = label_map or {}
+    result = {
+        "result": score["level"],
+        "risk_level": score["level"],
+        "behavior_probs_pct": behavior_percentages(probs),
+        "score_evidence": score["evidence"],
+    }
+    result["behavior_counts"] = result["behavior_probs_pct"]  # 프론트 호환용
+    if label_map:
+        result["result_per_chunk"] = [label_map[int(p)] for p in probs.argmax(axis=1)]
+    return result
+
+
+def rescore_records(
+    scorer: Optional[SuspicionScorer] = None,
+    username: Optional[str] = None,
+    *,
+    label_map=None,
+    write: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    저장된 분석 기록 전체를 MediaPipe/LSTM 재실행 없이 새 규칙으로 재채점.
+    write=True면 변경된 위험도/요약을 history.json에 한 번에 반영.
+    Returns: [{"id", "filename", "old", "new"}, ...]
+    """
+    scorer = scorer or SuspicionScorer()
+    report, updates = [], {}
+    for rec in history_json.load_all(username):
+        path = rec.get("probs_path")
+        if not path or not os.path.isfile(path):
+            continue
+        fields = rescore_probs(load_probs(path), scorer, label_map)
+        report.append(
+            {
+                "id": rec.get("id"),
+                "filename": rec.get("filename"),
+                "old": rec.get("risk_level", rec.get("result")),
+                "new": fields["result"],
+            }
+        )
+        updates[rec.get("id")] = fields
+
+    if write:
+        history_json.update_records(updates)
+    return report
@@ -0,0 +1,118 @@
+# core/services/profiling.py
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from core.config import Config
+
+# tracemalloc은 프로세스 전역 → 동시에 여러 분석을 프로파일링하면(서버 워커) 메모리 측정은 한 건만
+_MEMORY_LOCK = threading.Lock()
+
+
+class ProfileSession:
+    """
+    분석 1건 프로파일링 (선택 기능).
+      - cProfile: 함수별 누적 시간
+      - tracemalloc: 최대 메모리 / 상위 할당 위치 (numpy 포함, torch 내부 할당 제외)
+        다른 세션이 측정 중이면 이 세션은 메모리 값 None (서로의 최댓값을 섞지 않도록)
+      - torch.profiler: torch_ops() 블록 안의 LSTM 연산
+    종료 시 out_dir에 <name>.<시각>.{prof, txt, torch.txt, json} 저장
+    """
+
+    def __init__(self, name: str, out_dir: str = None, *, torch_ops=True, memory=True, top=30):
+        self.name = name
+        self.out_dir = out_dir or Config.PROFILE_FOLDER
+        self.enable_torch = torch_ops
+        self.enable_memory = memory
+        self.top = top
+        self.summary = {}
+        self.paths = {}
+        self._torch_tables = []
+        self._profiler = cProfile.Profile()
+        self._own_tracemalloc = False
+        self._memory = False  # 이 세션이 메모리 측정을 맡았는지
+
+    def __enter__(self):
+        if self.enable_memory and _MEMORY_LOCK.acquire(blocking=False):
+            self._memory = True
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._own_tracemalloc = True
+            tracemalloc.reset_peak()
+        self._t0 = time.perf_counter()
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._profiler.disable()
+        wall = time.perf_counter() - self._t0
+
+        self.summary = {"name": self.name, "wall_sec": round(wall, 4)}
+        top_alloc = []
+        if self._memory:
+            try:
+                current, peak = tracemalloc.get_traced_memory()
+                self.summary["peak_mem_mb"] = round(peak / 2**20, 2)
+                self.summary["current_mem_mb"] = round(current / 2**20, 2)
+                stats = tracemalloc.take_snapshot().statistics("lineno")[: self.top]
+                top_alloc = [str(s) for s in stats]
+            finally:
+                if self._own_tracemalloc:
+                    tracemalloc.stop()
+                    self._own_tracemalloc = False
+                self._memory = False
+                _MEMORY_LOCK.release()
+        elif self.enable_memory:
+            self.summary["peak_mem_mb"] = None
+            self.summary["current_mem_mb"] = None
+        self.summary["top_allocations"] = top_alloc
+        try:
+            self._write()
+        except OSError as e:
+            print(f"[WARN] 프로파일 저장 실패: {e}")
+        return False
+
+    @contextmanager
+    def torch_ops(self):
+        """이 블록 안의 torch 연산을 연산자 단위로 기록"""
+        if not self.enable_torch:
+            yield
+            return
+        from torch.profiler import profile, ProfilerActivity
+
+        with profile(activities=[ProfilerActivity.CPU], record_shapes=True) as prof:
+            yield
+        self._torch_tables.append(
+            prof.key_averages().table(sort_by="self_cpu_time_total", row_limit=self.top)
+        )
+
+    # 산출물 저장
+    def _write(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        base = os.path.join(self.out_dir, f"{self.name}.{stamp}")
+
+        # pstats 원본 (snakeviz 등으로 열람 가능) + 누적 시간 상위 목록
+        self.paths["prof"] = base + ".prof"
+        self._profiler.dump_stats(self.paths["prof"])
+        buf = io.StringIO()
+        pstats.Stats(self._profiler, stream=buf).sort_stats("cumulative").print_stats(self.top)
+        self.paths["txt"] = base + ".txt"
+        with open(self.paths["txt"], "w", encoding="utf-8") as f:
+            f.write(buf.getvalue())
+
+        if self._torch_tables:
+            self.paths["torch"] = base + ".torch.txt"
+            with open(self.paths["torch"], "w", encoding="utf-8") as f:
+                f.write("\n\n".join(self._torch_tables))
+
+        self.paths["json"] = base + ".json"
+        self.summary["artifacts"] = dict(self.paths)
+        with open(self.paths["json"], "w", encoding="utf-8") as f:
+            json.dump(self.summary, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,144 @@
+# core/services/roi.py
+"""
+카메라별 관심 영역(ROI) 프리셋 (analysis.db camera_roi 테이블)
+
+    python -m core.services.roi set cam01 0.5 0.3 0.4 0.6 --upscale 2
+    python -m core.services.roi list
+    python -m core.services.roi delete cam01
+"""
+import argparse
+import os
+import time
+
+import cv2
+
+from core.db import get_analysis_connection
+
+_COLUMNS = ("camera", "x", "y", "w", "h", "upscale", "memo", "updated_at")
+
+
+def save_roi(camera: str, x: float, y: float, w: float, h: float,
+             upscale: float = 1.0, memo: str = None) -> dict:
+    """프리셋 저장 (좌표는 프레임 대비 0~1 비율, 같은 카메라는 덮어씀)"""
+    if not (0 <= x < 1 and 0 <= y < 1 and 0 < w <= 1 - x + 1e-9 and 0 < h <= 1 - y + 1e-9):
+        raise ValueError(f"ROI가 프레임 범위를 벗어났습니다: x={x}, y={y}, w={w}, h={h}")
+    if upscale < 1.0:
+        raise ValueError(f"upscale은 1 이상이어야 합니다: {upscale}")
+    row = (camera, float(x), float(y), float(w), float(h), float(upscale), memo,
+           time.strftime("%Y-%m-%d %H:%M:%S"))
+    conn = get_analysis_connection()
+    try:
+        conn.execute(
+            f"INSERT OR REPLACE INTO camera_roi ({', '.join(_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            row,
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return dict(zip(_COLUMNS, row))
+
+
+def get_roi(camera: str):
+    if not camera:
+        return None
+    conn = get_analysis_connection()
+    try:
+        row = conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM camera_roi WHERE camera = ?", (camera,)
+        ).fetchone()
+    finally:
+        conn.close()
+    return dict(zip(_COLUMNS, row)) if row else None
+
+
+def list_rois() -> list:
+    conn = get_analysis_connection()
+    try:
+        rows = conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM camera_roi ORDER BY camera"
+        ).fetchall()
+    finally:
+        conn.close()
+    return [dict(zip(_COLUMNS, r)) for r in rows]
+
+
+def delete_roi(camera: str) -> bool:
+    conn = get_analysis_connection()
+    try:
+        cur = conn.execute("DELETE FROM camera_roi WHERE camera = ?", (camera,))
+        conn.commit()
+        return cur.rowcount > 0
+    finally:
+        conn.close()
+
+
+def roi_geometry(roi):
+    """좌표에 영향을 주는 값만 (x, y, w, h, upscale). 없으면 None"""
+    if not roi:
+        return None
+    return {k: roi[k] for k in ("x", "y", "w", "h", "upscale")}
+
+
+def camera_for_video(video_path: str) -> str:
+    """카메라 이름을 지정하지 않았을 때: 영상이 들어 있는 폴더 이름 (카메라별 폴더로 내보내는 경우)"""
+    return os.path.basename(os.path.dirname(os.path.abspath(video_path)))
+
+
+class RoiCropper:
+    """
+    프레임 → ROI 자르기(+확대), 자른 영상 기준 랜드마크 → 전체 프레임 좌표 변환.
+      - 확대하지 않으면 view 반환 (복사 없음, 이어지는 RGB 변환이 연속 배열로 만듦)
+      - 확대 결과는 미리 할당한 버퍼 재사용
+    """
+
+    def __init__(self, roi: dict, frame_w: int, frame_h: int):
+        self.roi = roi
+        x0 = int(round(roi["x"] * frame_w))
+        y0 = int(round(roi["y"] * frame_h))
+        x1 = min(int(round((roi["x"] + roi["w"]) * frame_w)), frame_w)
+        y1 = min(int(round((roi["y"] + roi["h"]) * frame_h)), frame_h)
+        self.box = (x0, y0, max(x1, x0 + 1), max(y1, y0 + 1))
+        cw, ch = self.box[2] - x0, self.box[3] - y0
+        scale = float(roi.get("upscale") or 1.0)
+        self.out_size = (int(round(cw * scale)), int(round(ch * scale)))
+        self._dst = None
+        # 정규화 좌표 변환: x_full = x_crop * sx + ox
+        self.affine = (cw / frame_w, x0 / frame_w, ch / frame_h, y0 / frame_h)
+
+    def crop(self, frame):
+        x0, y0, x1, y1 = self.box
+        view = frame[y0:y1, x0:x1]
+        if self.out_size == (x1 - x0, y1 - y0):
+            return view
+        self._dst = cv2.resize(view, self.out_size, dst=self._dst, interpolation=cv2.INTER_LINEAR)
+        return self._dst
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="카메라별 ROI 프리셋")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("set")
+    p.add_argument("camera")
+    for k in ("x", "y", "w", "h"):
+        p.add_argument(k, type=float)
+    p.add_argument("--upscale", type=float, default=1.0)
+    p.add_argument("--memo")
+    sub.add_parser("list")
+    d = sub.add_parser("delete")
+    d.add_argument("camera")
+    args = parser.parse_args(argv)
+
+    from core.models import create_roi_table
+
+    create_roi_table()
+    if args.cmd == "set":
+        print(save_roi(args.camera, args.x, args.y, args.w, args.h, args.upscale, args.memo))
+    elif args.cmd == "list":
+        for r in list_rois():
+            print(r)
+    else:
+        print("삭제됨" if delete_roi(args.camera) else "없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# core/services/scoring.py
+import json
+import math
+
+import numpy as np
+
+# 위험도 순서 (높을수록 위험)
+LEVEL_ORDER = {"하": 0, "중": 1, "상": 2}
+LABEL_NAMES = {0: "Normal", 1: "Loitering", 2: "Handover", 3: "Reapproach"}
+SUSPICIOUS_LABELS = (1, 2, 3)
+
+# 기본 규칙 = 기존 get_suspicion_level 기준 (20% / 80%)
+#  - labels 중 ratio 이상 등장한 행동이 min_labels 개 이상이면 level
+DEFAULT_RULES = [
+    {"name": "three_behaviors_20pct", "level": "상", "min_labels": 3, "ratio": 0.20},
+    {"name": "two_behaviors_20pct", "level": "중", "min_labels": 2, "ratio": 0.20},
+    {"name": "one_behavior_80pct", "level": "중", "min_labels": 1, "ratio": 0.80},
+]
+
+
+def load_rules(path: str):
+    """JSON 파일에서 규칙 목록 로드 ({"rules": [...]} 또는 [...])"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data["rules"] if isinstance(data, dict) else data
+
+
+def evaluate_rules(counts, total: int, rules=None, *, min_total: int = 4):
+    """
+    라벨별 윈도우 수(counts: 길이 C 배열 또는 {label: n})에 규칙 적용.
+    Returns: (위험도, 규칙별 근거 리스트)
+    """
+    rules = DEFAULT_RULES if rules is None else rules
+    if isinstance(counts, dict):
+        size = max([*counts.keys(), *SUSPICIOUS_LABELS]) + 1
+        arr = np.zeros(size, dtype=np.int64)
+        for k, v in counts.items():
+            arr[int(k)] = v
+        counts = arr
+    counts = np.asarray(counts, dtype=np.int64)
+
+    if total == 0 or total < min_total:
+        return "하", [
+            {"rule": "min_total", "level": "하", "matched": True, "total": int(total)}
+        ]
+
+    level = "하"
+    evidence = []
+    for rule in rules:
+        labels = rule.get("labels", SUSPICIOUS_LABELS)
+        thr = math.ceil(rule["ratio"] * total)
+        met = [int(l) for l in labels if l < len(counts) and counts[l] >= thr]
+        matched = len(met) >= rule.get("min_labels", 1)
+        evidence.append(
+            {
+                "rule": rule.get("name", ""),
+                "level": rule["level"],
+                "matched": matched,
+                "threshold": int(thr),
+                "labels_met": [LABEL_NAMES.get(l, str(l)) for l in met],
+            }
+        )
+        if matched and LEVEL_ORDER[rule["level"]] > LEVEL_ORDER[level]:
+            level = rule["level"]
+    return level, evidence
+
+
+def behavior_percentages(probs) -> dict:
+    """윈도우별 확률 평균 → 의심 행동별 비율(%)"""
+    avg = np.mean(np.asarray(probs, dtype=np.float32), axis=0)
+    return {LABEL_NAMES[l]: round(float(avg[l] * 100), 1) for l in SUSPICIOUS_LABELS}
+
+
+def trailing_mean(x: np.ndarray, k: int, tail=None) -> np.ndarray:
+    """
+    과거 k개 윈도우 이동 평균 (인과적, cumsum 기반).
+    tail: 직전 배치의 마지막 k-1개 행 → 스트리밍에서도 오프라인과 같은 결과
+    """
+    if k <= 1:
+        return x
+    n_tail = 0 if tail is None else len(tail)
+    full = x if not n_tail else np.vstack([tail, x])
+    c = np.vstack([np.zeros((1, full.shape[1])), np.cumsum(full, axis=0, dtype=np.float64)])
+    end = np.arange(1, len(full) + 1)
+    start = np.maximum(end - k, 0)
+    out = (c[end] - c[start]) / (end - start)[:, None]
+    return out[n_tail:].astype(np.float32)
+
+
+def hysteresis(x: np.ndarray, enter: float, exit: float, state=None) -> np.ndarray:
+    """
+    라벨별 히스테리시스 활성 구간 (enter 이상 진입, exit 미만 해제).
+    마지막 진입/해제 인덱스 누적 최댓값으로 루프 없이 계산.
+    """
+    n, c = x.shape
+    idx = np.arange(n)[:, None]
+    last_on = np.maximum.accumulate(np.where(x >= enter, idx, -1), axis=0)
+    last_off = np.maximum.accumulate(np.where(x < exit, idx, -1), axis=0)
+    init = np.zeros(c, dtype=bool) if state is None else np.asarray(state, dtype=bool)
+    undecided = (last_on < 0) & (last_off < 0)
+    return np.where(undecided, init[None, :], last_on > last_off)
+
+
+class SuspicionScorer:
+    """
+    윈도우별 확률 (N, C) → 위험도.
+    smoothing: "none"(argmax) | "moving_average" | "hysteresis"
+    score()는 클립 단위(오프라인), update()는 배치 단위 누적(실시간 스트림).
+    """
+
+    def __init__(
+        self,
+        rules=None,
+        *,
+        smoothing: str = "none",
+        ma_window: int = 5,
+        enter: float = 0.6,
+        exit: float = 0.4,
+        min_total: int = 4,
+    ):
+        if smoothing not in ("none", "moving_average", "hysteresis"):
+            raise ValueError(f"지원하지 않는 smoothing: {smoothing}")
+        self.rules = DEFAULT_RULES if rules is None else rules
+        self.smoothing = smoothing
+        self.ma_window = int(ma_window)
+        self.enter = float(enter)
+        self.exit = float(exit)
+        self.min_total = int(min_total)
+        self.reset()
+
+    @classmethod
+    def from_config(cls, cfg: dict):
+        cfg = dict(cfg)
+        rules = cfg.pop("rules", None)
+        if isinstance(rules, str):
+            rules = load_rules(rules)
+        return cls(rules, **cfg)
+
+    # 스트리밍 상태 초기화
+    def reset(self):
+        self.counts = None
+        self.total = 0
+        self._tail = None
+        self._state = None
+
+    # 배치 하나를 라벨별 윈도우 수로 변환 → (counts, 다음 tail, 다음 상태)
+    def _count(self, probs: np.ndarray, tail=None, state=None):
+        x = probs
+        if self.smoothing in ("moving_average", "hysteresis") and self.ma_window > 1:
+            x = trailing_mean(probs, self.ma_window, tail)
+            full = probs if tail is None else np.vstack([tail, probs])
+            tail = full[-(self.ma_window - 1):]
+
+        if self.smoothing == "hysteresis":
+            active = hysteresis(x, self.enter, self.exit, state)
+            return active.sum(axis=0).astype(np.int64), tail, active[-1]
+        counts = np.bincount(x.argmax(axis=1), minlength=x.shape[1]).astype(np.int64)
+        return counts, tail, state
+
+    # 라벨별 윈도우 수 → 위험도/근거
+    def _result(self, counts, total: int) -> dict:
+        level, evidence = evaluate_rules(counts, total, self.rules, min_total=self.min_total)
+        denom = total or 1
+        return {
+            "level": level,
+            "total": int(total),
+            "counts": {LABEL_NAMES.get(i, str(i)): int(c) for i, c in enumerate(counts)},
+            "fractions": {
+                LABEL_NAMES.get(i, str(i)): round(float(c) / denom, 4)
+                for i, c in enumerate(counts)
+            },
+            "smoothing": self.smoothing,
+            "evidence": evidence,
+        }
+
+    def update(self, probs) -> dict:
+        """확률 배치 (M, C)를 누적하고 현재까지의 위험도 반환 (실시간용)"""
+        probs = _as_probs(probs)
+        if len(probs):
+            counts, self._tail, self._state = self._count(probs, self._tail, self._state)
+            self.counts = counts if self.counts is None else self.counts + counts
+            self.total += len(probs)
+        counts = self.counts if self.counts is not None else np.zeros(4, dtype=np.int64)
+        return self._result(counts, self.total)
+
+    def score(self, probs) -> dict:
+        """
+        클립 전체 확률 (N, C)로 위험도 계산.
+        스트리밍 상태를 건드리지 않으므로 여러 스레드에서 같은 객체를 써도 됨.
+        """
+        probs = _as_probs(probs)
+        if not len(probs):
+            return self._result(np.zeros(4, dtype=np.int64), 0)
+        counts, _, _ = self._count(probs)
+        return self._result(counts, len(probs))
+
+
+def _as_probs(probs) -> np.ndarray:
+    probs = np.asarray(probs, dtype=np.float32)
+    return probs[None, :] if probs.ndim == 1 else probs
@@ -0,0 +1,334 @@
+# core/services/shm_transport.py
+"""
+포즈 추출 프로세스 → 분석(추론) 프로세스 좌표 전달 (multiprocessing.shared_memory 링 버퍼)
+
+  - 포즈 프로세스의 process_pose 가 링 버퍼 행에 좌표를 바로 기록 (LandmarkBuffer 대신)
+  - 분석 프로세스는 공유 메모리를 NumPy view로 읽어 바로 정규화 (큐 pickle/복사 없음)
+  - 행마다 순번(seq) → 슬롯 = seq % capacity. 순번 순서대로만 읽으므로 프레임 순서 유지
+  - 빈 슬롯 세마포어(space)로 역압: 분석 쪽이 밀리면 포즈 프로세스가 대기 (메모리 고정)
+  - 키프레임/통계/오류 등 작은 값만 결과 큐로 전달
+
+  메모리 배치 (블록 1개)
+    header int64[8]          WRITE(다음에 쓸 순번) / READ(다음에 읽을 순번) / CLOSED / ABORT
+    index  int64[cap]        원본 프레임 번호
+    xy     float32[cap, 66]  x, y 교대 배치 (LandmarkBuffer.xy 와 동일)
+    extra  float32[cap, 33, 2]  z, visibility (extras=True 일 때만)
+
+    python -m core.services.shm_transport C:/cctv/day1/cam01.mp4 --ring 1024
+"""
+import argparse
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from core.config import Config
+from core.services.metrics import RunMetrics
+from core.services.pose_store import LandmarkBuffer
+
+WRITE, READ, CLOSED, ABORT = range(4)
+HEADER_SLOTS = 8
+POLL_SEC = 0.5  # 읽기 대기 중 포즈 프로세스 생존 확인 간격
+
+
+class RingClosed(Exception):
+    """분석 쪽이 읽기를 중단함 (포즈 프로세스는 추출을 멈추고 종료)"""
+
+
+class PoseRing:
+    """
+    공유 메모리 블록 + 세마포어 2개 (space: 빈 슬롯 수, items: 쓴 행 수 + 종료 표시 1).
+    만든 프로세스가 소유자 (close 시 unlink), 자식 프로세스에는 이름으로 전달되어 다시 연결
+    """
+
+    def __init__(self, capacity: int = None, points: int = 33, extras: bool = False, ctx=None):
+        ctx = ctx or multiprocessing.get_context("spawn")
+        self.capacity = max(int(capacity or Config.SHM_RING_FRAMES), 1)
+        self.points = points
+        self.extras = extras
+        self.space = ctx.Semaphore(self.capacity)
+        self.items = ctx.Semaphore(0)
+        self.shm = shared_memory.SharedMemory(create=True, size=self._nbytes())
+        self._owner = True
+        self._attach()
+        self.header[:] = 0
+
+    def _shapes(self):
+        cap = self.capacity
+        shapes = [
+            ("header", (HEADER_SLOTS,), np.int64),
+            ("index", (cap,), np.int64),
+            ("xy", (cap, self.points * 2), np.float32),
+        ]
+        if self.extras:
+            shapes.append(("extra", (cap, self.points, 2), np.float32))
+        return shapes
+
+    def _nbytes(self) -> int:
+        return sum(int(np.prod(shape)) * np.dtype(dtype).itemsize for _, shape, dtype in self._shapes())
+
+    def _attach(self):
+        """공유 메모리 위에 배열 view 생성 (int64 배열이 앞이라 정렬 유지)"""
+        self.extra = None
+        offset = 0
+        for name, shape, dtype in self._shapes():
+            arr = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+            setattr(self, name, arr)
+            offset += arr.nbytes
+
+    def __getstate__(self):
+        # 자식 프로세스 생성 시에만 전달 (세마포어는 이때만 pickle 가능)
+        return {
+            "name": self.shm.name,
+            "capacity": self.capacity,
+            "points": self.points,
+            "extras": self.extras,
+            "space": self.space,
+            "items": self.items,
+        }
+
+    def __setstate__(self, state):
+        name = state.pop("name")
+        self.__dict__.update(state)
+        self.shm = shared_memory.SharedMemory(name=name)
+        self._owner = False
+        self._attach()
+
+    def close(self) -> None:
+        """view를 놓고 연결 해제 (소유자는 블록 삭제)"""
+        if self.shm is None:
+            return
+        self.header = self.index = self.xy = self.extra = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+        self.shm = None
+
+
+class RingWriter(LandmarkBuffer):
+    """
+    포즈 프로세스 쪽: process_pose(sink=...) 에 넘기는 LandmarkBuffer 호환 버퍼.
+    push 할 때마다 빈 슬롯을 기다렸다가 링 버퍼 행에 바로 기록
+    """
+
+    def __init__(self, ring: PoseRing, timeout: float = None):
+        self.ring = ring
+        self.points = ring.points
+        self.n = 0  # 지금까지 쓴 행 수 (= 다음 순번)
+        self.xy, self.index, self.extra = ring.xy, ring.index, ring.extra
+        self.affine = None
+        self.timeout = timeout or Config.SHM_TIMEOUT_SEC
+
+    def push(self, frame_no: int, landmarks) -> None:
+        header = self.ring.header
+        if header[ABORT]:
+            raise RingClosed("분석 프로세스가 읽기를 중단했습니다.")
+        if not self.ring.space.acquire(timeout=self.timeout):
+            raise TimeoutError(f"분석 프로세스가 {self.timeout}초 동안 좌표를 읽지 않았습니다.")
+        if header[ABORT]:  # 중단 신호로 깨어난 경우
+            raise RingClosed("분석 프로세스가 읽기를 중단했습니다.")
+        self._write(self.n % self.ring.capacity, frame_no, landmarks)
+        self.n += 1
+        header[WRITE] = self.n  # 행 기록 후 순번 공개 → 세마포어로 알림
+        self.ring.items.release()
+
+    def close(self) -> None:
+        """쓰기 끝 (분석 쪽에 종료 표시 1개 추가)"""
+        self.ring.header[CLOSED] = 1
+        self.ring.items.release()
+
+    def arrays(self) -> dict:
+        """좌표는 이미 분석 쪽으로 넘어갔으므로 빈 배열"""
+        out = {"xy": self.xy[:0], "index": self.index[:0]}
+        if self.extra is not None:
+            out["extra"] = self.extra[:0]
+        return out
+
+
+class RingReader:
+    """
+    분석 프로세스 쪽: 쓴 순서대로 연속 구간을 view로 읽고, 다 쓴 뒤 release 로 슬롯 반납.
+      block = reader.read()       # {"seq", "index", "xy", ("extra")} / 끝이면 None
+      ... block["xy"] 사용 ...
+      reader.release(len(block["index"]))
+    """
+
+    def __init__(self, ring: PoseRing):
+        self.ring = ring
+        self.seq = 0  # 다음에 읽을 순번
+        self.eof = False
+        self._tokens = 0  # 받았지만 아직 반납하지 않은 items 수
+
+    def read(self, max_rows: int = None, timeout: float = None):
+        """
+        읽을 행이 생길 때까지 기다린 뒤 연속 구간 view (링 끝에서 잘림, 복사 없음).
+        timeout 동안 행이 없으면 TimeoutError
+        """
+        if self.eof:
+            return None
+        ring = self.ring
+        max_rows = max_rows or ring.capacity
+        if self._tokens == 0:
+            if not ring.items.acquire(timeout=timeout):
+                raise TimeoutError("포즈 좌표 대기 시간 초과")
+            self._tokens = 1
+        while self._tokens < max_rows and ring.items.acquire(block=False):
+            self._tokens += 1
+        # 행 토큰은 WRITE 갱신 후에만 생기므로 WRITE를 넘는 토큰은 종료 표시
+        n = min(self._tokens, int(ring.header[WRITE]) - self.seq)
+        if n <= 0:
+            self.eof = True
+            return None
+        slot = self.seq % ring.capacity
+        n = min(n, max_rows, ring.capacity - slot)
+        block = {
+            "seq": self.seq,
+            "index": ring.index[slot : slot + n],
+            "xy": ring.xy[slot : slot + n],
+        }
+        if ring.extra is not None:
+            block["extra"] = ring.extra[slot : slot + n]
+        return block
+
+    def release(self, n: int) -> None:
+        """읽은 n행의 슬롯 반납 (이후 view 내용은 덮어써질 수 있음)"""
+        self._tokens -= n
+        self.seq += n
+        self.ring.header[READ] = self.seq
+        for _ in range(n):
+            self.ring.space.release()
+
+    def abort(self) -> None:
+        """읽기 중단 (대기 중인 포즈 프로세스를 깨워 종료시킴)"""
+        self.ring.header[ABORT] = 1
+        self.ring.space.release()
+
+
+def pose_worker(ring: PoseRing, video_path: str, results, kwargs: dict) -> None:
+    """포즈 프로세스 본체: process_pose → 링 버퍼, 끝나면 통계/키프레임/측정값을 결과 큐로"""
+    from core.services.preprocess import process_pose
+
+    writer = RingWriter(ring)
+    out = {"stats": None, "metrics": None, "error": None}
+    try:
+        metrics = RunMetrics(registry=None)
+        _, stats = process_pose(video_path, return_stats=True, metrics=metrics, sink=writer, **kwargs)
+        if stats is not None:
+            for key in ("frame_index", "landmark_extra", "checkpoint"):
+                stats.pop(key, None)
+        out["stats"] = stats
+        out["metrics"] = metrics.as_dict()
+    except RingClosed:
+        pass
+    except Exception as e:
+        out["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        writer.close()
+        results.put(out)
+        ring.close()
+
+
+def extract_pose(video_path: str, transform=None, metrics: RunMetrics = None,
+                 capacity: int = None, timeout: float = None, **kwargs):
+    """
+    별도 프로세스에서 process_pose 를 실행하고 좌표를 링 버퍼로 받기.
+    transform: 받은 xy 블록에 바로 적용할 함수 (예: normalize_seq_2d, 공유 메모리 view를 그대로 입력)
+    kwargs: process_pose 인자 (keyframes, extras, roi, stride, motion_gate, backend ...)
+    Returns: process_pose 와 같은 (좌표 (T, 66), 통계) / 영상을 열 수 없으면 (None, None)
+      통계의 "normalized": transform 적용 여부
+    """
+    metrics = metrics if metrics is not None else RunMetrics(registry=None)
+    timeout = timeout or Config.SHM_TIMEOUT_SEC
+    ctx = multiprocessing.get_context("spawn")
+    extras = bool(kwargs.get("extras"))
+    points = kwargs.pop("detected_points", 33)
+    ring = PoseRing(capacity, points, extras, ctx)
+    results = ctx.Queue(1)
+    proc = ctx.Process(
+        target=pose_worker,
+        args=(ring, video_path, results, {"detected_points": points, **kwargs}),
+        name="drovis-pose",
+        daemon=True,
+    )
+    reader = RingReader(ring)
+    out = LandmarkBuffer(ring.capacity * 4, points, extras)
+    clock = time.perf_counter
+    finished = False
+    try:
+        with metrics.timer("pose_process_start"):
+            proc.start()
+        idle_since = clock()
+        while True:
+            alive = proc.is_alive()
+            t0 = clock()
+            try:
+                block = reader.read(timeout=POLL_SEC)
+            except TimeoutError:
+                metrics.add_time("shm_wait", clock() - t0)
+                if not alive:
+                    raise RuntimeError(f"포즈 프로세스가 비정상 종료되었습니다 (exitcode={proc.exitcode})")
+                if clock() - idle_since > timeout:
+                    raise TimeoutError(f"포즈 프로세스가 {timeout}초 동안 좌표를 보내지 않았습니다.")
+                continue
+            t1 = clock()
+            metrics.add_time("shm_wait", t1 - t0)
+            if block is None:
+                break
+            xy = transform(block["xy"]) if transform is not None else block["xy"]
+            out.extend(block["index"], xy, block.get("extra"))
+            reader.release(len(block["index"]))
+            metrics.add_time("normalize" if transform is not None else "shm_copy", clock() - t1)
+            metrics.inc("shm_rows", len(block["index"]))
+            idle_since = clock()
+
+        reply = results.get(timeout=timeout)
+        proc.join(timeout)
+        finished = True
+    finally:
+        if not finished and proc.pid is not None:
+            reader.abort()
+            proc.join(5)
+            if proc.is_alive():
+                proc.terminate()
+        ring.close()
+        results.close()
+
+    if reply["metrics"]:
+        metrics.merge(reply["metrics"])
+    if reply["error"]:
+        raise RuntimeError(f"포즈 프로세스 오류: {reply['error']}")
+    stats = reply["stats"]
+    if stats is None:
+        return None, None
+    arrays = out.arrays()
+    stats.update(
+        frame_index=arrays["index"],
+        checkpoint=None,
+        normalized=transform is not None,
+    )
+    if "extra" in arrays:
+        stats["landmark_extra"] = arrays["extra"]
+    return arrays["xy"], stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="포즈 프로세스 + 공유 메모리 링 버퍼 추출 확인")
+    parser.add_argument("video")
+    parser.add_argument("--ring", type=int, default=None, help="링 버퍼 행 수")
+    parser.add_argument("--extras", action="store_true", help="z, visibility 포함")
+    args = parser.parse_args(argv)
+
+    run = RunMetrics(registry=None)
+    t0 = time.perf_counter()
+    seq, stats = extract_pose(args.video, metrics=run, capacity=args.ring, extras=args.extras)
+    if seq is None:
+        return
+    print(f"[SHM] {len(seq)}행 수신, {time.perf_counter() - t0:.2f}s "
+          f"(성공 {stats['success']} / 실패 {stats['fail']})")
+    for name, sec in run.as_dict()["stages"].items():
+        print(f"  {name}: {sec:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
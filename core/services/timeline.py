@@ -0,0 +1,85 @@
+# core/services/timeline.py
+import numpy as np
+
+# 라벨 매핑 (predict.LABEL_MAP과 동일 순서)
+DEFAULT_LABELS = {0: "Normal", 1: "Loitering", 2: "Handover", 3: "Reapproach"}
+DEFAULT_FPS = 30.0
+
+
+def format_timestamp(sec: float) -> str:
+    """초 → "HH:MM:SS" 문자열"""
+    sec = max(int(sec), 0)
+    return f"{sec // 3600:02d}:{sec % 3600 // 60:02d}:{sec % 60:02d}"
+
+
+def build_event_timeline(
+    probs,
+    frame_index=None,
+    fps: float = DEFAULT_FPS,
+    window: int = 30,
+    step: int = 1,
+    label_map=None,
+    include_normal: bool = False,
+    window_starts=None,
+):
+    """
+    윈도우별 확률 (N, C)을 같은 라벨이 연속된 구간(이벤트)으로 병합.
+    frame_index: 시퀀스 인덱스 → 원본 영상 프레임 번호 (포즈 인식 실패 프레임 보정용)
+    window_starts: 일부 윈도우를 제외(가시성 마스킹)한 경우 각 확률 행의 윈도우 번호.
+                   번호가 끊긴 곳은 같은 라벨이어도 다른 이벤트로 분리
+    Returns: 이벤트 dict 리스트 (시간순)
+    """
+    probs = np.asarray(probs, dtype=np.float32)
+    if probs.ndim != 2 or len(probs) == 0:
+        return []
+    label_map = label_map or DEFAULT_LABELS
+    fps = float(fps) if fps and fps > 0 else DEFAULT_FPS
+
+    n = len(probs)
+    labels = probs.argmax(axis=1)
+    conf = probs[np.arange(n), labels]
+
+    # 라벨이 바뀌는 지점(또는 제외된 윈도우로 끊긴 지점) = 이벤트 경계
+    win = np.arange(n) if window_starts is None else np.asarray(window_starts, dtype=np.int64)
+    boundary = labels[1:] != labels[:-1]
+    if window_starts is not None:
+        boundary |= np.diff(win) != 1
+    starts = np.flatnonzero(np.r_[True, boundary])
+    ends = np.r_[starts[1:], n] - 1
+    sizes = ends - starts + 1
+
+    seg_labels = labels[starts]
+    peak = np.maximum.reduceat(conf, starts)
+    mean = np.add.reduceat(conf, starts) / sizes
+
+    # 윈도우 번호 → 시퀀스 프레임 범위 → 원본 프레임 번호
+    seq_first = win[starts] * step
+    seq_last = win[ends] * step + window - 1
+    if frame_index is not None and len(frame_index) > 0:
+        fi = np.asarray(frame_index, dtype=np.int64)
+        seq_last = np.minimum(seq_last, len(fi) - 1)
+        start_frame, end_frame = fi[seq_first], fi[seq_last]
+    else:
+        start_frame, end_frame = seq_first, seq_last
+
+    keep = np.ones(len(starts), dtype=bool) if include_normal else seg_labels != 0
+
+    events = []
+    for i in np.flatnonzero(keep):
+        start_sec = float(start_frame[i]) / fps
+        end_sec = float(end_frame[i] + 1) / fps
+        events.append(
+            {
+                "label": label_map.get(int(seg_labels[i]), str(int(seg_labels[i]))),
+                "start_frame": int(start_frame[i]),
+                "end_frame": int(end_frame[i]),
+                "start_sec": round(start_sec, 3),
+                "end_sec": round(end_sec, 3),
+                "start_ts": format_timestamp(start_sec),
+                "end_ts": format_timestamp(end_sec),
+                "windows": int(sizes[i]),
+                "peak_conf": round(float(peak[i]), 4),
+                "mean_conf": round(float(mean[i]), 4),
+            }
+        )
+    return events
@@ -0,0 +1,289 @@
+# core/services/training.py
+"""
+캐시된 정규화 포즈 시퀀스(.pipe_norm.npy)로 LSTMModel 학습 / 미세조정 (MediaPipe 재실행 없음)
+
+  데이터 지정
+    - 라벨별 폴더: <root>/<라벨>/*.npy   (라벨 = Normal / Loitering / Handover / Reapproach)
+    - 목록 파일(JSONL): {"npy": "...pipe_norm.npy", "label": "Handover", "start": 120, "end": 480}
+      start/end: 시퀀스 행 범위 (선택, 없으면 전체)
+  저장: ai_models/<이름>.pt + <이름>.json (model_registry가 읽는 메타데이터) → predict 에서 바로 사용
+"""
+import glob
+import json
+import os
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader, Dataset
+
+from core.config import Config
+from core.models.lstm_model import LSTMModel
+from core.services.features import FEATURE_SETS
+from core.services.model_registry import DEFAULT_LABEL_MAP, MODELS, read_info
+
+
+def load_sources(root: str = None, manifest: str = None, label_map: dict = None) -> list:
+    """학습 데이터 목록 [{"npy", "label"(번호), "start", "end"}, ...]"""
+    label_ids = {v: k for k, v in (label_map or DEFAULT_LABEL_MAP).items()}
+    items = []
+    if root:
+        for label_dir in sorted(glob.glob(os.path.join(root, "*"))):
+            if os.path.isdir(label_dir):
+                for path in sorted(glob.glob(os.path.join(label_dir, "*.npy"))):
+                    items.append({"npy": path, "label": os.path.basename(label_dir)})
+    if manifest:
+        base = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    item["npy"] = os.path.join(base, item["npy"])
+                    items.append(item)
+    sources = []
+    for item in items:
+        if item["label"] not in label_ids:
+            raise ValueError(f"알 수 없는 라벨: {item['label']} ({item['npy']})")
+        sources.append({
+            "npy": os.path.abspath(item["npy"]),
+            "label": label_ids[item["label"]],
+            "start": int(item.get("start") or 0),
+            "end": item.get("end"),
+        })
+    return sources
+
+
+class WindowDataset(Dataset):
+    """
+    여러 시퀀스 파일의 슬라이딩 윈도우 (memmap, 윈도우를 미리 만들어 두지 않음).
+      - 윈도우 목록은 (파일 번호, 시작 행) 정수 배열만 보관
+      - 파일은 각 DataLoader 워커 프로세스에서 처음 접근할 때 memmap으로 열기
+        (memmap을 워커로 넘기면 피클링 과정에서 전체가 복사되므로)
+    """
+
+    def __init__(self, sources: list, window: int = 30, step: int = 5):
+        self.sources = sources
+        self.window = window
+        self._arrays = {}
+        file_ids, starts, dims = [], [], set()
+        for i, src in enumerate(sources):
+            arr = np.load(src["npy"], mmap_mode="r")
+            if arr.ndim != 2:
+                raise ValueError(f"(T, D) 시퀀스가 아닙니다: {src['npy']} {arr.shape}")
+            dims.add(arr.shape[1])
+            end = min(src["end"] if src["end"] is not None else len(arr), len(arr))
+            s = np.arange(src["start"], end - window + 1, step, dtype=np.int64)
+            file_ids.append(np.full(len(s), i, dtype=np.int32))
+            starts.append(s)
+        if len(dims) > 1:
+            raise ValueError(f"시퀀스 차원이 섞여 있습니다: {sorted(dims)}")
+        self.input_size = dims.pop() if dims else 0
+        self.file_ids = np.concatenate(file_ids) if file_ids else np.empty(0, dtype=np.int32)
+        self.starts = np.concatenate(starts) if starts else np.empty(0, dtype=np.int64)
+        self.labels = np.array([sources[f]["label"] for f in self.file_ids], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _array(self, i: int):
+        arr = self._arrays.get(i)
+        if arr is None:
+            arr = self._arrays[i] = np.load(self.sources[i]["npy"], mmap_mode="r")
+        return arr
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_arrays"] = {}
+        return state
+
+    def __getitem__(self, idx):
+        f = int(self.file_ids[idx])
+        s = int(self.starts[idx])
+        x = np.array(self._array(f)[s:s + self.window], dtype=np.float32)
+        return torch.from_numpy(x), int(self.labels[idx])
+
+
+def split_by_clip(sources: list, val_ratio: float = 0.2, seed: int = 0):
+    """
+    검증용 분리는 파일 단위 (같은 영상의 인접 윈도우가 양쪽에 들어가지 않도록).
+    라벨별로 나눠서 분리 → 라벨마다 학습 파일이 최소 1개 남음 (검증에만 있는 라벨이 생기지 않도록)
+    """
+    if val_ratio <= 0 or len(sources) < 2:
+        return sources, []
+    rng = np.random.default_rng(seed)
+    groups = {}
+    for src in sources:
+        groups.setdefault(src["label"], []).append(src)
+    train_src, val_src = [], []
+    for label in sorted(groups):
+        group = [groups[label][i] for i in rng.permutation(len(groups[label]))]
+        n_val = min(int(round(len(group) * val_ratio)), len(group) - 1)
+        val_src += group[:n_val]
+        train_src += group[n_val:]
+    if not val_src:
+        # 라벨별 파일이 적어 검증 몫이 0 → 파일이 가장 많은 라벨에서 1개 (2개 이상일 때만)
+        label = max(groups, key=lambda k: len(groups[k]))
+        if len(groups[label]) > 1:
+            moved = next(src for src in train_src if src["label"] == label)
+            train_src.remove(moved)
+            val_src.append(moved)
+    return train_src, val_src
+
+
+def evaluate(net, loader, loss_fn, device, num_classes: int) -> dict:
+    """
+    검증 손실/정확도/라벨별 재현율.
+    loss_fn은 가중치 없는 손실 사용 (학습 데이터에 없는 라벨은 가중치 0 → 손실이 NaN이 될 수 있음)
+    """
+    net.eval()
+    total_loss, confusion = 0.0, np.zeros((num_classes, num_classes), dtype=np.int64)
+    with torch.no_grad():
+        for x, y in loader:
+            logits = net(x.to(device))
+            total_loss += float(loss_fn(logits, y.to(device))) * len(y)
+            np.add.at(confusion, (y.numpy(), logits.argmax(dim=1).cpu().numpy()), 1)
+    n = int(confusion.sum())
+    per_class = confusion.diagonal() / np.maximum(confusion.sum(axis=1), 1)
+    return {
+        "loss": round(total_loss / max(n, 1), 5),
+        "accuracy": round(float(confusion.trace()) / max(n, 1), 4),
+        "recall": [round(float(r), 4) for r in per_class],
+        "windows": n,
+    }
+
+
+def train(
+    sources: list,
+    name: str = None,
+    base: str = None,
+    epochs: int = 10,
+    batch_size: int = 256,
+    lr: float = 1e-3,
+    window: int = 30,
+    step: int = 5,
+    workers: int = 2,
+    val_ratio: float = 0.2,
+    freeze_lstm: bool = False,
+    hidden_size: int = 64,
+    num_layers: int = 1,
+    label_map: dict = None,
+    folder: str = None,
+    description: str = "",
+    overwrite: bool = False,
+    seed: int = 0,
+) -> dict:
+    """
+    학습/미세조정 후 검증 손실이 가장 낮은 epoch의 가중치를 저장.
+    base: 시작 모델 이름 (ai_models/<base>.pt). 없으면 처음부터
+    freeze_lstm: LSTM은 고정하고 분류층(fc1, fc2)만 학습 (CPU 미세조정용, 빠름)
+    Returns: 저장한 모델 정보 (model_registry.read_info 형식)
+    """
+    folder = folder or Config.MODEL_FOLDER
+    label_map = label_map or DEFAULT_LABEL_MAP
+    name = name or f"lstm_{'ft' if base else 'train'}_{time.strftime('%Y%m%d_%H%M%S')}"
+    out_path = os.path.join(folder, f"{name}.pt")
+    if os.path.exists(out_path) and not overwrite:
+        raise FileExistsError(f"이미 있는 모델입니다 (덮어쓰려면 overwrite): {out_path}")
+    torch.manual_seed(seed)
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+    train_src, val_src = split_by_clip(sources, val_ratio, seed)
+    train_set = WindowDataset(train_src, window, step)
+    val_set = WindowDataset(val_src, window, step) if val_src else None
+    if len(train_set) == 0:
+        raise ValueError(f"학습 윈도우가 없습니다 (시퀀스 길이 < {window})")
+
+    # 모델 준비 (미세조정이면 기존 가중치/구조 그대로)
+    base_info = None
+    if base:
+        base_net, base_info = MODELS.get(base)
+        hidden_size, num_layers = base_info["hidden_size"], base_info["num_layers"]
+    net = LSTMModel(train_set.input_size, hidden_size, num_layers, len(label_map))
+    if base:
+        if base_info["input_size"] != train_set.input_size or base_info["num_classes"] != len(label_map):
+            raise ValueError(
+                f"기존 모델({base_info['input_size']}→{base_info['num_classes']})과 "
+                f"데이터({train_set.input_size}→{len(label_map)}) 크기가 다릅니다."
+            )
+        net.load_state_dict({k: v.cpu() for k, v in base_net.state_dict().items()})
+    if freeze_lstm:
+        for p in net.lstm.parameters():
+            p.requires_grad = False
+    net.to(device)
+
+    # 라벨 불균형 보정 (빈도 역수 가중치)
+    counts = np.bincount(train_set.labels, minlength=len(label_map)).astype(np.float64)
+    weight = np.where(counts > 0, counts.sum() / np.maximum(counts, 1) / len(label_map), 0.0)
+    loss_fn = nn.CrossEntropyLoss(weight=torch.tensor(weight, dtype=torch.float32, device=device))
+    val_loss_fn = nn.CrossEntropyLoss()
+    optimizer = torch.optim.Adam([p for p in net.parameters() if p.requires_grad], lr=lr)
+
+    loader_args = {
+        "batch_size": batch_size,
+        "num_workers": workers,
+        "persistent_workers": workers > 0,
+    }
+    train_loader = DataLoader(train_set, shuffle=True, **loader_args)
+    val_loader = DataLoader(val_set, shuffle=False, **loader_args) if val_set else None
+
+    best, history = None, []
+    for epoch in range(1, epochs + 1):
+        t0 = time.perf_counter()
+        net.train()
+        total, n = 0.0, 0
+        for x, y in train_loader:
+            optimizer.zero_grad()
+            loss = loss_fn(net(x.to(device)), y.to(device))
+            loss.backward()
+            optimizer.step()
+            total += loss.item() * len(y)
+            n += len(y)
+        row = {"epoch": epoch, "train_loss": round(total / max(n, 1), 5)}
+        if val_loader is not None:
+            row["val"] = evaluate(net, val_loader, val_loss_fn, device, len(label_map))
+        row["sec"] = round(time.perf_counter() - t0, 2)
+        history.append(row)
+        score = row["val"]["loss"] if "val" in row else row["train_loss"]
+        if not np.isfinite(score):
+            score = float("inf")  # NaN은 어떤 비교도 False → 최선 epoch 선택이 멈추지 않도록
+        print(f"[TRAIN] epoch {epoch}/{epochs} {row}")
+        if best is None or score < best[0]:
+            best = (score, epoch, {k: v.detach().clone() for k, v in net.state_dict().items()})
+
+    # 가중치/메타데이터 → 각각 임시 파일에 쓰고 교체 (predict가 반쯤 쓴 파일을 보지 않도록)
+    #  메타데이터를 먼저 교체: 중간에 중단되면 새 가중치 + 예전 메타데이터 조합이 남지 않음
+    os.makedirs(folder, exist_ok=True)
+    tmp = out_path + ".tmp"
+    torch.save(best[2], tmp)
+    feature_set = next((fs for fs, dim in FEATURE_SETS.items() if dim == train_set.input_size), None)
+    meta = {
+        "input_size": train_set.input_size,
+        "hidden_size": hidden_size,
+        "num_layers": num_layers,
+        "num_classes": len(label_map),
+        "label_map": {str(k): v for k, v in label_map.items()},
+        "feature_set": feature_set,
+        "description": description,
+        "base_version": base_info["version"] if base_info else None,
+        "trained_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "training": {
+            "best_epoch": best[1],
+            "epochs": epochs,
+            "window": window,
+            "step": step,
+            "freeze_lstm": freeze_lstm,
+            "lr": lr,
+            "train_clips": len(train_src),
+            "val_clips": len(val_src),
+            "train_windows": len(train_set),
+            "label_counts": counts.astype(int).tolist(),
+            "history": history,
+        },
+    }
+    meta_path = os.path.splitext(out_path)[0] + ".json"
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(meta_path + ".tmp", meta_path)
+    os.replace(tmp, out_path)
+    return read_info(out_path)
@@ -0,0 +1,125 @@
+# gui/event_dialog.py
+import os
+
+import cv2
+from PyQt5.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QLabel,
+    QListWidget,
+    QListWidgetItem,
+    QPushButton,
+    QMessageBox,
+)
+from PyQt5.QtGui import QImage, QPixmap, QIcon
+from PyQt5.QtCore import Qt, QSize, QTimer
+
+from core.config import Config
+from core.services.evidence import export_event_clips
+
+
+class EventTimelineDialog(QDialog):
+    # 이벤트 타임라인 창 초기화 (record: 분석 기록 dict)
+    def __init__(self, record, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"이벤트 타임라인 - {record.get('filename', '-')}")
+        self.resize(720, 640)
+        self.record = record
+        self.video_path = record.get("video_path")
+        self.init_ui()
+
+    # UI 구성
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        # 이벤트 목록
+        self.event_list = QListWidget()
+        self.event_list.setIconSize(QSize(96, 64))
+        for ev in self.record.get("events", []):
+            text = (
+                f"{ev.get('start_ts', '-')} ~ {ev.get('end_ts', '-')}  {ev.get('label', '-')}"
+                f"  (최대 {ev.get('peak_conf', 0) * 100:.1f}%, 평균 {ev.get('mean_conf', 0) * 100:.1f}%)"
+            )
+            it = QListWidgetItem(text)
+            it.setData(Qt.UserRole, ev)
+            thumb = ev.get("thumbnail")
+            if thumb and os.path.isfile(thumb):
+                it.setIcon(QIcon(thumb))
+                if ev.get("thumbnail_approx"):
+                    it.setToolTip("썸네일은 구간 근처 장면입니다 (선택하면 실제 시작 프레임 표시)")
+            self.event_list.addItem(it)
+        self.event_list.currentItemChanged.connect(self.seek_to_event)
+        layout.addWidget(self.event_list)
+
+        # 선택한 이벤트 시작 프레임 미리보기
+        self.preview = QLabel("이벤트를 선택하면 해당 시점으로 이동합니다.")
+        self.preview.setAlignment(Qt.AlignCenter)
+        self.preview.setMinimumHeight(360)
+        layout.addWidget(self.preview)
+
+        btn_export = QPushButton("이벤트 구간 클립 저장")
+        btn_export.clicked.connect(self.export_clips)
+        layout.addWidget(btn_export)
+
+        btn_close = QPushButton("닫기")
+        btn_close.clicked.connect(self.close)
+        layout.addWidget(btn_close)
+
+        self.setLayout(layout)
+
+    # 선택한 이벤트의 시작 프레임으로 바로 이동 (전체 재생 없이 seek)
+    def seek_to_event(self, current, _previous=None):
+        if current is None:
+            return
+        ev = current.data(Qt.UserRole)
+
+        # 분석 중 저장한 썸네일은 영상을 여는 동안 자리표시로 먼저 표시
+        # (구간 밖 근처 장면일 수 있으므로 영상이 있으면 실제 시작 프레임으로 교체)
+        thumb = ev.get("thumbnail")
+        has_thumb = bool(thumb and os.path.isfile(thumb))
+        if has_thumb:
+            self.show_pixmap(QPixmap(thumb))
+        QTimer.singleShot(0, lambda: self.show_start_frame(current, has_thumb))
+
+    def show_start_frame(self, item, has_thumb=False):
+        if item is not self.event_list.currentItem():
+            return  # 그 사이 다른 이벤트를 선택함
+        ev = item.data(Qt.UserRole)
+        if not self.video_path or not os.path.isfile(self.video_path):
+            if not has_thumb:
+                self.preview.setText("원본 영상을 찾을 수 없습니다.")
+            return
+
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(ev.get("start_frame", 0)))
+            ret, frame = cap.read()
+        finally:
+            cap.release()
+        if not ret:
+            if not has_thumb:
+                self.preview.setText("프레임을 읽을 수 없습니다.")
+            return
+
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        h, w, _ = rgb.shape
+        image = QImage(rgb.data, w, h, 3 * w, QImage.Format_RGB888)
+        self.show_pixmap(QPixmap.fromImage(image))
+
+    # 미리보기 영역에 맞춰 이미지 표시
+    def show_pixmap(self, pixmap):
+        self.preview.setPixmap(
+            pixmap.scaled(self.preview.width(), self.preview.height(), Qt.KeepAspectRatio)
+        )
+
+    # 탐지 구간만 잘라서 클립 저장
+    def export_clips(self):
+        if not self.video_path or not os.path.isfile(self.video_path):
+            QMessageBox.warning(self, "클립 저장", "원본 영상을 찾을 수 없습니다.")
+            return
+        paths = export_event_clips(
+            self.video_path, self.record.get("events", []), Config.CLIP_FOLDER
+        )
+        QMessageBox.information(
+            self, "클립 저장", f"{len(paths)}개 클립을 저장했습니다.\n{Config.CLIP_FOLDER}"
+        )
@@ -1,17 +1,30 @@
 # gui/history_window.py
+import os
+
+import sqlite3
+
 from PyQt5.QtWidgets import (
     QWidget,
     QVBoxLayout,
+    QHBoxLayout,
     QLabel,
     QPushButton,
     QTableWidget,
     QTableWidgetItem,
     QHeaderView,
     QMessageBox,
+    QComboBox,
+    QCheckBox,
+    QDateEdit,
+    QLineEdit,
+    QSpinBox,
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QDate
+from PyQt5.QtGui import QIcon
 
-from core.services.history_json import load_all, delete_all
+from core.services.history_json import delete_all
+from core.services.history_query import LABELS, count_history, query_history
+from gui.event_dialog import EventTimelineDialog
 
 
 class HistoryWindow(QWidget):
@@ -22,6 +35,8 @@ class HistoryWindow(QWidget):
         self.setGeometry(300, 200, 1000, 600)
         self.history_file = history_file
         self.username = username
+        self.page_size = 100
+        self.next_cursor = None  # 다음 페이지 위치 (더 보기)
         self.init_ui()
 
     # UI 구성
@@ -33,26 +48,88 @@ class HistoryWindow(QWidget):
         title.setStyleSheet("font-size: 20px; font-weight: bold; margin-bottom: 15px;")
         layout.addWidget(title)
 
+        # 조회 조건 (위험도 / 기간 / 파일명 / 라벨 비율 / 정렬)
+        filters = QHBoxLayout()
+        self.risk_combo = QComboBox()
+        self.risk_combo.addItems(["전체", "상", "중", "하"])
+        filters.addWidget(QLabel("위험도"))
+        filters.addWidget(self.risk_combo)
+
+        self.date_check = QCheckBox("기간")
+        self.date_from = QDateEdit(QDate.currentDate().addMonths(-1))
+        self.date_to = QDateEdit(QDate.currentDate())
+        for edit in (self.date_from, self.date_to):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("yyyy-MM-dd")
+            edit.setEnabled(False)
+        self.date_check.toggled.connect(self.date_from.setEnabled)
+        self.date_check.toggled.connect(self.date_to.setEnabled)
+        filters.addWidget(self.date_check)
+        filters.addWidget(self.date_from)
+        filters.addWidget(QLabel("~"))
+        filters.addWidget(self.date_to)
+
+        self.name_edit = QLineEdit()
+        self.name_edit.setPlaceholderText("파일명 (예: cam01*)")
+        self.name_edit.returnPressed.connect(self.load_history)
+        filters.addWidget(self.name_edit)
+
+        self.label_combo = QComboBox()
+        self.label_combo.addItems(["라벨 비율 조건 없음"] + list(LABELS))
+        self.pct_spin = QSpinBox()
+        self.pct_spin.setRange(0, 100)
+        self.pct_spin.setSuffix("% 이상")
+        self.pct_spin.setValue(10)
+        filters.addWidget(self.label_combo)
+        filters.addWidget(self.pct_spin)
+
+        self.sort_combo = QComboBox()
+        for text, key in [("시간", "date"), ("파일명", "filename"), ("위험도", "risk")] + [
+            (f"{label} 비율", label.lower()) for label in LABELS
+        ]:
+            self.sort_combo.addItem(text, key)
+        self.order_combo = QComboBox()
+        self.order_combo.addItems(["내림차순", "오름차순"])
+        filters.addWidget(QLabel("정렬"))
+        filters.addWidget(self.sort_combo)
+        filters.addWidget(self.order_combo)
+
+        btn_search = QPushButton("검색")
+        btn_search.clicked.connect(self.load_history)
+        filters.addWidget(btn_search)
+        layout.addLayout(filters)
+
         # 기록 테이블 설정
         self.table = QTableWidget()
-        self.table.setColumnCount(5)
+        self.table.setColumnCount(6)
         self.table.setHorizontalHeaderLabels(
-            ["파일명", "포즈 인식 성공", "탐지 행동 비율", "위험도", "시간"]
+            ["파일명", "포즈 인식 성공", "탐지 행동 비율", "이벤트", "위험도", "시간"]
         )
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.Stretch)  # 파일명
         header.setSectionResizeMode(1, QHeaderView.ResizeToContents)  # 포즈 인식 성공
         header.setSectionResizeMode(2, QHeaderView.Stretch)  # 행동 비율(멀티라인)
-        header.setSectionResizeMode(3, QHeaderView.ResizeToContents)  # 위험도
-        header.setSectionResizeMode(4, QHeaderView.ResizeToContents)  # 시간
+        header.setSectionResizeMode(3, QHeaderView.Stretch)  # 이벤트 타임라인
+        header.setSectionResizeMode(4, QHeaderView.ResizeToContents)  # 위험도
+        header.setSectionResizeMode(5, QHeaderView.ResizeToContents)  # 시간
 
         self.table.setWordWrap(True)  # 텍스트 줄바꿈
         self.table.setTextElideMode(Qt.ElideNone)  # 말줄임 해제
-        self.table.setSortingEnabled(True)  # 정렬 가능
+        self.table.setSortingEnabled(False)  # 정렬은 조회 조건으로 (페이지 단위 정렬 방지)
         self.table.verticalHeader().setDefaultSectionSize(72)  # 기본 행 높이 설정
         self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.cellDoubleClicked.connect(self.open_event_timeline)  # 더블클릭 → 이벤트 목록
         layout.addWidget(self.table)
 
+        # 건수 / 다음 페이지
+        paging = QHBoxLayout()
+        self.count_label = QLabel("")
+        paging.addWidget(self.count_label)
+        self.btn_more = QPushButton("더 보기")
+        self.btn_more.clicked.connect(self.load_more)
+        paging.addWidget(self.btn_more)
+        layout.addLayout(paging)
+
         # 버튼들
         btn_back = QPushButton("뒤로 가기")
         btn_back.clicked.connect(self.go_back_to_upload)
@@ -91,8 +168,9 @@ class HistoryWindow(QWidget):
         return f"성공: {ok}프레임\n실패: {ng}프레임"
 
     # 탐지 행동 비율 텍스트 포맷 (터미널과 동일하게 출력)
+    # chunks: 윈도우별 라벨 목록 또는 라벨별 개수(dict, 색인된 기록)
     def format_behavior_from_chunks(self, chunks):
-        if not isinstance(chunks, list) or not chunks:
+        if not isinstance(chunks, (list, dict)) or not chunks:
             return "-"
 
         # 터미널 포맷과 동일한 라벨/순서/이름
@@ -101,9 +179,14 @@ class HistoryWindow(QWidget):
 
         # 카운트 집계
         counts = {name: 0 for name in order}
-        for n in chunks:
-            if n in counts:
-                counts[n] += 1
+        if isinstance(chunks, dict):
+            for n, c in chunks.items():
+                if n in counts:
+                    counts[n] += int(c)
+        else:
+            for n in chunks:
+                if n in counts:
+                    counts[n] += 1
         total = sum(counts.values()) or 1
 
         # 터미널은 Counter에 존재하는 라벨만 출력 -> 0회는 출력 안 함
@@ -116,6 +199,29 @@ class HistoryWindow(QWidget):
             lines.append(f"- {name} (라벨 {label_idx[name]}): {c}회 ({pct:.2f}%)")
         return "\n".join(lines) if lines else "-"
 
+    # 이벤트 타임라인 텍스트 포맷 (시작~끝 라벨 (최대 신뢰도))
+    def format_events(self, events, limit=5):
+        if not isinstance(events, list) or not events:
+            return "-"
+        lines = [
+            f"{ev.get('start_ts', '-')} ~ {ev.get('end_ts', '-')} {ev.get('label', '-')}"
+            f" (최대 {ev.get('peak_conf', 0) * 100:.0f}%)"
+            for ev in events[:limit]
+        ]
+        if len(events) > limit:
+            lines.append(f"... 외 {len(events) - limit}건")
+        return "\n".join(lines)
+
+    # 첫 번째 이벤트 썸네일 경로 (없으면 None)
+    def first_thumbnail(self, events):
+        if not isinstance(events, list):
+            return None
+        for ev in events:
+            thumb = ev.get("thumbnail")
+            if thumb and os.path.isfile(thumb):
+                return thumb
+        return None
+
     # 위험도 셀 생성
     def make_colored_item(self, level):
         it = QTableWidgetItem(str(level if level is not None else "-"))
@@ -129,29 +235,92 @@ class HistoryWindow(QWidget):
         it.setTextAlignment(Qt.AlignCenter)
         return it
 
-    # 기록 데이터 로드
+    # 현재 조회 조건 → query_history 인자
+    def current_filters(self):
+        filters = {}
+        if self.risk_combo.currentIndex() > 0:
+            filters["risk"] = self.risk_combo.currentText()
+        if self.date_check.isChecked():
+            filters["date_from"] = self.date_from.date().toString("yyyy-MM-dd")
+            filters["date_to"] = self.date_to.date().toString("yyyy-MM-dd")
+        if self.name_edit.text().strip():
+            filters["filename"] = self.name_edit.text().strip()
+        if self.label_combo.currentIndex() > 0:
+            filters["min_pct"] = {self.label_combo.currentText(): self.pct_spin.value()}
+        return filters
+
+    # 기록 데이터 로드 (조회 조건 적용, 첫 페이지)
     def load_history(self):
-        history = load_all(self.username)
+        self.table.setRowCount(0)
+        self.next_cursor = None
+        try:
+            total = count_history(self.username, **self.current_filters())
+        except sqlite3.Error as e:
+            QMessageBox.warning(self, "기록 조회", f"기록을 불러오지 못했습니다: {e}")
+            return
+        self.count_label.setText(f"총 {total}건")
+        self.load_more()
 
-        self.table.setRowCount(len(history))
-        for row, item in enumerate(history):
+    # 다음 페이지를 표 아래에 추가
+    def load_more(self):
+        try:
+            page = query_history(
+                self.username,
+                sort=self.sort_combo.currentData(),
+                descending=self.order_combo.currentIndex() == 0,
+                limit=self.page_size,
+                cursor=self.next_cursor,
+                **self.current_filters(),
+            )
+        except sqlite3.Error as e:
+            QMessageBox.warning(self, "기록 조회", f"기록을 불러오지 못했습니다: {e}")
+            return
+        self.next_cursor = page["next_cursor"]
+        self.btn_more.setEnabled(self.next_cursor is not None)
+        self.add_rows(page["items"])
+
+    # 기록 행 추가
+    def add_rows(self, history):
+        start = self.table.rowCount()
+        self.table.setRowCount(start + len(history))
+        for row, item in enumerate(history, start):
             filename = item.get("filename", "-")
             risk = item.get("risk_level", item.get("result", "-"))
             pose_txt = self.format_pose_text(item.get("pose_stats"))
 
-            # 터미널과 동일: result_per_chunk로 계산/표시
-            chunks = item.get("result_per_chunk")
+            # 터미널과 동일: result_per_chunk로 계산/표시 (색인된 기록은 라벨별 개수)
+            chunks = item.get("chunk_counts") or item.get("result_per_chunk")
             beh_txt = self.format_behavior_from_chunks(chunks)
 
+            ev_txt = self.format_events(item.get("events"))
             ts = item.get("timestamp", "-")
 
-            self.table.setItem(row, 0, self.make_ro_item(filename))
+            # 원본 기록을 찾을 수 있도록 파일명 셀에 기록 저장
+            name_item = self.make_ro_item(filename)
+            name_item.setData(Qt.UserRole, item)
+
+            self.table.setItem(row, 0, name_item)
             self.table.setItem(row, 1, self.make_ro_item(pose_txt))
             self.table.setItem(row, 2, self.make_ro_item(beh_txt))
-            self.table.setItem(row, 3, self.make_colored_item(risk))
-            self.table.setItem(row, 4, self.make_ro_item(ts, align_left=False))
+            ev_item = self.make_ro_item(ev_txt)
+            thumb = self.first_thumbnail(item.get("events"))
+            if thumb:
+                ev_item.setIcon(QIcon(thumb))  # 저장된 썸네일 바로 표시
+            self.table.setItem(row, 3, ev_item)
+            self.table.setItem(row, 4, self.make_colored_item(risk))
+            self.table.setItem(row, 5, self.make_ro_item(ts, align_left=False))
             self.table.resizeRowToContents(row)
 
+    # 이벤트 타임라인 창 열기 (행 더블클릭)
+    def open_event_timeline(self, row, _col):
+        name_item = self.table.item(row, 0)
+        record = name_item.data(Qt.UserRole) if name_item else None
+        if not record or not record.get("events"):
+            QMessageBox.information(self, "이벤트", "저장된 이벤트가 없습니다.")
+            return
+        dialog = EventTimelineDialog(record, parent=self)
+        dialog.exec_()
+
     # 기록 삭제 기능
     def clear_history(self):
         reply = QMessageBox.question(
@@ -166,6 +335,8 @@ class HistoryWindow(QWidget):
             # if os.path.exists(self.history_file):
             #    os.remove(self.history_file)
             self.table.setRowCount(0)
+            self.count_label.setText("총 0건")
+            self.btn_more.setEnabled(False)
             QMessageBox.information(
                 self, "삭제됨", f"{deleted}개 기록이 삭제되었습니다."
             )
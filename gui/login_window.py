@@ -14,7 +14,7 @@ sys.path.append(PARENT_DIR)
 
 # 외부 모듈 import
 from gui.upload_window import UploadWindow
-from core.services.auth import verify_user
+from core.services.auth import AUTH
 
 # PyQt5 위젯 모듈들
 from PyQt5.QtWidgets import (
@@ -26,10 +26,14 @@ from PyQt5.QtWidgets import (
     QMessageBox,
     QApplication,
 )
+from PyQt5.QtCore import pyqtSignal
 
 
 # 로그인 창 클래스
 class LoginWindow(QMainWindow):
+    # 로그인 검사 완료 (작업 스레드 → GUI 스레드로 전달)
+    login_done = pyqtSignal(object)
+
     def __init__(self, parent=None):
         super().__init__()
         self.setWindowTitle("로그인")
@@ -63,21 +67,35 @@ class LoginWindow(QMainWindow):
         self.central_widget.setLayout(layout)
 
         self.upload = None  # 업로드 창 핸들
+        self.login_done.connect(self.on_login_done)
 
+    # 비밀번호 검사는 작업 스레드에서 (창이 멈추지 않도록), 끝나면 on_login_done
     def try_login(self):
+        if not self.login_button.isEnabled():
+            return  # 검사 중
         username = self.username_input.text()
         password = self.password_input.text()
 
-        is_valid = verify_user(username, password)
+        self.login_button.setEnabled(False)
+        self.login_button.setText("확인 중...")
+        future = AUTH.login(username, password)
+        future.add_done_callback(lambda f: self.login_done.emit((username, f)))
+
+    def on_login_done(self, done):
+        username, future = done
+        self.login_button.setEnabled(True)
+        self.login_button.setText("로그인")
+        if future.exception() is not None:
+            QMessageBox.critical(self, "로그인 오류", f"로그인 처리 중 오류: {future.exception()}")
+            return
 
+        is_valid, message = future.result()
         if is_valid:
             self.upload = UploadWindow(username)
             self.upload.show()
             self.close()
         else:
-            QMessageBox.warning(
-                self, "로그인 실패", "아이디 또는 비밀번호가 틀렸습니다."
-            )
+            QMessageBox.warning(self, "로그인 실패", message)
     
     def go_back(self):
         self.close()
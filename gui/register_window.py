@@ -9,10 +9,14 @@ from PyQt5.QtWidgets import (
     QMessageBox,
     QHBoxLayout,
 )
-from core.services.auth import register_user
+from PyQt5.QtCore import pyqtSignal
+from core.services.auth import AUTH
 
 
 class RegisterWindow(QWidget):
+    # 회원가입 처리 완료 (작업 스레드 → GUI 스레드로 전달)
+    register_done = pyqtSignal(object)
+
     # 회원가입 창 초기화
     def __init__(self, parent=None):
         super().__init__()
@@ -61,6 +65,7 @@ class RegisterWindow(QWidget):
         layout.addWidget(self.back_btn)
 
         self.setLayout(layout)
+        self.register_done.connect(self.on_register_done)
 
     # 회원가입 처리 로직
     def handle_register(self):
@@ -79,8 +84,23 @@ class RegisterWindow(QWidget):
             QMessageBox.warning(self, "비밀번호 오류", "비밀번호가 일치하지 않습니다.")
             return
 
-        # 회원가입 시도 (register_user 내부에서 bcrypt 해시 처리 및 중복 검사)
-        success, message = register_user(username, pw1, email)
+        # 회원가입 시도 (작업 스레드에서 bcrypt 해시 처리 및 중복 검사, 끝나면 on_register_done)
+        if not self.register_btn.isEnabled():
+            return  # 처리 중
+        self.register_btn.setEnabled(False)
+        self.register_btn.setText("처리 중...")
+        future = AUTH.register(username, pw1, email)
+        future.add_done_callback(lambda f: self.register_done.emit((username, f)))
+
+    def on_register_done(self, done):
+        username, future = done
+        self.register_btn.setEnabled(True)
+        self.register_btn.setText("가입하기")
+        if future.exception() is not None:
+            QMessageBox.critical(self, "가입 오류", f"회원가입 처리 중 오류: {future.exception()}")
+            return
+
+        success, message = future.result()
         if success:
             QMessageBox.information(
                 self, "가입 완료", f"{username}님, 가입을 환영합니다!"
@@ -1,5 +1,6 @@
 import os
 import sys
+import threading
 from datetime import datetime
 from PyQt5.QtWidgets import (
     QApplication,
@@ -16,10 +17,10 @@ from PyQt5.QtWidgets import (
     QDialog,
     QHeaderView,
 )
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 from gui.history_window import HistoryWindow
 from core.services.predict import predict_from_video
-from core.services.history_json import append_record  # 0815 추가
+from core.services import job_queue
 
 
 # Qt 플러그인 경로 및 모듈 경로 설정
@@ -30,6 +31,9 @@ sys.path.append(PARENT_DIR)
 
 
 class UploadWindow(QWidget):
+    # 분석 완료 (작업 스레드 → GUI 스레드로 전달)
+    analysis_done = pyqtSignal(object)
+
     # 업로드 창 초기화
     def __init__(self, username="guest"):
         super().__init__()
@@ -42,6 +46,7 @@ class UploadWindow(QWidget):
         self.progress_timer = None  # 게이지 애니메이션용 타이머
         self.progress_value = 0  # 게이지 현재 값
         self.setup_ui()
+        self.analysis_done.connect(self.on_analysis_done)
 
     # 로딩 다이얼로그 표시
     def show_loading_dialog(self, message="분석 중입니다...", estimated_ms=4000):
@@ -120,63 +125,66 @@ class UploadWindow(QWidget):
         layout.addWidget(self.result_table)
         self.setLayout(layout)
 
-    # 분석 시작
+    # 분석 시작 (분석은 작업 스레드에서, 끝나면 on_analysis_done)
     def start_analysis(self):
         if not self.file_path:
             QMessageBox.warning(self, "경고", "먼저 영상을 업로드하세요.")
             return
+        if not self.analyze_btn.isEnabled():
+            return  # 분석 중
 
         # 분석 중 로딩창 표시
+        self.analyze_btn.setEnabled(False)
         self.show_loading_dialog("AI 분석 중입니다...", estimated_ms=4000)
 
-        # 게이지바 완료 후 예측 실행
-        def run_prediction_after_progress():
-            result_data = predict_from_video(self.file_path, self.username)
-
-            if not result_data.get("success"):
-                if self.progress_timer:
-                    self.progress_timer.stop()
-                if self.loading_dialog:
-                    self.loading_dialog.close()
-                QMessageBox.critical(
-                    self, "오류", result_data.get("message", "분석 실패")
-                )
-                return
-
-            result = result_data["result"]
-            filename = result_data["filename"]
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-
-            # 결과 표시
-            self.loading_label.setText(f"분석 결과: {result}")
-            QApplication.processEvents()
-            QTimer.singleShot(1200, self.loading_dialog.close)  # 결과 보여준 뒤 닫기
-
-            # 결과 테이블에 결과 추가
-            row = self.result_table.rowCount()
-            self.result_table.insertRow(row)
-            self.result_table.setItem(row, 0, QTableWidgetItem(filename))
-            self.result_table.setItem(row, 1, QTableWidgetItem("완료"))
-            self.result_table.setItem(row, 2, QTableWidgetItem(result))
-            self.result_table.setItem(row, 3, QTableWidgetItem(timestamp))
-
-            # 기록 저장
-            append_record(
-                {
-                    "username": self.username,
-                    "filename": result_data["filename"],
-                    "result": result_data["result"],  # 위험도
-                    "risk_level": result_data["result"],  # (옵션)
-                    "pose_stats": result_data.get("pose_stats"),
-                    "behavior_counts": result_data.get("behavior_counts"),
-                    "result_per_chunk": result_data.get("result_per_chunk"),
-                    "confidence": None,
-                    "timestamp": timestamp,
-                    "description": "AI 자동 분석 결과",
-                }
+        # 작업 대기열에 선점된 상태로 등록 (등록과 선점이 한 번에 → 다른 워커가 끼어들 수 없음)
+        # 실행 중에는 임대를 연장하고, 앱이 중간에 꺼지면 임대 만료 후 워커가 이어서 처리
+        worker_id = job_queue.default_worker_id()
+        job_id = job_queue.enqueue(self.username, self.file_path, worker_id=worker_id)
+        job = job_queue.get_job(job_id)
+        threading.Thread(
+            target=self.run_job, args=(job, worker_id), name=f"analysis-{job_id}", daemon=True
+        ).start()
+
+    # 작업 스레드: 분석 → (임대를 가진 경우에만) 기록 저장 → 완료 표시
+    def run_job(self, job, worker_id):
+        try:
+            result_data = job_queue.process_job(
+                job, predict_from_video, worker_id, description="AI 자동 분석 결과"
+            )
+        except Exception as e:
+            result_data = {"success": False, "message": f"분석 오류: {e}"}
+        self.analysis_done.emit(result_data)
+
+    def on_analysis_done(self, result_data):
+        self.analyze_btn.setEnabled(True)
+        if self.progress_timer:
+            self.progress_timer.stop()
+
+        if not result_data.get("success"):
+            if self.loading_dialog:
+                self.loading_dialog.close()
+            QMessageBox.critical(
+                self, "오류", result_data.get("message", "분석 실패")
             )
+            return
 
-        QTimer.singleShot(4000, run_prediction_after_progress)
+        result = result_data["result"]
+        filename = result_data["filename"]
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+
+        # 결과 표시
+        self.loading_bar.setValue(100)
+        self.loading_label.setText(f"분석 결과: {result}")
+        QTimer.singleShot(1200, self.loading_dialog.close)  # 결과 보여준 뒤 닫기
+
+        # 결과 테이블에 결과 추가 (기록은 작업 완료 시 저장됨)
+        row = self.result_table.rowCount()
+        self.result_table.insertRow(row)
+        self.result_table.setItem(row, 0, QTableWidgetItem(filename))
+        self.result_table.setItem(row, 1, QTableWidgetItem("완료"))
+        self.result_table.setItem(row, 2, QTableWidgetItem(result))
+        self.result_table.setItem(row, 3, QTableWidgetItem(timestamp))
 
     # 파일 업로드
     def upload_file(self):
@@ -0,0 +1,47 @@
+# server.py
+# 화면 없이 실행하는 분석 서버 (다른 도구에서 HTTP로 영상 분석 요청)
+#   python server.py --port 8765 --workers 2
+#   curl -u user:pw -X POST localhost:8765/jobs -d '{"path": "C:/cctv/a.mp4"}'
+#   curl -u user:pw --data-binary @a.mp4 "localhost:8765/jobs/upload?filename=a.mp4"
+#   curl -u user:pw localhost:8765/jobs/<job_id>
+import argparse
+import os
+import threading
+
+from core.config import Config
+from core.models import (
+    create_user_table,
+    create_analysis_table,
+    create_job_table,
+    create_roi_table,
+    create_fingerprint_table,
+    create_embedding_table,
+)
+from core.services import maintenance
+from core.services.analysis_server import serve
+
+# DB 폴더 / 테이블 생성 (app.py와 동일)
+os.makedirs(os.path.dirname(os.path.abspath(Config.USER_DB_PATH)), exist_ok=True)
+create_user_table()
+create_analysis_table()
+create_job_table()
+create_roi_table()
+create_fingerprint_table()
+create_embedding_table()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drovis 분석 서버")
+    parser.add_argument("--host", default=Config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=Config.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=Config.SERVER_WORKERS)
+    parser.add_argument("--no-auth", action="store_true", help="인증 없이 실행 (로컬 테스트용)")
+    parser.add_argument("--maintenance-hours", type=float, default=Config.MAINTENANCE_INTERVAL_HOURS,
+                        help="산출물/DB 정리 주기 (0 = 끔)")
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    maintenance.start_scheduler(stop, args.maintenance_hours)
+    try:
+        serve(args.host, args.port, args.workers, require_auth=not args.no_auth)
+    finally:
+        stop.set()
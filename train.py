@@ -0,0 +1,46 @@
+# train.py
+# 캐시된 정규화 포즈 시퀀스(.pipe_norm.npy)로 모델 학습 / 미세조정 (MediaPipe 재실행 없음)
+#   python train.py --data dataset/                                  # dataset/<라벨>/*.npy, 처음부터
+#   python train.py --data dataset/ --base lstm_model --freeze-lstm   # 기존 모델 분류층만 미세조정
+#   python train.py --manifest labels.jsonl --base lstm_model --name lstm_site_a
+# 결과: ai_models/<이름>.pt + <이름>.json → DROVIS_MODEL=<이름> 또는 POST /models/active 로 사용
+import argparse
+
+from core.services.training import load_sources, train
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drovis 행동 분류 모델 학습")
+    parser.add_argument("--data", help="라벨별 폴더 (<라벨>/*.npy)")
+    parser.add_argument("--manifest", help="JSONL 목록 ({npy, label, start, end})")
+    parser.add_argument("--base", help="미세조정할 기존 모델 이름 (ai_models/<이름>.pt)")
+    parser.add_argument("--name", help="저장할 모델 이름 (기본: 날짜/시간)")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--lr", type=float, default=1e-3)
+    parser.add_argument("--step", type=int, default=5, help="학습 윈도우 간격 (프레임)")
+    parser.add_argument("--workers", type=int, default=2, help="DataLoader 워커 프로세스 수")
+    parser.add_argument("--val", type=float, default=0.2, help="검증용 파일 비율")
+    parser.add_argument("--freeze-lstm", action="store_true", help="LSTM 고정, 분류층만 학습")
+    parser.add_argument("--description", default="")
+    parser.add_argument("--overwrite", action="store_true")
+    args = parser.parse_args()
+
+    if not args.data and not args.manifest:
+        parser.error("--data 또는 --manifest 가 필요합니다.")
+    sources = load_sources(args.data, args.manifest)
+    print(f"[TRAIN] 시퀀스 파일 {len(sources)}개")
+    info = train(
+        sources,
+        name=args.name,
+        base=args.base,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        lr=args.lr,
+        step=args.step,
+        workers=args.workers,
+        val_ratio=args.val,
+        freeze_lstm=args.freeze_lstm,
+        description=args.description,
+        overwrite=args.overwrite,
+    )
+    print(f"[TRAIN] 저장: {info['path']} ({info['version']})")
@@ -0,0 +1,72 @@
+# worker.py
+# 작업 대기열(analysis.db jobs) 처리 워커. 서버/앱이 죽어도 남은 작업을 이어서 분석
+#   python worker.py --workers 2
+#   python worker.py --enqueue C:/cctv/a.mp4 C:/cctv/day1 --user admin
+import argparse
+import glob
+import os
+import threading
+
+from core.config import Config
+from core.models import (
+    create_analysis_table,
+    create_job_table,
+    create_roi_table,
+    create_fingerprint_table,
+    create_embedding_table,
+)
+from core.services import job_queue, maintenance
+
+os.makedirs(os.path.dirname(os.path.abspath(Config.ANALYSIS_DB_PATH)), exist_ok=True)
+create_analysis_table()
+create_job_table()
+create_roi_table()
+create_fingerprint_table()
+create_embedding_table()
+
+
+def expand(paths):
+    # 폴더는 안의 mp4 전체
+    for p in paths:
+        if os.path.isdir(p):
+            yield from sorted(glob.glob(os.path.join(p, "*.mp4")))
+        else:
+            yield p
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drovis 분석 작업 워커")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--enqueue", nargs="+", metavar="PATH", help="작업만 등록하고 종료")
+    parser.add_argument("--user", default="guest")
+    parser.add_argument("--maintenance-hours", type=float, default=Config.MAINTENANCE_INTERVAL_HOURS,
+                        help="산출물/DB 정리 주기 (0 = 끔)")
+    args = parser.parse_args()
+
+    if args.enqueue:
+        for path in expand(args.enqueue):
+            print(f"[QUEUE] #{job_queue.enqueue(args.user, os.path.abspath(path))} {path}")
+        raise SystemExit(0)
+
+    from core.services.predict import predict_from_video  # 모델 1회 로드
+
+    stop = threading.Event()
+    threads = [
+        threading.Thread(
+            target=job_queue.run_worker,
+            kwargs={"analyze": predict_from_video, "stop_event": stop},
+            daemon=True,
+        )
+        for _ in range(max(args.workers, 1))
+    ]
+    for t in threads:
+        t.start()
+    maintenance.start_scheduler(stop, args.maintenance_hours)
+    print(f"[WORKER] 대기열 처리 시작 (workers={len(threads)}), Ctrl+C로 종료")
+    try:
+        while any(t.is_alive() for t in threads):
+            stop.wait(1.0)
+    except KeyboardInterrupt:
+        stop.set()
+        for t in threads:
+            t.join()